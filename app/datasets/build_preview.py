@@ -3,6 +3,9 @@ import random
 from ..linearization.vocabulary import *
 
 
+UNDERLINED_TOKENS = set([*NOTE_ROOT_TOKENS, *TIME_MODIFICATION_TOKENS])
+
+
 def build_preview(
     dataset_path: str,
     slice_name: str
@@ -72,11 +75,11 @@ def prepare_annotaion_html(path: str) -> str:
                 token = "<br/>" + token
         elif token in ["backup", "forward"]:
             token = "<b>" + token + "</b>"
-        elif token in NOTE_ROOT_TOKENS or token in TIME_MODIFICATION_TOKENS:
+        elif token in UNDERLINED_TOKENS:
             token = "<u>" + token + "</u>"
-        elif token in NOTE_PREFIX_TOKENS:
+        elif VOCABULARY.is_of_class(token, TOKEN_CLASS_PREFIX):
             token = "<sub>" + token + "</sub>"
-        elif token in NOTE_SUFFIX_TOKENS:
+        elif VOCABULARY.is_of_class(token, TOKEN_CLASS_SUFFIX):
             token = "<sup>" + token + "</sup>"
 
         processed_tokens.append(token)
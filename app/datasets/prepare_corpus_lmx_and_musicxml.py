@@ -1,7 +1,8 @@
 import os
-from typing import Dict, Any
+from typing import Dict, Any, Iterator, Optional, Tuple
 from .config import LIEDER_CORPUS_PATH
 from ..symbolic.MxlFile import MxlFile
+from ..symbolic.PartCache import PartCache
 from ..linearization.Linearizer import Linearizer
 from ..symbolic.split_part_to_systems import split_part_to_systems
 from ..symbolic.part_to_score import part_to_score
@@ -10,7 +11,8 @@ import xml.etree.ElementTree as ET
 
 def prepare_corpus_lmx_and_musicxml(
     scores: Dict[int, Dict[str, Any]],
-    soft=False
+    soft=False,
+    part_cache: Optional[PartCache] = None
 ):
     for score_id, score in scores.items():
         score_folder = os.path.join(LIEDER_CORPUS_PATH, "scores", score["path"])
@@ -29,36 +31,55 @@ def prepare_corpus_lmx_and_musicxml(
 
         print("Preparing LMX and MusicXML:", score_folder, "...")
         
-        mxl = MxlFile.load_mxl(mxl_path)
-        part = mxl.get_piano_part()
-        pages = split_part_to_systems(part)
+        part = MxlFile.load_mxl_piano_part(mxl_path, part_cache)
 
-        for pi, page in enumerate(pages):
-            for si, system in enumerate(page.systems):
-                page_number = str(pi + 1)
-                system_number = str(si + 1)
+        for page_number, system_number, xml_string, lmx_string \
+                in convert_part_to_systems(part):
 
-                # write the system musicxml
-                musicxml_path = os.path.join(
-                    musicxml_folder, f"p{page_number}-s{system_number}.musicxml"
-                )
-                system_score = part_to_score(system.part)
-                xml_string = str(ET.tostring(
-                    system_score.getroot(),
-                    encoding="utf-8",
-                    xml_declaration=True
-                ), "utf-8")
-                with open(musicxml_path, "w") as file:
-                    file.write(xml_string + "\n")
+            # write the system musicxml
+            musicxml_path = os.path.join(
+                musicxml_folder, f"p{page_number}-s{system_number}.musicxml"
+            )
+            with open(musicxml_path, "w") as file:
+                file.write(xml_string + "\n")
 
-                # linearize
-                linearizer = Linearizer()
-                linearizer.process_part(system.part)
+            # write LMX
+            lmx_path = os.path.join(
+                lmx_folder, f"p{page_number}-s{system_number}.lmx"
+            )
+            with open(lmx_path, "w") as file:
+                file.write(lmx_string + "\n")
 
-                # write LMX
-                lmx_path = os.path.join(
-                    lmx_folder, f"p{page_number}-s{system_number}.lmx"
-                )
-                lmx_string = " ".join(linearizer.output_tokens)
-                with open(lmx_path, "w") as file:
-                    file.write(lmx_string + "\n")
+
+def convert_part_to_systems(
+    part: ET.Element,
+    share_unmodified_measures=True
+) -> Iterator[Tuple[str, str, str, str]]:
+    """Splits the part to systems and yields the page number, system number,
+    MusicXML string and LMX string of each system. Unmodified measures
+    are shared with the systems by default, so the part should not be
+    used afterwards."""
+    pages = split_part_to_systems(
+        part,
+        share_unmodified_measures=share_unmodified_measures
+    )
+
+    for pi, page in enumerate(pages):
+        for si, system in enumerate(page.systems):
+            page_number = str(pi + 1)
+            system_number = str(si + 1)
+
+            # the system musicxml
+            system_score = part_to_score(system.part)
+            xml_string = str(ET.tostring(
+                system_score.getroot(),
+                encoding="utf-8",
+                xml_declaration=True
+            ), "utf-8")
+
+            # linearize
+            linearizer = Linearizer()
+            linearizer.process_part(system.part)
+            lmx_string = " ".join(linearizer.output_tokens)
+
+            yield page_number, system_number, xml_string, lmx_string
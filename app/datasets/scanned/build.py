@@ -3,6 +3,7 @@ import yaml
 from ..config import SCANNED_DATASET_PATH
 from ..musescore_corpus_conversion import musescore_corpus_conversion
 from ..prepare_corpus_lmx_and_musicxml import prepare_corpus_lmx_and_musicxml
+from ...symbolic.PartCache import PartCache
 from ..take_scores import take_scores
 from ..transfer_samples import transfer_samples
 from ..crop_system_from_png_page import crop_system_from_png_page
@@ -15,7 +16,8 @@ def build(
     slice_count: int,
     inspect: Optional[int],
     linearize_only: bool,
-    soft: bool
+    soft: bool,
+    part_cache: Optional[str] = None
 ):
     scores, slice_index, slice_count = take_scores(
         train=False,
@@ -30,7 +32,11 @@ def build(
     musescore_corpus_conversion(scores=scores, format="mxl", soft=soft)
 
     # split xml files into systems and convert to sequences
-    prepare_corpus_lmx_and_musicxml(scores=scores, soft=soft)
+    prepare_corpus_lmx_and_musicxml(
+        scores=scores,
+        soft=soft,
+        part_cache=PartCache(part_cache) if part_cache is not None else None
+    )
 
     # copy samples
     transfer_samples(
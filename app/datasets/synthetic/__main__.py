@@ -43,6 +43,10 @@ build_parser.add_argument(
     "--soft", action="store_true", default=False,
     help="Skips processing for already processed files"
 )
+build_parser.add_argument(
+    "--part_cache", type=str, default=None,
+    help="Directory to cache the parsed piano parts of the MXL files in"
+)
 
 subparsers.add_parser(
     "finalize",
@@ -87,7 +91,8 @@ elif args.command_name == "build":
         slice_count=args.slice_count,
         inspect=args.inspect,
         linearize_only=args.linearize_only,
-        soft=args.soft
+        soft=args.soft,
+        part_cache=args.part_cache
     )
 elif args.command_name == "finalize":
     finalize()
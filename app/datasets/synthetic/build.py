@@ -2,6 +2,7 @@ from typing import Optional
 from ..config import SYNTHETIC_DATASET_PATH
 from ..musescore_corpus_conversion import musescore_corpus_conversion
 from ..prepare_corpus_lmx_and_musicxml import prepare_corpus_lmx_and_musicxml
+from ...symbolic.PartCache import PartCache
 from ..prepare_corpus_png_systems import prepare_corpus_png_systems
 from ..take_scores import take_scores
 from ..transfer_samples import transfer_samples
@@ -13,7 +14,8 @@ def build(
     slice_count: int,
     inspect: Optional[int],
     linearize_only: bool,
-    soft: bool
+    soft: bool,
+    part_cache: Optional[str] = None
 ):
     scores, slice_index, slice_count = take_scores(
         train=True,
@@ -28,7 +30,11 @@ def build(
     musescore_corpus_conversion(scores=scores, format="mxl", soft=soft)
 
     # split xml files into systems and convert to sequences
-    prepare_corpus_lmx_and_musicxml(scores=scores, soft=soft)
+    prepare_corpus_lmx_and_musicxml(
+        scores=scores,
+        soft=soft,
+        part_cache=PartCache(part_cache) if part_cache is not None else None
+    )
 
     # copy samples
     transfer_samples(
@@ -0,0 +1,103 @@
+import glob
+import hashlib
+import json
+import os
+import tempfile
+import zlib
+import xml.etree.ElementTree as ET
+from typing import Optional
+from .TEDn import EncodedGold, NoteContentCoder, TEDnNode
+from ..symbolic.Pruner import Pruner
+
+
+GOLD_CACHE_VERSION = 1
+"Increment when the cache entry format or the gold preparation changes"
+
+
+class GoldCache:
+    """On-disk cache of gold MusicXML samples prepared for TEDn (parsed,
+    converted to fractional durations, pruned and with encoded notes),
+    so that repeated evaluations only pay for the prediction side.
+
+    Entries are keyed by the hash of the gold string, the flavor and the
+    versions of the cache format, the Pruner and the note coder rules,
+    so entries prepared by other versions of the rules are never used.
+    Each entry is a zlib-compressed file with a JSON header line (versions,
+    gold cost, note coder state) followed by the encoded gold tree without
+    the elements TEDn ignores.
+    """
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def versions() -> list:
+        return [
+            GOLD_CACHE_VERSION,
+            Pruner.RULES_VERSION,
+            NoteContentCoder.RULES_VERSION
+        ]
+
+    def key(self, gold_musicxml: str, flavor: str, canonicalize_gold: bool) -> str:
+        """Computes the cache key of a gold sample"""
+        digest = hashlib.sha256()
+        digest.update(json.dumps(
+            [self.versions(), flavor, canonicalize_gold]
+        ).encode("utf-8"))
+        digest.update(gold_musicxml.encode("utf-8"))
+        return digest.hexdigest()
+
+    def load(self, key: str) -> Optional[EncodedGold]:
+        """Returns the cached encoded gold, or None if not cached"""
+        try:
+            with open(self._entry_path(key), "rb") as file:
+                data = zlib.decompress(file.read()).decode("utf-8")
+        except FileNotFoundError:
+            return None
+
+        header_line, tree_string = data.split("\n", 1)
+        header = json.loads(header_line)
+        if header["versions"] != self.versions():
+            return None
+
+        coder = NoteContentCoder()
+        for pitch_index, code in header["pitch_codes"]:
+            coder.pitch_coder.codes[tuple(pitch_index)] = code
+        coder.pitch_coder.n_pitches = len(coder.pitch_coder.codes)
+
+        return EncodedGold(
+            root=TEDnNode.from_element(ET.fromstring(tree_string)),
+            coder=coder,
+            gold_cost=header["gold_cost"]
+        )
+
+    def store(self, key: str, encoded_gold: EncodedGold):
+        """Stores the encoded gold, the write is atomic so that multiple
+        processes may share the cache"""
+        header = {
+            "versions": self.versions(),
+            "gold_cost": encoded_gold.gold_cost,
+            "pitch_codes": [
+                [list(pitch_index), code] for pitch_index, code
+                in encoded_gold.coder.pitch_coder.codes.items()
+            ],
+        }
+        tree_string = str(
+            ET.tostring(encoded_gold.root.to_element()), "utf-8"
+        )
+        data = json.dumps(header) + "\n" + tree_string
+
+        fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        with os.fdopen(fd, "wb") as file:
+            file.write(zlib.compress(data.encode("utf-8")))
+        os.replace(temp_path, self._entry_path(key))
+
+    def clear(self):
+        """Removes all the cache entries"""
+        for path in glob.glob(os.path.join(self.cache_dir, "*.gold")):
+            os.remove(path)
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key + ".gold")
+
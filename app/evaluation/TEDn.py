@@ -1,9 +1,12 @@
 import xml.etree.ElementTree as ET
-import zss
 import time
 import Levenshtein
-from typing import List, Tuple
+from collections import Counter
+from typing import Dict, List, Tuple, Optional, Type, Literal, Union
 import copy
+import hashlib
+from .zhang_shasha import tree_edit_distance, aligned_children_edit_distance, \
+    UpdateCostTable, BudgetExceeded
 
 
 # Modifications, bugfixes, and notes regarding the source code:
@@ -30,9 +33,20 @@ import copy
 # 11. Filtered out some additional sound-related and metadata-related elements.
 # 12. Added more pitch encoding characters, since the corpus required it.
 # 13. Added .strip() for Xml4ZSS_Levenshtein in text comparison (was forgotten).
-
-
-def TEDn(predicted_element: ET.Element, gold_element: ET.Element) -> "TEDnResult":
+# 14. Replaced the zss library with an array-based Zhang-Shasha implementation
+#       (see zhang_shasha.py), which computes identical costs, only faster.
+# 15. Notes are encoded while building lightweight TEDnNode trees, instead of
+#       encoding deep copies of the input elements (the inputs are not modified).
+
+
+def TEDn(
+    predicted_element: ET.Element,
+    gold_element: Union[ET.Element, "EncodedGold"],
+    gold_cost: Optional[int] = None,
+    mode: Literal["exact", "measurewise"] = "exact",
+    max_nodes: Optional[int] = None,
+    time_limit_seconds: Optional[float] = None
+) -> "TEDnResult":
     """
     Provide two <part> elements or <score-partwise> elements to compute
     the edit cost via the TEDn edit distance from the paper:
@@ -43,59 +57,258 @@ def TEDn(predicted_element: ET.Element, gold_element: ET.Element) -> "TEDnResult
 
     The code is based on:
     https://github.com/ufal/omreval/blob/master/evaluations/code/omreval/omreval/treedist_eval.py
+
+    The gold_cost (returned in a previous result for the same gold element)
+    may be passed in to skip its computation. The gold element may also be
+    given already encoded (see encode_gold), e.g. loaded from a cache.
+
+    The "measurewise" mode aligns measures of the two parts and sums edit
+    costs of the aligned measures, which is much faster for large inputs.
+    It ignores edits crossing measure boundaries, so its cost is an upper
+    bound of the "exact" mode cost (they are equal in most cases).
+
+    The computation may be budgeted by the maximum number of nodes
+    of either tree and by a time limit. Over budget, the distance is not
+    computed and the result is marked as bounded: the edit cost is then
+    the upper bound of the distance, also the lower bound is reported
+    (see edit_cost_bounds). In the "exact" mode with a time limit, the
+    upper bound is then tightened by the "measurewise" cost, within another
+    time limit. Over the node budget alone, no distance is ever computed.
     """
-    assert gold_element.tag in ["part", "score-partwise"], "Unsupported input element type"
-    assert gold_element.tag == predicted_element.tag, "Both arguments must be of the same element type"
+    assert mode in ["exact", "measurewise"], "Unsupported TEDn mode"
+    encoded_gold = gold_element if isinstance(gold_element, EncodedGold) else None
+    gold_tag = encoded_gold.root.tag if encoded_gold is not None else gold_element.tag
+    assert gold_tag in ["part", "score-partwise"], "Unsupported input element type"
+    assert gold_tag == predicted_element.tag, "Both arguments must be of the same element type"
     
     start_time = time.time()
 
     # what metric to use (hardcode the TEDn metric)
     metric_class = Xml4ZSS_Levenshtein
 
-    # for the TEDn metric, we need to encode (semi-flatten) notes
-    if metric_class is Xml4ZSS_Levenshtein:
+    # for the TEDn metric, we need to encode (semi-flatten) notes,
+    # this is done while building lightweight nodes, the inputs stay untouched
+    if encoded_gold is not None:
+        coder = copy.deepcopy(encoded_gold.coder)
+        gold_root = encoded_gold.root
+        gold_cost = encoded_gold.gold_cost
+    else:
         coder = NoteContentCoder()
-        gold_element = encode_notes(copy.deepcopy(gold_element), coder)
-        predicted_element = encode_notes(copy.deepcopy(predicted_element), coder)
+        gold_root = build_tedn_nodes(gold_element, coder)
+    predicted_root = build_tedn_nodes(predicted_element, coder)
+
+    # identical subtrees have zero edit distance, so an identical prediction
+    # (or identical measures in the measurewise mode) needs no computation
+    subtree_hashes = hash_subtrees(gold_root)
+    subtree_hashes.update(hash_subtrees(predicted_root))
+    shortcut_hits, shortcut_checks = 1, 1
+
+    # update costs of node label pairs are computed once per evaluation
+    cost_table = UpdateCostTable(metric_class)
+
+    # cheap bounds first, the distance is not computed over the budget
+    # (or when the bounds already determine it)
+    budgeted = max_nodes is not None or time_limit_seconds is not None
+    deadline = None
+    if time_limit_seconds is not None:
+        deadline = time.monotonic() + time_limit_seconds
+    lower_bound, upper_bound, bounded = None, None, False
+    if budgeted:
+        lower_bound, upper_bound, largest_size = edit_cost_bounds(
+            predicted_root, gold_root, metric_class
+        )
+        bounded = max_nodes is not None and largest_size > max_nodes
 
     # Argument order: "How much does it cost to turn prediction into the true tree?"
-    edit_cost = zss.distance(
-        predicted_element, gold_element,
-        get_children=metric_class.get_children,
-        update_cost=metric_class.update,
-        insert_cost=metric_class.insert,
-        remove_cost=metric_class.remove
-    )
+    try:
+        if subtree_hashes[predicted_root] == subtree_hashes[gold_root]:
+            edit_cost = 0
+            bounded = False
+        elif budgeted and (bounded or lower_bound == upper_bound):
+            raise BudgetExceeded()
+        elif mode == "exact":
+            edit_cost = tree_edit_distance(
+                predicted_root, gold_root, metric_class, cost_table, deadline
+            )
+            shortcut_hits = 0
+        else:
+            edit_cost, shortcut_hits, shortcut_checks = aligned_children_edit_distance(
+                predicted_root, gold_root, metric_class, subtree_hashes,
+                cost_table, deadline
+            )
+    except BudgetExceeded:
+        shortcut_hits, shortcut_checks = 0, 0
+        if mode == "exact" and lower_bound != upper_bound \
+                and time_limit_seconds is not None:
+            # tighten the upper bound by the measurewise alignment,
+            # within another time limit (the node budget has no such limit)
+            deadline = time.monotonic() + time_limit_seconds
+            try:
+                upper_bound = min(upper_bound, aligned_children_edit_distance(
+                    predicted_root, gold_root, metric_class, subtree_hashes,
+                    cost_table, deadline
+                )[0])
+            except BudgetExceeded:
+                pass
+        edit_cost = upper_bound
+        bounded = lower_bound != upper_bound
 
     # the cost to create the gold tree from one-node tree
     # (used for error normalization)
-    # (this computation is fast, O(N) compared to the previous one O(N^2))
-    gold_cost = zss.distance(
-        ET.Element(predicted_element.tag), gold_element,
-        get_children=metric_class.get_children,
-        update_cost=metric_class.update,
-        insert_cost=metric_class.insert,
-        remove_cost=metric_class.remove
-    )
+    if gold_cost is None:
+        gold_cost = gold_tree_cost(
+            TEDnNode(predicted_root.tag, None, ()), gold_root, metric_class
+        )
     
     end_time = time.time()
 
     return TEDnResult(
         gold_cost=gold_cost,
         edit_cost=edit_cost,
-        evaluation_time_seconds=(end_time - start_time)
+        evaluation_time_seconds=(end_time - start_time),
+        shortcut_hits=shortcut_hits,
+        shortcut_checks=shortcut_checks,
+        update_cost_hits=cost_table.hits,
+        update_cost_misses=cost_table.misses,
+        bounded=bounded,
+        lower_bound=lower_bound,
+        upper_bound=upper_bound
     )
 
 
+def edit_cost_bounds(
+    tree_a: ET.Element,
+    tree_b: ET.Element,
+    metric_class: Type
+) -> Tuple[int, int, int]:
+    """Computes cheap bounds of the Xml4ZSS_Levenshtein edit distance from
+    tree A to tree B in a single traversal of each tree. Returns the lower
+    bound, the upper bound and the number of nodes of the larger tree.
+
+    The lower bound counts the nodes of the larger tree that cannot be
+    matched to an equally labeled node of the other tree (by the multisets
+    of labels), each of them costs at least one removal, insertion or update.
+    The upper bound removes everything below the root and inserts the
+    other tree below it."""
+    def summarize(root: ET.Element, cost_function) -> Tuple[Counter, int]:
+        # labels are compared the way the update cost compares them
+        labels = Counter()
+        total = 0
+        stack = [root]
+        while len(stack) > 0:
+            element = stack.pop()
+            if element.tag == "note":
+                labels[(element.tag, element.text or "")] += 1
+            else:
+                labels[(element.tag, (element.text or "").strip())] += 1
+            if element is not root:
+                total += cost_function(element)
+            stack.extend(metric_class.get_children(element))
+        return labels, total
+
+    labels_a, remove_total = summarize(tree_a, metric_class.remove)
+    labels_b, insert_total = summarize(tree_b, metric_class.insert)
+
+    size_a = sum(labels_a.values())
+    size_b = sum(labels_b.values())
+    common = sum((labels_a & labels_b).values())
+    lower_bound = max(size_a, size_b) - common
+    upper_bound = metric_class.update(tree_a, tree_b) + remove_total + insert_total
+    return lower_bound, upper_bound, max(size_a, size_b)
+
+
+def gold_tree_cost(
+    single_node: ET.Element,
+    gold_element: ET.Element,
+    metric_class: Type
+) -> int:
+    """Computes the edit distance from a one-node tree to the gold tree
+    in a single O(N) traversal, without running the tree edit distance.
+    The single node is either removed, or relabeled to one of the gold nodes
+    (the root, under the TEDn costs), all the other gold nodes are inserted."""
+    insert_total = 0
+    best_single_node_cost = metric_class.remove(single_node)
+    update_costs = {} # (tag, text) -> update cost minus insert cost
+    stack = [gold_element]
+    while len(stack) > 0:
+        element = stack.pop()
+        insert_cost = metric_class.insert(element)
+        insert_total += insert_cost
+        label = (element.tag, element.text)
+        if label not in update_costs:
+            update_costs[label] = metric_class.update(single_node, element)
+        best_single_node_cost = min(
+            best_single_node_cost,
+            update_costs[label] - insert_cost
+        )
+        stack.extend(metric_class.get_children(element))
+    return insert_total + best_single_node_cost
+
+
+class EncodedGold:
+    """Gold element prepared for TEDn: nodes with encoded notes, the state of
+    the note coder after the encoding (predictions are encoded with it next)
+    and the gold cost"""
+    def __init__(self, root: "TEDnNode", coder: "NoteContentCoder", gold_cost: int):
+        self.root = root
+        self.coder = coder
+        self.gold_cost = gold_cost
+
+
+def encode_gold(gold_element: ET.Element) -> EncodedGold:
+    """Encodes the gold element for TEDn, the element is not modified"""
+    coder = NoteContentCoder()
+    root = build_tedn_nodes(gold_element, coder)
+    gold_cost = gold_tree_cost(
+        TEDnNode(root.tag, None, ()), root, Xml4ZSS_Levenshtein
+    )
+    return EncodedGold(root, coder, gold_cost)
+
+
 class TEDnResult:
     def __init__(self,
         gold_cost: int,
         edit_cost: int,
-        evaluation_time_seconds: float
+        evaluation_time_seconds: float,
+        shortcut_hits: int = 0,
+        shortcut_checks: int = 0,
+        update_cost_hits: int = 0,
+        update_cost_misses: int = 0,
+        bounded: bool = False,
+        lower_bound: Optional[int] = None,
+        upper_bound: Optional[int] = None
     ):
         self.gold_cost = int(gold_cost)
         self.edit_cost = int(edit_cost)
         self.evaluation_time_seconds: float = evaluation_time_seconds
+
+        self.shortcut_hits = shortcut_hits
+        "How many (sub)tree distances were resolved as identical subtrees"
+
+        self.shortcut_checks = shortcut_checks
+        "How many (sub)tree distances were needed in total"
+
+        self.update_cost_hits = update_cost_hits
+        "How many label pair update costs were reused from the memo"
+
+        self.update_cost_misses = update_cost_misses
+        "How many label pair update costs were computed by the metric"
+
+        self.bounded = bounded
+        """Whether the evaluation was over budget, so that the edit cost
+        is only the upper bound of the distance"""
+
+        self.lower_bound = lower_bound
+        "Lower bound of the edit cost (computed in budgeted evaluations)"
+
+        self.upper_bound = upper_bound
+        "Upper bound of the edit cost (computed in budgeted evaluations)"
+    
+    @property
+    def shortcut_hit_rate(self) -> float:
+        if self.shortcut_checks == 0:
+            return 0.0
+        return self.shortcut_hits / self.shortcut_checks
     
     @property
     def normalized_edit_cost(self) -> float:
@@ -141,7 +354,7 @@ class ZSSMetricClass(object):
 class Xml4ZSS(ZSSMetricClass):
     """A class that defines how edit operation costs should
     be computed from ``xml.etree.ElementTree.Element`` nodes.
-    Pass to ``zss.distance()``"""
+    Pass to ``tree_edit_distance()`` (or ``zss.distance()``)"""
     @staticmethod
     def get_children(e: ET.Element) -> List[ET.Element]:
         return list(e)
@@ -366,6 +579,9 @@ class NoteContentCoder(object):
     REST_CODE = 'R'
     MISSING_PITCH_CODE = '~'
 
+    RULES_VERSION = 1
+    "Increment when the encoding changes, invalidates cached encoded gold data"
+
     ENCODES_TAGS = ['pitch', 'voice', 'type', 'stem']
 
     def __init__(self):
@@ -417,3 +633,99 @@ def encode_notes(root: ET.Element, coder: NoteContentCoder):
             note.remove(e)
 
     return root
+
+
+##############
+# TEDn nodes #
+##############
+
+
+class TEDnNode:
+    """Lightweight immutable tree node, as seen by the Xml4ZSS_Levenshtein
+    metric: filtered children and encoded note text. Iterating the node
+    yields its children, like with ElementTree elements, so the metric
+    classes work with both."""
+    __slots__ = ("tag", "text", "children")
+
+    def __init__(self, tag: str, text: Optional[str], children: Tuple["TEDnNode", ...]):
+        self.tag = tag
+        self.text = text
+        self.children = children
+
+    def __iter__(self):
+        return iter(self.children)
+
+    def __len__(self) -> int:
+        return len(self.children)
+
+    def to_element(self) -> ET.Element:
+        """Converts the node tree to ElementTree elements"""
+        element = ET.Element(self.tag)
+        element.text = self.text
+        element.extend(child.to_element() for child in self.children)
+        return element
+
+    @staticmethod
+    def from_element(element: ET.Element) -> "TEDnNode":
+        """Converts elements to nodes as they are, without any filtering
+        or encoding (the inverse of to_element)"""
+        return TEDnNode(
+            element.tag,
+            element.text,
+            tuple(TEDnNode.from_element(child) for child in element)
+        )
+
+
+def build_tedn_nodes(element: ET.Element, coder: NoteContentCoder) -> TEDnNode:
+    """Builds TEDn nodes from the element, filtering children and encoding
+    notes like encode_notes does, but without copying or modifying the element.
+    Notes are encoded in document order, so that the pitch codes are
+    assigned exactly as by encode_notes."""
+    text = element.text
+    kept_children = Xml4ZSS_Filtered.get_children(element)
+
+    if element.tag == "note":
+        text = coder.encode(element)
+        kept_children = [
+            child for child in kept_children
+            if child.tag not in NoteContentCoder.ENCODES_TAGS
+        ]
+    
+    children = []
+    kept_index = 0
+    for child in element:
+        if kept_index < len(kept_children) and child is kept_children[kept_index]:
+            children.append(build_tedn_nodes(child, coder))
+            kept_index += 1
+        else:
+            # notes in ignored subtrees still take pitch codes in encode_notes
+            for note in child.iter("note"):
+                coder.encode(note)
+
+    return TEDnNode(element.tag, text, tuple(children))
+
+
+def hash_subtrees(root: TEDnNode) -> Dict[TEDnNode, bytes]:
+    """Computes Merkle-style structural hashes of all subtrees, as seen by
+    the Xml4ZSS_Levenshtein metric (filtered children, stripped text except
+    for encoded notes). Subtrees with equal hashes have zero edit distance."""
+    hashes: Dict[TEDnNode, bytes] = {}
+    stack = [(root, False)]
+    while len(stack) > 0:
+        element, visited = stack.pop()
+        children = Xml4ZSS_Filtered.get_children(element)
+        if not visited:
+            stack.append((element, True))
+            stack.extend((child, False) for child in reversed(children))
+            continue
+        if element.tag == "note":
+            text = element.text or ""
+        else:
+            text = (element.text or "").strip()
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(element.tag.encode("utf-8") + b"\0")
+        digest.update(text.encode("utf-8") + b"\0")
+        for child in children:
+            digest.update(hashes[child])
+        hashes[element] = digest.digest()
+    return hashes
@@ -1,20 +1,31 @@
 from ..linearization.Delinearizer import Delinearizer
-from .TEDn import TEDn, TEDnResult
+from .TEDn import TEDn, TEDnResult, EncodedGold, encode_gold
+from .GoldCache import GoldCache
 from ..symbolic.Pruner import Pruner
-from ..symbolic.actual_durations_to_fractional import actual_durations_to_fractional
+from ..symbolic.NormalizationPlan import NormalizationPlan
 from ..symbolic.debug_compare import compare_parts
 import xml.etree.ElementTree as ET
-from typing import TextIO, Optional, Literal
+from typing import Dict, TextIO, Optional, Literal, Tuple
+import hashlib
 import traceback
 
 
+# gold costs of already evaluated gold samples,
+# keyed by (the gold MusicXML hash, flavor)
+_GOLD_COST_CACHE: Dict[Tuple[str, str], int] = {}
+
+
 def TEDn_lmx_xml(
     predicted_lmx: str,
     gold_musicxml: str,
     flavor: Literal["full", "lmx"],
     debug=False,
     canonicalize_gold=True,
-    errout: Optional[TextIO] = None
+    errout: Optional[TextIO] = None,
+    mode: Literal["exact", "measurewise"] = "exact",
+    gold_cache: Optional[GoldCache] = None,
+    max_nodes: Optional[int] = None,
+    time_limit_seconds: Optional[float] = None
 ) -> TEDnResult:
     """
     Provides access to the TEDn metric with a nice string-based interface.
@@ -37,25 +48,76 @@ def TEDn_lmx_xml(
         Not necessary, but recommended. It primarily strips away whitespace
         (but TEDn ignores whitespace anyway).
     :param Optional[TextIO] errout: Delinearizer soft and hard errors are sent here.
+    :param str mode: Use 'exact' for the full tree edit distance, or 'measurewise'
+        to align measures first and compute the distance measure by measure,
+        which is an upper bound of the exact cost, but much faster.
+    :param Optional[GoldCache] gold_cache: On-disk cache of the prepared gold data,
+        so that only the prediction is processed when evaluating the same
+        gold data repeatedly. Not used in the debug mode.
+    :param Optional[int] max_nodes: When either part has more TEDn nodes,
+        the distance is not computed and the result is only bounded.
+    :param Optional[float] time_limit_seconds: When the distance computation
+        takes longer, it is stopped and the result is only bounded.
     """
 
     assert flavor in {"full", "lmx"}
+    return TEDn_lmx_xml_flavors(
+        predicted_lmx=predicted_lmx,
+        gold_musicxml=gold_musicxml,
+        flavors=(flavor,),
+        debug=debug,
+        canonicalize_gold=canonicalize_gold,
+        errout=errout,
+        mode=mode,
+        gold_cache=gold_cache,
+        max_nodes=max_nodes,
+        time_limit_seconds=time_limit_seconds
+    )[flavor]
+    # return TEDnResult(1, 1, 1) # debugging
 
-    # preprocess gold XML to remove whitespace
-    # (not necessary after the TEDn .strip() bugfix, but present just in case...)
-    if canonicalize_gold:
-        gold_musicxml = ET.canonicalize(
-            gold_musicxml,
-            strip_text=True
-        )
 
-    # prepare gold data
-    gold_score = ET.fromstring(gold_musicxml)
-    assert gold_score.tag == "score-partwise"
-    gold_parts = gold_score.findall("part")
-    assert len(gold_parts) == 1
-    gold_part = gold_parts[0]
-    actual_durations_to_fractional(gold_part) # evaluate in fractional durations
+def TEDn_lmx_xml_flavors(
+    predicted_lmx: str,
+    gold_musicxml: str,
+    flavors: Tuple[Literal["full", "lmx"], ...] = ("full", "lmx"),
+    debug=False,
+    canonicalize_gold=True,
+    errout: Optional[TextIO] = None,
+    mode: Literal["exact", "measurewise"] = "exact",
+    gold_cache: Optional[GoldCache] = None,
+    max_nodes: Optional[int] = None,
+    time_limit_seconds: Optional[float] = None
+) -> Dict[str, TEDnResult]:
+    """
+    Computes TEDn_lmx_xml in multiple flavors at once, returning results
+    keyed by the flavor. The prediction is delinearized and the gold data
+    are parsed only once, then the 'lmx' flavor prunes both in place
+    (after the 'full' flavor has been evaluated). See TEDn_lmx_xml for
+    the description of the arguments.
+    """
+    assert set(flavors) <= {"full", "lmx"}
+    # "full" is evaluated before pruning for "lmx"
+    flavors = [flavor for flavor in ["full", "lmx"] if flavor in flavors]
+
+    # the gold side is loaded from the cache when possible
+    # (debugging compares the prepared parts, so it needs the gold part)
+    encoded_golds: Dict[str, EncodedGold] = {}
+    cache_keys: Dict[str, str] = {}
+    if gold_cache is not None and not debug:
+        for flavor in flavors:
+            cache_keys[flavor] = gold_cache.key(gold_musicxml, flavor, canonicalize_gold)
+            encoded_gold = gold_cache.load(cache_keys[flavor])
+            if encoded_gold is not None:
+                encoded_golds[flavor] = encoded_gold
+    # the gold part is prepared for the first flavor that needs it,
+    # so that the lmx flavor alone is pruned within the same traversal
+    gold_part: Optional[ET.Element] = None
+    gold_part_flavor: Optional[str] = None
+    for flavor in flavors:
+        if flavor not in encoded_golds:
+            gold_part_flavor = flavor
+            gold_part = _prepare_gold_part(gold_musicxml, flavor, canonicalize_gold)
+            break
 
     # prepare predicted data
     try:
@@ -70,29 +132,93 @@ def TEDn_lmx_xml(
         if errout is not None:
             print("DELINEARIZATION CRASHED:", traceback.format_exc(), file=errout)
         predicted_part = ET.Element("part") # pretend empty output
-    
-    # prune down to the elements that we actually predict
-    # (otherwise TEDn penalizes missing <direction> and various ornaments)
-    if flavor == "lmx":
-        pruner = Pruner(
-            
-            # these are acutally also ignored by TEDn
-            prune_durations=False, # MUST BE FALSE! Is used in backups and forwards
-            prune_measure_attributes=False,
-            prune_prints=True,
-            prune_slur_numbering=True,
-
-            # these measure elements are not encoded in LMX, prune them
-            prune_directions=True,
-            prune_barlines=True,
-            prune_harmony=True,
-            
+
+    results: Dict[str, TEDnResult] = {}
+    for flavor in flavors:
+        # prune down to the elements that we actually predict
+        # (otherwise TEDn penalizes missing <direction> and various ornaments)
+        if flavor == "lmx":
+            _create_lmx_pruner().process_part(predicted_part)
+            if gold_part_flavor == "full" and flavor not in encoded_golds:
+                _create_lmx_pruner().process_part(gold_part)
+
+        if flavor in cache_keys and flavor not in encoded_golds:
+            encoded_golds[flavor] = encode_gold(gold_part)
+            gold_cache.store(cache_keys[flavor], encoded_golds[flavor])
+
+        if flavor in encoded_golds:
+            results[flavor] = TEDn(
+                predicted_part,
+                encoded_golds[flavor],
+                mode=mode,
+                max_nodes=max_nodes,
+                time_limit_seconds=time_limit_seconds
+            )
+            continue
+
+        if debug:
+            compare_parts(expected=gold_part, given=predicted_part)
+
+        gold_key = (hashlib.sha1(gold_musicxml.encode("utf-8")).hexdigest(), flavor)
+        results[flavor] = TEDn(
+            predicted_part,
+            gold_part,
+            gold_cost=_GOLD_COST_CACHE.get(gold_key),
+            mode=mode,
+            max_nodes=max_nodes,
+            time_limit_seconds=time_limit_seconds
         )
-        pruner.process_part(gold_part)
-        pruner.process_part(predicted_part)
+        _GOLD_COST_CACHE[gold_key] = results[flavor].gold_cost
 
-    if debug:
-        compare_parts(expected=gold_part, given=predicted_part)
+    return results
 
-    return TEDn(predicted_part, gold_part)
-    # return TEDnResult(1, 1, 1) # debugging
+
+def _prepare_gold_part(
+    gold_musicxml: str,
+    flavor: Literal["full", "lmx"],
+    canonicalize_gold: bool
+) -> ET.Element:
+    # preprocess gold XML to remove whitespace
+    # (not necessary after the TEDn .strip() bugfix, but present just in case...)
+    if canonicalize_gold:
+        gold_musicxml = ET.canonicalize(
+            gold_musicxml,
+            strip_text=True
+        )
+
+    # prepare gold data
+    gold_score = ET.fromstring(gold_musicxml)
+    assert gold_score.tag == "score-partwise"
+    gold_parts = gold_score.findall("part")
+    assert len(gold_parts) == 1
+    gold_part = gold_parts[0]
+
+    # evaluate in fractional durations (and prune for the lmx flavor),
+    # all in a single traversal of the gold part
+    _GOLD_NORMALIZATION_PLANS[flavor].process_part(gold_part)
+    
+    return gold_part
+
+
+def _create_lmx_pruner() -> Pruner:
+    return Pruner(
+        
+        # these are acutally also ignored by TEDn
+        prune_durations=False, # MUST BE FALSE! Is used in backups and forwards
+        prune_measure_attributes=False,
+        prune_prints=True,
+        prune_slur_numbering=True,
+
+        # these measure elements are not encoded in LMX, prune them
+        prune_directions=True,
+        prune_barlines=True,
+        prune_harmony=True,
+        
+    )
+
+
+# gold part preparation for each flavor, compiled once
+_GOLD_NORMALIZATION_PLANS: Dict[str, NormalizationPlan] = {
+    "full": NormalizationPlan(None, fractional_durations=True),
+    "lmx": NormalizationPlan(_create_lmx_pruner(), fractional_durations=True),
+}
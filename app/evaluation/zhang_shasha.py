@@ -0,0 +1,437 @@
+import xml.etree.ElementTree as ET
+import time
+import numpy as np
+from typing import Dict, List, Optional, Tuple, Type
+
+
+# Array-based implementation of the Zhang-Shasha tree edit distance,
+# computing exactly what zss.distance computes, only much faster.
+#
+# Both trees are compiled into postorder arrays (label IDs, leftmost leaf
+# descendants, keyroots, insert/remove costs). The update cost depends only
+# on the (tag, text) label of the two nodes (true for all the Xml4ZSS metric
+# classes), so it is computed once per distinct label pair. Labels are interned
+# by an UpdateCostTable, which may be shared by multiple distance computations
+# (e.g. of all the measure pairs of one evaluation) to compute each pair once.
+#
+# The forest distance tables of one keyroot of the first tree are computed
+# against all the keyroots of the second tree at once: the columns of all
+# these tables are concatenated into one long row and each row is computed
+# by a few vector operations. The only sequential dependency within a row
+# (the insertion term) is resolved by a segmented minimum-prefix-scan.
+
+
+_INFINITY = np.int64(2 ** 40)
+
+
+class BudgetExceeded(Exception):
+    """Raised when a distance computation runs past its deadline"""
+    pass
+
+
+class UpdateCostTable:
+    """Interns node labels, i.e. (tag, text) pairs, to integer IDs and
+    memoizes the update costs between pairs of labels, so that the metric
+    update function is called once per distinct pair of labels"""
+    def __init__(self, metric_class: Type):
+        self.metric_class = metric_class
+
+        self.labels: Dict[Tuple, int] = {}
+        "Label ID of each interned (tag, text) pair"
+
+        self.representatives: List[ET.Element] = []
+        "The first node seen with each label, by label ID"
+
+        self.costs: Dict[Tuple[int, int], int] = {}
+        "Memoized update costs of label ID pairs"
+
+        self.hits = 0
+        "How many update costs were taken from the memo"
+
+        self.misses = 0
+        "How many update costs had to be computed"
+
+    def intern(self, node: ET.Element) -> int:
+        """Returns the label ID of the node"""
+        label = (node.tag, node.text)
+        label_id = self.labels.get(label)
+        if label_id is None:
+            label_id = len(self.labels)
+            self.labels[label] = label_id
+            self.representatives.append(node)
+        return label_id
+
+    def update_cost(self, label_a: int, label_b: int) -> int:
+        """Returns the cost of updating label A to label B"""
+        key = (label_a, label_b)
+        cost = self.costs.get(key)
+        if cost is None:
+            self.misses += 1
+            cost = self.metric_class.update(
+                self.representatives[label_a],
+                self.representatives[label_b]
+            )
+            self.costs[key] = cost
+        else:
+            self.hits += 1
+        return cost
+
+    def matrix(self, labels_a: List[int], labels_b: List[int]) -> np.ndarray:
+        """Update costs between the given label IDs as an array"""
+        matrix = np.zeros((len(labels_a), len(labels_b)), dtype=np.int64)
+        for i, label_a in enumerate(labels_a):
+            for j, label_b in enumerate(labels_b):
+                matrix[i, j] = self.update_cost(label_a, label_b)
+        return matrix
+
+
+class CompiledTree:
+    """A tree compiled into postorder arrays for the tree edit distance"""
+    def __init__(self, root: ET.Element, metric_class: Type, cost_table: UpdateCostTable):
+        nodes: List[ET.Element] = []
+        lmds: List[int] = []
+
+        # iterative postorder, children in document order,
+        # the subtree of a node spans the postorder indices lmd..node
+        stack = [(root, False)]
+        first_indices: List[int] = []
+        while len(stack) > 0:
+            element, visited = stack.pop()
+            if visited:
+                lmds.append(first_indices.pop())
+                nodes.append(element)
+                continue
+            first_indices.append(len(nodes))
+            stack.append((element, True))
+            for child in reversed(metric_class.get_children(element)):
+                stack.append((child, False))
+
+        self.nodes = nodes
+        "Nodes in postorder"
+
+        self.size = len(nodes)
+
+        self.lmds = np.array(lmds, dtype=np.int64)
+        "Postorder index of the leftmost leaf descendant of each node"
+
+        keyroots: Dict[int, int] = {}
+        for i, lmd in enumerate(lmds):
+            keyroots[lmd] = i
+        self.keyroots: List[int] = sorted(keyroots.values())
+        "Keyroots in increasing postorder (the highest node for each leftmost leaf)"
+
+        self.labels = np.array(
+            [cost_table.intern(node) for node in nodes],
+            dtype=np.int64
+        )
+        "Label ID of each node, labels are (tag, text) pairs"
+
+        self.insert_costs = np.array(
+            [metric_class.insert(node) for node in nodes],
+            dtype=np.int64
+        )
+        self.remove_costs = np.array(
+            [metric_class.remove(node) for node in nodes],
+            dtype=np.int64
+        )
+
+
+def tree_edit_distance(
+    tree_a: ET.Element,
+    tree_b: ET.Element,
+    metric_class: Type,
+    cost_table: Optional[UpdateCostTable] = None,
+    deadline: Optional[float] = None
+) -> int:
+    """Computes the cost of turning tree A into tree B, using the
+    get_children, update, insert and remove methods of the metric class
+    (e.g. Xml4ZSS_Levenshtein). Equals zss.distance with the same callbacks.
+
+    The update costs are memoized in the given cost table (of the same
+    metric class), or in a new one if not given. When the deadline
+    (in time.monotonic() seconds) passes, BudgetExceeded is raised."""
+    if cost_table is None:
+        cost_table = UpdateCostTable(metric_class)
+    assert cost_table.metric_class is metric_class
+    a = CompiledTree(tree_a, metric_class, cost_table)
+    b = CompiledTree(tree_b, metric_class, cost_table)
+
+    # the table labels are shared with other computations,
+    # renumber labels of these trees to index a compact cost matrix
+    a_labels, a.labels = np.unique(a.labels, return_inverse=True)
+    b_labels, b.labels = np.unique(b.labels, return_inverse=True)
+    update_costs = cost_table.matrix(a_labels.tolist(), b_labels.tolist())
+
+    # vectorize over the larger tree, the distance is symmetric
+    # when swapping insertions with removals
+    if a.size > b.size:
+        return _zhang_shasha(
+            rows=b, row_costs=b.insert_costs,
+            columns=a, column_costs=a.remove_costs,
+            update_costs=update_costs.T,
+            deadline=deadline
+        )
+    return _zhang_shasha(
+        rows=a, row_costs=a.remove_costs,
+        columns=b, column_costs=b.insert_costs,
+        update_costs=update_costs,
+        deadline=deadline
+    )
+
+
+def _zhang_shasha(
+    rows: CompiledTree,
+    row_costs: np.ndarray,
+    columns: CompiledTree,
+    column_costs: np.ndarray,
+    update_costs: np.ndarray,
+    deadline: Optional[float]
+) -> int:
+    row_lmds = rows.lmds.tolist()
+    column_lmds = columns.lmds
+
+    # concatenated column layout: one segment per column keyroot,
+    # segment position 0 is the empty forest, position y is the node
+    # (lmd(j) - 1 + y) of the forest lmd(j)..j
+    segment_starts = []
+    column_nodes = []
+    for j in columns.keyroots:
+        segment_starts.append(len(column_nodes))
+        column_nodes.append(-1)
+        column_nodes.extend(range(int(column_lmds[j]), j + 1))
+    width = len(column_nodes)
+    column_nodes = np.array(column_nodes, dtype=np.int64)
+    segment_starts = np.array(segment_starts, dtype=np.int64)
+    segment_count = len(segment_starts)
+    is_first = column_nodes < 0
+    not_first = ~is_first
+    nodes = np.where(is_first, 0, column_nodes)
+
+    segment_ids = np.cumsum(is_first) - 1
+    keyroot_lmds = column_lmds[np.array(columns.keyroots, dtype=np.int64)][segment_ids]
+
+    # columns on the leftmost path of their keyroot (tree-to-tree cells)
+    is_tree = not_first & (column_lmds[nodes] == keyroot_lmds)
+
+    # where fd[p][q] is taken from (q index of the forest left of the node)
+    q_columns = segment_starts[segment_ids] + (column_lmds[nodes] - keyroot_lmds)
+
+    insert_costs = np.where(is_first, 0, column_costs[nodes])
+    cumulative = np.cumsum(insert_costs)
+    cumulative -= cumulative[segment_starts][segment_ids] # restart per segment
+
+    # segmented prefix-minimum via offsets decreasing with segments,
+    # so that the running minimum restarts at each segment
+    scan_offsets = cumulative - (segment_count - 1 - segment_ids) * (2 * _INFINITY)
+
+    all_columns = np.nonzero(not_first)[0]
+    all_nodes = nodes[all_columns]
+    all_q = q_columns[all_columns]
+
+    # keyroot nesting levels, on the leftmost path of a row keyroot a segment
+    # depends on tree distances computed within the same row by the segments
+    # of keyroots strictly inside it (lower levels), so go level by level
+    levels = _keyroot_levels(columns)
+    column_levels = np.array(
+        [levels[j] for j in columns.keyroots], dtype=np.int64
+    )[segment_ids]
+    level_steps = []
+    for level in range(int(column_levels.max()) + 1):
+        subset = np.nonzero(column_levels == level)[0]
+        non_tree = subset[not_first[subset] & ~is_tree[subset]]
+        tree = subset[is_tree[subset]]
+        level_steps.append((
+            subset, scan_offsets[subset],
+            non_tree, nodes[non_tree], cumulative[q_columns[non_tree]],
+            tree, nodes[tree], columns.labels[nodes[tree]],
+        ))
+
+    # (int32 storage, the costs are small integers)
+    tree_distances = np.zeros((rows.size, columns.size), dtype=np.int32)
+
+    for i in rows.keyroots:
+        lmd_i = row_lmds[i]
+        height = i - lmd_i + 2
+        forest = np.empty((height, width), dtype=np.int32)
+        forest[0] = cumulative
+
+        for x in range(1, height):
+            if deadline is not None and time.monotonic() > deadline:
+                raise BudgetExceeded()
+            node = lmd_i - 1 + x
+            removal = forest[x - 1] + row_costs[node]
+
+            if row_lmds[node] != lmd_i:
+                # the node is not on the leftmost path of the keyroot,
+                # all cells combine with already known tree distances
+                p = row_lmds[node] - lmd_i
+                removal[all_columns] = np.minimum(
+                    removal[all_columns],
+                    forest[p][all_q] + tree_distances[node, all_nodes]
+                )
+                forest[x] = np.minimum.accumulate(removal - scan_offsets) \
+                    + scan_offsets
+                continue
+
+            # the node is on the leftmost path, tree distances of this row
+            # are being computed here
+            label_costs = update_costs[rows.labels[node]]
+            row = forest[x]
+            previous = forest[x - 1]
+            for (
+                subset, subset_offsets,
+                non_tree, non_tree_nodes, non_tree_forest,
+                tree, tree_nodes, tree_labels
+            ) in level_steps:
+                removal[non_tree] = np.minimum(
+                    removal[non_tree],
+                    non_tree_forest + tree_distances[node, non_tree_nodes]
+                )
+                removal[tree] = np.minimum(
+                    removal[tree],
+                    previous[tree - 1] + label_costs[tree_labels]
+                )
+                row[subset] = np.minimum.accumulate(
+                    removal[subset] - subset_offsets
+                ) + subset_offsets
+                tree_distances[node, tree_nodes] = row[tree]
+
+    return int(tree_distances[rows.size - 1, columns.size - 1])
+
+
+def _keyroot_levels(tree: CompiledTree) -> Dict[int, int]:
+    """Nesting level of each keyroot: 0 if it contains no other keyroot,
+    otherwise one more than the highest level of the keyroots inside"""
+    # highest level of a keyroot within the subtree of each node,
+    # postorder subtree of node i is lmd(i)..i
+    keyroot_set = set(tree.keyroots)
+    lmds = tree.lmds.tolist()
+    levels: Dict[int, int] = {}
+    max_inside = [-1] * tree.size # max keyroot level within the subtree
+    # children of i are found by walking back from i - 1 by subtree spans
+    for i in range(tree.size):
+        best = -1
+        child = i - 1
+        while child >= lmds[i]:
+            best = max(best, max_inside[child])
+            child = lmds[child] - 1
+        if i in keyroot_set:
+            levels[i] = best + 1
+            max_inside[i] = levels[i]
+        else:
+            max_inside[i] = best
+    return levels
+
+
+def aligned_children_edit_distance(
+    tree_a: ET.Element,
+    tree_b: ET.Element,
+    metric_class: Type,
+    subtree_keys: Optional[Dict[ET.Element, bytes]] = None,
+    cost_table: Optional[UpdateCostTable] = None,
+    deadline: Optional[float] = None
+) -> Tuple[int, int, int]:
+    """Approximates the tree edit distance by keeping the roots matched and
+    aligning their children (e.g. the measures of a <part>) with a sequence
+    alignment, where aligned children cost their exact tree edit distance
+    and the others are removed or inserted as whole subtrees. Edits crossing
+    between children are not considered, so the result is an upper bound
+    of the exact distance (equal when no such edits are needed).
+
+    Distances of child pairs are computed lazily (only when the pair could
+    improve the alignment) and memoized by the children content. Subtree keys
+    (e.g. structural hashes) identify children with zero distance, otherwise
+    the children are serialized for the memoization. The update costs are
+    memoized across all the child pairs in the cost table. When the deadline
+    (in time.monotonic() seconds) passes, BudgetExceeded is raised.
+
+    Returns the cost, the number of child pairs resolved as identical and
+    the number of child pair distances needed in total."""
+    if cost_table is None:
+        cost_table = UpdateCostTable(metric_class)
+    children_a = metric_class.get_children(tree_a)
+    children_b = metric_class.get_children(tree_b)
+
+    def subtree_summary(root: ET.Element, cost_function) -> Tuple[int, int, int]:
+        total, size, cheapest = 0, 0, _INFINITY
+        stack = [root]
+        while len(stack) > 0:
+            element = stack.pop()
+            cost = cost_function(element)
+            total += cost
+            size += 1
+            cheapest = min(cheapest, cost)
+            stack.extend(metric_class.get_children(element))
+        return total, size, cheapest
+
+    removals = [subtree_summary(child, metric_class.remove) for child in children_a]
+    insertions = [subtree_summary(child, metric_class.insert) for child in children_b]
+    if subtree_keys is None:
+        keys_a = [_serialize(child, metric_class) for child in children_a]
+        keys_b = [_serialize(child, metric_class) for child in children_b]
+    else:
+        keys_a = [subtree_keys[child] for child in children_a]
+        keys_b = [subtree_keys[child] for child in children_b]
+
+    memo: Dict[Tuple[bytes, bytes], int] = {}
+    counts = [0, 0] # identical pairs, all pairs
+    def child_distance(i: int, j: int) -> int:
+        counts[1] += 1
+        if subtree_keys is not None and keys_a[i] == keys_b[j]:
+            counts[0] += 1
+            return 0
+        key = (keys_a[i], keys_b[j])
+        if key not in memo:
+            memo[key] = tree_edit_distance(
+                children_a[i], children_b[j], metric_class, cost_table, deadline
+            )
+        return memo[key]
+
+    # each node beyond the smaller subtree size must be removed or inserted,
+    # which costs at least the cheapest removal or insertion
+    min_remove = min([summary[2] for summary in removals], default=0)
+    min_insert = min([summary[2] for summary in insertions], default=0)
+    def lower_bound(i: int, j: int) -> int:
+        size_difference = removals[i][1] - insertions[j][1]
+        if size_difference > 0:
+            return size_difference * min_remove
+        return -size_difference * min_insert
+
+    n, m = len(children_a), len(children_b)
+    table = [[0] * (m + 1) for _ in range(n + 1)]
+    for i in range(1, n + 1):
+        table[i][0] = table[i - 1][0] + removals[i - 1][0]
+    for j in range(1, m + 1):
+        table[0][j] = table[0][j - 1] + insertions[j - 1][0]
+    for i in range(1, n + 1):
+        if deadline is not None and time.monotonic() > deadline:
+            raise BudgetExceeded()
+        for j in range(1, m + 1):
+            best = min(
+                table[i - 1][j] + removals[i - 1][0],
+                table[i][j - 1] + insertions[j - 1][0]
+            )
+            if table[i - 1][j - 1] + lower_bound(i - 1, j - 1) < best:
+                best = min(
+                    best,
+                    table[i - 1][j - 1] + child_distance(i - 1, j - 1)
+                )
+            table[i][j] = best
+
+    cost = metric_class.update(tree_a, tree_b) + table[n][m]
+    return cost, counts[0], counts[1]
+
+
+def _serialize(root: ET.Element, metric_class: Type) -> bytes:
+    """Serializes the tree as seen by the metric (tags, texts, children)"""
+    parts = []
+    stack = [root]
+    while len(stack) > 0:
+        element = stack.pop()
+        if element is None:
+            parts.append(")")
+            continue
+        parts.append(repr((element.tag, element.text)) + "(")
+        stack.append(None)
+        stack.extend(reversed(metric_class.get_children(element)))
+    return "".join(parts).encode("utf-8")
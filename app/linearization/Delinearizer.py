@@ -1,7 +1,9 @@
 import xml.etree.ElementTree as ET
-from typing import List, Optional, TextIO, Set
+from typing import List, Optional, TextIO, Set, Sequence, Tuple, Dict, Iterable, Any
 from .vocabulary import *
+from .duration_table import DURATION_GRID, duration_ticks
 import io
+import numpy as np
 from fractions import Fraction
 from ..symbolic.PitchAlternator import PitchAlternator
 from ..symbolic.get_head_attributes import get_head_attributes
@@ -34,6 +36,8 @@ ATTRIBUTES_ROOTS = set([
 
 
 class Token:
+    __slots__ = ("terminal", "position")
+
     def __init__(self, terminal: str, position: int):
         self.terminal = terminal
         self.position = position
@@ -46,6 +50,69 @@ class Tree:
         self.suffixes = suffixes
 
 
+class SlotTable:
+    """Dispatch table from terminals to the slots of a tree (e.g. the pitch
+    or the stem of a note), so that a tree is classified in a single pass.
+    Single slots keep one token (the last prefix or the first suffix,
+    others are reported as additional), multi slots keep all tokens."""
+    def __init__(
+        self,
+        prefix_slots: List[Tuple[str, Iterable[str]]],
+        suffix_slots: List[Tuple[str, Iterable[str], bool]]
+    ):
+        self.prefix_slot_names = [name for name, _ in prefix_slots]
+        self.suffix_slot_names = [name for name, _, _ in suffix_slots]
+        self.suffix_slot_is_multi = [multi for _, _, multi in suffix_slots]
+
+        self.prefix_dispatch: Dict[str, int] = {}
+        for i, (_, terminals) in enumerate(prefix_slots):
+            for terminal in terminals:
+                assert terminal not in self.prefix_dispatch, "Slots must not overlap"
+                self.prefix_dispatch[terminal] = i
+        
+        self.suffix_dispatch: Dict[str, int] = {}
+        for i, (_, terminals, _) in enumerate(suffix_slots):
+            for terminal in terminals:
+                assert terminal not in self.suffix_dispatch, "Slots must not overlap"
+                self.suffix_dispatch[terminal] = i
+
+
+NOTE_SLOT_TABLE = SlotTable(
+    # in the order of error reporting
+    prefix_slots=[
+        ("no_print", ["print-object:no"]),
+        ("grace", ["grace"]),
+        ("grace_slash", ["grace:slash"]),
+        ("chord", ["chord"]),
+        ("rest", ["rest"]),
+        ("pitch", PITCH_TOKENS),
+        ("voice", VOICE_TOKENS),
+    ],
+    suffix_slots=[
+        ("time_modification", TIME_MODIFICATION_TOKENS, False),
+        ("dot", ["dot"], True),
+        ("accidental", ACCIDENTAL_TOKENS, False),
+        ("stem", STEM_TOKENS, False),
+        ("staff", STAFF_TOKENS, False),
+        ("beam", BEAM_TOKENS, True),
+        ("tied_start", ["tied:start"], False),
+        ("tied_stop", ["tied:stop"], False),
+        ("tuplet_start", ["tuplet:start"], False),
+        ("tuplet_stop", ["tuplet:stop"], False),
+        ("slur", ["slur:start", "slur:stop"], True),
+        ("fermata", ["fermata"], False),
+        ("arpeggiate", ["arpeggiate"], False),
+        ("staccato", ["staccato"], False),
+        ("accent", ["accent"], False),
+        ("strong_accent", ["strong-accent"], False),
+        ("tenuto", ["tenuto"], False),
+        ("tremolo_type", TREMOLO_TYPE_TOKENS, False),
+        ("tremolo_marks", TREMOLO_MARKS_TOKENS, False),
+        ("trill_mark", ["trill-mark"], False),
+    ]
+)
+
+
 class Delinearizer:
     def __init__(
         self,
@@ -62,7 +129,7 @@ class Delinearizer:
         # within-part state
         self._fractional_measure_duration: Optional[Fraction] = None
         self._open_slur_count = 0
-        self._pitch_alternator = PitchAlternator()
+        self._pitch_alternator = PitchAlternator(DURATION_GRID)
 
         # within-measure state
         self._stem_orientation: Optional[str] = None # "up", "down", None
@@ -76,23 +143,48 @@ class Delinearizer:
         print(header, *values, file=self._errout)
 
     def process_text(self, text: str) -> ET.Element:
-        # reset within-part state
-        self._fractional_measure_duration = None
-        self._open_slur_count = 0
-        self._pitch_alternator = PitchAlternator()
+        self._begin_part()
 
         # process LMX
         tokens = self.lex(text)
         self.process_system(tokens)
 
+        self._end_part()
+        return self.part_element
+    
+    def process_token_ids(
+        self,
+        token_ids: np.ndarray,
+        id_to_token: Sequence[str],
+        translation_table: Optional[np.ndarray] = None
+    ) -> ET.Element:
+        """Same as process_text, but takes the token IDs predicted by a model
+        together with the model's ID to token string mapping (e.g. the tag
+        list of Zeus). It skips joining the tokens into a string and
+        re-splitting and re-validating it, errors report the same positions.
+        When delinearizing many predictions of the same model, pass the
+        VOCABULARY.translation_table(id_to_token) built once up front."""
+        self._begin_part()
+
+        tokens = self.lex_token_ids(token_ids, id_to_token, translation_table)
+        self.process_system(tokens)
+
+        self._end_part()
+        return self.part_element
+    
+    def _begin_part(self):
+        # reset within-part state
+        self._fractional_measure_duration = None
+        self._open_slur_count = 0
+        self._pitch_alternator = PitchAlternator(DURATION_GRID)
+    
+    def _end_part(self):
         # add the <staves> element if 2 or more staves present
         self._add_staves_head_element()
 
         # add <divisions> and update all <duration> elements
         if not self.keep_fractional_durations:
             fractional_durations_to_actual(self.part_element)
-        
-        return self.part_element
     
     def _add_staves_head_element(self):
         max_clef_number = max(
@@ -117,12 +209,44 @@ class Delinearizer:
         for i, terminal in enumerate(terminals):
             position = i + 1
             token = Token(terminal, position)
-            if terminal not in ALL_TOKENS:
+            if terminal not in VOCABULARY:
                 self._error(token, "Token not present in the vocabulary.")
                 continue
             tokens.append(token)
         return tokens
 
+    def lex_token_ids(
+        self,
+        token_ids: np.ndarray,
+        id_to_token: Sequence[str],
+        translation_table: Optional[np.ndarray] = None
+    ) -> List[Token]:
+        """Lexer phase for model-predicted token IDs, the IDs are translated
+        to the vocabulary in one vectorized lookup"""
+        token_ids = np.asarray(token_ids, dtype=np.int64).reshape(-1)
+        table = translation_table
+        if table is None:
+            table = VOCABULARY.translation_table(id_to_token)
+
+        in_range = (token_ids >= 0) & (token_ids < len(table))
+        vocabulary_ids = np.full(len(token_ids), -1, dtype=np.int32)
+        vocabulary_ids[in_range] = table[token_ids[in_range]]
+
+        for i in np.flatnonzero(vocabulary_ids < 0).tolist():
+            token_id = int(token_ids[i])
+            terminal = (
+                id_to_token[token_id] if 0 <= token_id < len(id_to_token)
+                else f"<id:{token_id}>"
+            )
+            self._error(Token(terminal, i + 1), "Token not present in the vocabulary.")
+
+        vocabulary_tokens = VOCABULARY.tokens
+        return [
+            Token(vocabulary_tokens[vocabulary_id], i + 1)
+            for i, vocabulary_id in enumerate(vocabulary_ids.tolist())
+            if vocabulary_id >= 0
+        ]
+
     def process_system(self, tokens: List[Token]):
         """Takes all tokens produced by the recognition model"""
         measure_clusters = self.cluster_measures(tokens)
@@ -142,7 +266,7 @@ class Delinearizer:
             if not before_first_measure:
                 clusters.append(this_cluster)
             elif len(this_cluster) > 0:
-                self._error("There are tokens before the first 'measure' token.")
+                self._error(this_cluster[0], "There are tokens before the first 'measure' token.")
 
         for token in tokens:
             if token.terminal == "measure":
@@ -186,7 +310,7 @@ class Delinearizer:
             else:
                 attributes_element = None
             
-            if tree.root.terminal in NOTE_ROOT_TOKENS:
+            if VOCABULARY.is_of_class(tree.root.terminal, TOKEN_CLASS_ROOT):
                 notelike_element = self.process_notelike(tree)
                 if (notelike_element.tag in {"forward", "backup"}
                         and last_notelike is not None
@@ -194,9 +318,9 @@ class Delinearizer:
                     # merge forward-backup
                     last_duration = last_notelike.find("duration")
                     this_duration = notelike_element.find("duration")
-                    last_duration.text = str(
-                        Fraction(last_duration.text) +
-                        Fraction(this_duration.text)
+                    last_duration.text = DURATION_GRID.text(
+                        DURATION_GRID.ticks(last_duration.text) +
+                        DURATION_GRID.ticks(this_duration.text)
                     )
                 else:
                     # append new forward,backup,note
@@ -355,7 +479,7 @@ class Delinearizer:
         return clef_element
 
     def process_notelike(self, tree: Tree) -> ET.Element:
-        assert tree.root.terminal in NOTE_ROOT_TOKENS
+        assert VOCABULARY.is_of_class(tree.root.terminal, TOKEN_CLASS_ROOT)
 
         backup_token = self._extract_prefix(tree, {"backup"})
         forward_token = self._extract_prefix(tree, {"forward"})
@@ -373,7 +497,7 @@ class Delinearizer:
         return self.process_note(tree)
     
     def process_forward_backup(self, element: ET.Element, tree: Tree):
-        assert tree.root.terminal in NOTE_ROOT_TOKENS
+        assert VOCABULARY.is_of_class(tree.root.terminal, TOKEN_CLASS_ROOT)
 
         # backup element resets beams,
         # so that if there were ever to be beams crossing measures,
@@ -399,40 +523,40 @@ class Delinearizer:
         element.append(duration_element)
     
     def process_note(self, tree: Tree) -> ET.Element:
-        assert tree.root.terminal in NOTE_ROOT_TOKENS
+        assert VOCABULARY.is_of_class(tree.root.terminal, TOKEN_CLASS_ROOT)
 
         # === parse the note tokens ====
 
-        no_print_token = self._extract_prefix(tree, {"print-object:no"})
-        grace_token = self._extract_prefix(tree, {"grace"})
-        grace_slash_token = self._extract_prefix(tree, {"grace:slash"})
-        chord_token = self._extract_prefix(tree, {"chord"})
-        rest_token = self._extract_prefix(tree, {"rest"})
-        pitch_token = self._extract_prefix(tree, PITCH_TOKENS)
-        voice_token = self._extract_prefix(tree, VOICE_TOKENS)
-
-        time_modification_token = self._extract_suffix(tree, TIME_MODIFICATION_TOKENS)
-        dot_tokens = self._extract_suffixes(tree, {"dot"})
-        accidental_token = self._extract_suffix(tree, ACCIDENTAL_TOKENS)
-        stem_token = self._extract_suffix(tree, STEM_TOKENS)
-        staff_token = self._extract_suffix(tree, STAFF_TOKENS)
-        beam_tokens = self._extract_suffixes(tree, BEAM_TOKENS)
-        tied_start_token = self._extract_suffix(tree, {"tied:start"})
-        tied_stop_token = self._extract_suffix(tree, {"tied:stop"})
-        tuplet_start_token = self._extract_suffix(tree, {"tuplet:start"})
-        tuplet_stop_token = self._extract_suffix(tree, {"tuplet:stop"})
-        slur_tokens = self._extract_suffixes(tree, {"slur:start", "slur:stop"})
-        fermata_token = self._extract_suffix(tree, {"fermata"})
-        arpeggiate_token = self._extract_suffix(tree, {"arpeggiate"})
-        staccato_token = self._extract_suffix(tree, {"staccato"})
-        accent_token = self._extract_suffix(tree, {"accent"})
-        strong_accent_token = self._extract_suffix(tree, {"strong-accent"})
-        tenuto_token = self._extract_suffix(tree, {"tenuto"})
-        tremolo_type_token = self._extract_suffix(tree, TREMOLO_TYPE_TOKENS)
-        tremolo_marks_token = self._extract_suffix(tree, TREMOLO_MARKS_TOKENS)
-        trill_mark_token = self._extract_suffix(tree, {"trill-mark"})
-
-        self._list_unexpected_valencies(tree)
+        slots = self._extract_slots(tree, NOTE_SLOT_TABLE)
+
+        no_print_token: Optional[Token] = slots["no_print"]
+        grace_token: Optional[Token] = slots["grace"]
+        grace_slash_token: Optional[Token] = slots["grace_slash"]
+        chord_token: Optional[Token] = slots["chord"]
+        rest_token: Optional[Token] = slots["rest"]
+        pitch_token: Optional[Token] = slots["pitch"]
+        voice_token: Optional[Token] = slots["voice"]
+
+        time_modification_token: Optional[Token] = slots["time_modification"]
+        dot_tokens: List[Token] = slots["dot"]
+        accidental_token: Optional[Token] = slots["accidental"]
+        stem_token: Optional[Token] = slots["stem"]
+        staff_token: Optional[Token] = slots["staff"]
+        beam_tokens: List[Token] = slots["beam"]
+        tied_start_token: Optional[Token] = slots["tied_start"]
+        tied_stop_token: Optional[Token] = slots["tied_stop"]
+        tuplet_start_token: Optional[Token] = slots["tuplet_start"]
+        tuplet_stop_token: Optional[Token] = slots["tuplet_stop"]
+        slur_tokens: List[Token] = slots["slur"]
+        fermata_token: Optional[Token] = slots["fermata"]
+        arpeggiate_token: Optional[Token] = slots["arpeggiate"]
+        staccato_token: Optional[Token] = slots["staccato"]
+        accent_token: Optional[Token] = slots["accent"]
+        strong_accent_token: Optional[Token] = slots["strong_accent"]
+        tenuto_token: Optional[Token] = slots["tenuto"]
+        tremolo_type_token: Optional[Token] = slots["tremolo_type"]
+        tremolo_marks_token: Optional[Token] = slots["tremolo_marks"]
+        trill_mark_token: Optional[Token] = slots["trill_mark"]
 
         # === extract higher-level information ====
 
@@ -746,21 +870,72 @@ class Delinearizer:
         if time_modification is not None:
             assert time_modification in TIME_MODIFICATION_TOKENS
 
-        # simple conversion
-        quarter_multiple = NOTE_TYPE_TO_QUARTER_MULTIPLE[note_type]
+        # (looked up in integer ticks, formatted as a fraction)
+        return DURATION_GRID.text(
+            duration_ticks(note_type, time_modification, dots)
+        )
+    
+    def _extract_slots(self, tree: Tree, table: SlotTable) -> Dict[str, Any]:
+        """Sorts all the tree prefixes and suffixes into slots in one pass
+        and reports errors exactly like the sequence of _extract_prefix,
+        _extract_suffix(es) calls in slot order followed by
+        _list_unexpected_valencies would."""
+        prefix_buckets: List[List[Token]] = [[] for _ in table.prefix_slot_names]
+        suffix_buckets: List[List[Token]] = [[] for _ in table.suffix_slot_names]
+        unexpected_prefixes: List[Token] = []
+        unexpected_suffixes: List[Token] = []
 
-        # handle duration dots
-        dot_duration = quarter_multiple / 2
-        for _ in range(dots):
-            quarter_multiple += dot_duration
-            dot_duration /= 2
+        for token in tree.prefixes:
+            i = table.prefix_dispatch.get(token.terminal)
+            if i is None:
+                unexpected_prefixes.append(token)
+            else:
+                prefix_buckets[i].append(token)
+        
+        for token in tree.suffixes:
+            i = table.suffix_dispatch.get(token.terminal)
+            if i is None:
+                unexpected_suffixes.append(token)
+            else:
+                suffix_buckets[i].append(token)
+        
+        slots: Dict[str, Any] = {}
 
-        # handle time modification
-        if time_modification is not None:
-            denominator, numerator = time_modification.split("in")
-            quarter_multiple = quarter_multiple * Fraction(int(numerator), int(denominator))
+        # prefixes are scanned from the back, the last one is kept
+        for name, bucket in zip(table.prefix_slot_names, prefix_buckets):
+            if len(bucket) == 0:
+                slots[name] = None
+                continue
+            slots[name] = bucket[-1]
+            for token in reversed(bucket[:-1]):
+                self._error(
+                    token,
+                    f"Additional prefix token for the '{tree.root.terminal}' token."
+                )
+        
+        # suffixes are scanned from the front, the first one is kept
+        for name, is_multi, bucket in zip(
+            table.suffix_slot_names, table.suffix_slot_is_multi, suffix_buckets
+        ):
+            if is_multi:
+                slots[name] = bucket
+                continue
+            if len(bucket) == 0:
+                slots[name] = None
+                continue
+            slots[name] = bucket[0]
+            for token in bucket[1:]:
+                self._error(
+                    token,
+                    f"Additional suffix token '{token.terminal}' " + \
+                        f"for the '{tree.root.terminal}' token."
+                )
+        
+        tree.prefixes = unexpected_prefixes
+        tree.suffixes = unexpected_suffixes
+        self._list_unexpected_valencies(tree)
         
-        return str(quarter_multiple)
+        return slots
     
     def _extract_suffix(self, tree: Tree, terminals: Set[str]) -> Optional[Token]:
         target_token: Optional[Token] = None
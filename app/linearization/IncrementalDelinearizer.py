@@ -0,0 +1,90 @@
+import xml.etree.ElementTree as ET
+from typing import List, Optional, TextIO
+from .Delinearizer import Delinearizer, Token
+from .vocabulary import VOCABULARY
+
+
+class IncrementalDelinearizer(Delinearizer):
+    """Delinearizes LMX token by token, as the tokens are being produced
+    (e.g. by a model decoding a sequence). A measure is finished and returned
+    as soon as the next 'measure' token arrives, part-level state (pitch
+    alterations, open slurs) is carried over between measures.
+
+    The returned measures use fractional durations (quarter multiples)
+    until close() is called, which adds <staves>, <divisions> and converts
+    the durations in-place (unless keep_fractional_durations is set).
+    The resulting part equals the one produced by process_text, only the
+    errors are reported measure by measure instead of phase by phase.
+
+    Usage:
+        delinearizer = IncrementalDelinearizer()
+        for terminal in decoded_tokens:
+            measure = delinearizer.push(terminal)
+            if measure is not None:
+                render(measure)
+        part = delinearizer.close()
+    """
+
+    def __init__(
+        self,
+        errout: Optional[TextIO] = None,
+        keep_fractional_durations=False
+    ):
+        super().__init__(errout, keep_fractional_durations)
+        self._begin_part()
+
+        self._position = 0 # position of the last pushed token
+        self._measure_tokens: List[Token] = [] # tokens of the open measure
+        self._inside_measure = False # was the first 'measure' token seen
+        self._closed = False
+    
+    def push(self, terminal: str) -> Optional[ET.Element]:
+        """Feeds the next token, returns the measure it finished (if any)"""
+        assert not self._closed, "The delinearizer has already been closed"
+
+        self._position += 1
+        token = Token(terminal, self._position)
+        if terminal not in VOCABULARY:
+            self._error(token, "Token not present in the vocabulary.")
+            return None
+        
+        if terminal != "measure":
+            self._measure_tokens.append(token)
+            return None
+        
+        finished_measure: Optional[ET.Element] = None
+        if self._inside_measure:
+            finished_measure = self._finish_measure()
+        elif len(self._measure_tokens) > 0:
+            self._error(
+                self._measure_tokens[0],
+                "There are tokens before the first 'measure' token."
+            )
+        
+        self._inside_measure = True
+        self._measure_tokens = []
+        return finished_measure
+    
+    def close(self) -> ET.Element:
+        """Finishes the last measure and the whole part, returns the part"""
+        assert not self._closed, "The delinearizer has already been closed"
+        self._closed = True
+
+        # (a trailing empty measure is dropped, just like in process_text)
+        if len(self._measure_tokens) > 0:
+            if self._inside_measure:
+                self._finish_measure()
+            else:
+                self._error(
+                    self._measure_tokens[0],
+                    "There are tokens before the first 'measure' token."
+                )
+        self._measure_tokens = []
+        
+        self._end_part()
+        return self.part_element
+
+    def _finish_measure(self) -> ET.Element:
+        measure_element = self.process_measure(self._measure_tokens)
+        self.part_element.append(measure_element)
+        return measure_element
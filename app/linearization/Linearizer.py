@@ -1,5 +1,5 @@
 import xml.etree.ElementTree as ET
-from typing import Iterator, Optional, List, TextIO, Dict
+from typing import Iterator, Iterable, Optional, List, TextIO, Dict
 import io
 from .vocabulary import *
 from fractions import Fraction
@@ -17,6 +17,34 @@ IGNORED_ATTRIBUTES_ELEMENTS = set([
     "directive", "measure-style"
 ])
 
+PITCH_TOKEN_ORDER: Dict[str, int] = {
+    token: i for i, token in enumerate(PITCH_TOKENS)
+}
+
+
+def index_children(element: ET.Element) -> Dict[str, List[ET.Element]]:
+    """Buckets children of an element by their tag in a single pass,
+    so that repeated lookups do not re-scan the children"""
+    index: Dict[str, List[ET.Element]] = {}
+    for child in element:
+        bucket = index.get(child.tag)
+        if bucket is None:
+            index[child.tag] = [child]
+        else:
+            bucket.append(child)
+    return index
+
+
+def first_child(index: Dict[str, List[ET.Element]], tag: str) -> Optional[ET.Element]:
+    """Returns the first indexed child with the given tag, like element.find(tag)"""
+    bucket = index.get(tag)
+    if bucket is None:
+        return None
+    return bucket[0]
+
+
+_NO_CHILDREN: List[ET.Element] = []
+
 
 # NOTE: Use assert only for very major things. For everything else,
 # use self._error, so that the code works fine with slightly unexpected input
@@ -58,15 +86,26 @@ class Linearizer:
     def _emit(self, token: str):
         """Emits a token into the output sequence"""
         if self.fail_on_unknown_tokens:
-            assert token in ALL_TOKENS, f"Token '{token}' not in the vocabulary"
+            assert token in VOCABULARY, f"Token '{token}' not in the vocabulary"
         else:
-            if token not in ALL_TOKENS:
+            if token not in VOCABULARY:
                 self._error(f"Token '{token}' not in the vocabulary")
                 return
         
         self.output_tokens.append(token)
 
     def process_part(self, part: ET.Element):
+        assert part.tag == "part"
+        self.process_measures(part, part_id=part.attrib.get("id"))
+    
+    def process_measures(
+        self,
+        measures: Iterable[ET.Element],
+        part_id: Optional[str] = None
+    ):
+        """Linearizes a sequence of <measure> elements as a single part.
+        The measures are consumed one by one, so this method can be fed from
+        a stream (e.g. MxlPartStream) without the whole part in memory."""
         # reset within-part state
         self._part_id = None
         self._measure_number = None
@@ -78,9 +117,8 @@ class Linearizer:
         self._clefs = {}
         self._key_signature_fifths = None
         
-        assert part.tag == "part"
-        self._part_id = part.attrib.get("id")
-        for measure in part:
+        self._part_id = part_id
+        for measure in measures:
             if measure.tag is ET.Comment:
                 continue # ignore comments
 
@@ -121,12 +159,16 @@ class Linearizer:
     def process_note(self, note: ET.Element, measure: ET.Element):
         assert note.tag == "note"
 
+        # index the note children once, all lookups below read from it
+        children = index_children(note)
+        notations_elements = children.get("notations", _NO_CHILDREN)
+
         # [print-object:no]
         if note.attrib.get("print-object") == "no":
             self._emit("print-object:no")
 
         # [grace]
-        grace_element = note.find("grace")
+        grace_element = first_child(children, "grace")
         is_grace_note = grace_element is not None
         if is_grace_note:
             self._emit("grace")
@@ -134,38 +176,35 @@ class Linearizer:
                 self._emit("grace:slash")
         
         # [chord]
-        chord_element = note.find("chord")
+        chord_element = first_child(children, "chord")
         is_chord = chord_element is not None
         if is_chord:
             self._emit("chord")
 
-        # [rest]
-        rest_element = note.find("rest")
-
         # [rest] or [pitch]
-        rest_element = note.find("rest")
+        rest_element = first_child(children, "rest")
         is_measure_rest = False
         pitch_token: Optional[str] = None
         if rest_element is not None:
             self._emit("rest")
             is_measure_rest = rest_element.attrib.get("measure") == "yes"
         else:
-            pitch_element = note.find("pitch")
+            pitch_element = first_child(children, "pitch")
             pitch_token = pitch_element.find("step").text + pitch_element.find("octave").text
-            assert pitch_token in PITCH_TOKENS, "Invalid pitch: " + pitch_token
+            assert pitch_token in PITCH_TOKEN_ORDER, "Invalid pitch: " + pitch_token
             self._emit(pitch_token)
         
         # [voice]
-        voice_element = note.find("voice")
+        voice_element = first_child(children, "voice")
         if voice_element is not None:
             if self._voice != voice_element.text:
                 self._emit("voice:" + voice_element.text)
                 self._voice = voice_element.text
         
         # [type] or [rest:measure] - the ROOT of the [note] sequence
-        type_element = note.find("type")
+        type_element = first_child(children, "type")
         if type_element is not None:
-            assert type_element.text in NOTE_TYPE_TOKENS
+            assert type_element.text in NOTE_TYPE_TO_QUARTER_MULTIPLE
             self._emit(type_element.text)
         elif is_measure_rest:
             self._emit("rest:measure")
@@ -173,18 +212,20 @@ class Linearizer:
             self._error("Note does not have <type>:", ET.tostring(note))
         
         # [time-modification] (tuplets rhythm-wise)
-        if note.find("time-modification") is not None:
-            actual = note.find("time-modification/actual-notes").text
-            normal = note.find("time-modification/normal-notes").text
+        time_modification_element = first_child(children, "time-modification")
+        if time_modification_element is not None:
+            actual = time_modification_element.find("actual-notes").text
+            normal = time_modification_element.find("normal-notes").text
             token = actual + "in" + normal
             self._emit(token)
 
         # [dot]
-        for dot_element in note.findall("dot"):
+        dot_elements = children.get("dot", _NO_CHILDREN)
+        for dot_element in dot_elements:
             self._emit("dot")
 
         # [accidental]
-        accidental_element = note.find("accidental")
+        accidental_element = first_child(children, "accidental")
         if accidental_element is not None:
             accidental = accidental_element.text
             if accidental not in ACCIDENTAL_TOKENS:
@@ -197,7 +238,7 @@ class Linearizer:
         # DOUBLE STEMS: are encoded as two notes in two voices,
         # this is what MuseScore produces and is reasonable
         # (even though MusicXML allows for "double" as a value here)
-        stem_element = note.find("stem")
+        stem_element = first_child(children, "stem")
         if stem_element is not None:
             if stem_element.text not in ["up", "down", "none"]:
                 self._error(
@@ -212,7 +253,7 @@ class Linearizer:
         # [staff]
         # like stems, staves are indicated at the beginning
         # of a measure, voice, and during a change of staff
-        staff_element = note.find("staff")
+        staff_element = first_child(children, "staff")
         if staff_element is not None:
             if staff_element.text not in ["1", "2", "3"]:
                 self._error("Only staves 1,2,3 are supported.")
@@ -223,7 +264,7 @@ class Linearizer:
                     self._staff = staff_element.text
 
         # [beam]
-        for beam in note.findall("beam"):
+        for beam in children.get("beam", _NO_CHILDREN):
             assert beam.text in ["begin", "end", "continue", "forward hook", "backward hook"]
             if beam.text != "continue":
                 if beam.text == "forward hook":
@@ -234,22 +275,25 @@ class Linearizer:
                     self._emit("beam:" + beam.text)
 
         # [tied]
-        for tied_element in note.findall("notations/tied"):
-            tied_type = tied_element.attrib.get("type")
-            assert tied_type in ["start", "stop"]
-            self._emit("tied:" + tied_type)
+        for notations_element in notations_elements:
+            for tied_element in notations_element.iterfind("tied"):
+                tied_type = tied_element.attrib.get("type")
+                assert tied_type in ["start", "stop"]
+                self._emit("tied:" + tied_type)
 
         # [tuplet]
-        for tuplet_element in note.findall("notations/tuplet"):
-            tuplet_type = tuplet_element.attrib.get("type")
-            assert tuplet_type in ["start", "stop"]
-            self._emit("tuplet:" + tuplet_type)
+        for notations_element in notations_elements:
+            for tuplet_element in notations_element.iterfind("tuplet"):
+                tuplet_type = tuplet_element.attrib.get("type")
+                assert tuplet_type in ["start", "stop"]
+                self._emit("tuplet:" + tuplet_type)
         
         # extended notations and ornaments
-        self._process_extended_notations(note)
+        if len(notations_elements) > 0:
+            self._process_extended_notations(notations_elements[0])
         
         # extract duration
-        duration_element = note.find("duration")
+        duration_element = first_child(children, "duration")
         duration: Optional[int] = None
         if duration_element is None and not is_grace_note:
             self._error("Note lacks duration:", ET.tostring(note))
@@ -258,7 +302,10 @@ class Linearizer:
             assert duration > 0
 
         # check assumptions about the linearization process
-        self._verify_note_duration(duration, note, measure, is_measure_rest, is_grace_note)
+        self._verify_note_duration(
+            duration, note, measure, is_measure_rest, is_grace_note,
+            type_element, len(dot_elements), time_modification_element
+        )
         self._verify_chords(duration, pitch_token, is_chord, note, measure)
 
         # perform on-exit state changes
@@ -267,11 +314,8 @@ class Linearizer:
         if duration is not None and not is_chord:
             self._onset += duration
     
-    def _process_extended_notations(self, note: ET.Element):
-        # save some compute time
-        notations = note.find("notations")
-        if notations is None:
-            return
+    def _process_extended_notations(self, notations: ET.Element):
+        assert notations.tag == "notations"
 
         # [slur]
         for slur_element in notations.findall("slur"):
@@ -329,7 +373,9 @@ class Linearizer:
     
     def _verify_note_duration(
         self, duration: Optional[int], note: ET.Element, measure: ET.Element,
-        is_measure_rest: bool, is_grace_note: bool
+        is_measure_rest: bool, is_grace_note: bool,
+        type_element: Optional[ET.Element], dot_count: int,
+        time_modification_element: Optional[ET.Element]
     ):
         if duration is None:
             return
@@ -346,7 +392,9 @@ class Linearizer:
             return
         
         # verify for regular notes
-        expected_duration, expected_duration_float = self._expected_note_duration(note)
+        expected_duration, expected_duration_float = self._expected_note_duration(
+            type_element, dot_count, time_modification_element
+        )
         if expected_duration != duration:
             self._error(
                 "Note does not have expected duration.",
@@ -355,8 +403,12 @@ class Linearizer:
                 ET.tostring(note)
             )
     
-    def _expected_note_duration(self, note: ET.Element) -> int:
-        type_element = note.find("type")
+    def _expected_note_duration(
+        self,
+        type_element: ET.Element,
+        dot_count: int,
+        time_modification_element: Optional[ET.Element]
+    ) -> int:
         note_type = type_element.text
 
         # simple conversion
@@ -364,14 +416,14 @@ class Linearizer:
 
         # handle duration dots
         dot_duration = expected_duration / 2
-        for _ in note.findall("dot"):
+        for _ in range(dot_count):
             expected_duration += dot_duration
             dot_duration /= 2
         
         # handle time modification
-        if note.find("time-modification") is not None:
-            actual = int(note.find("time-modification/actual-notes").text)
-            normal = int(note.find("time-modification/normal-notes").text)
+        if time_modification_element is not None:
+            actual = int(time_modification_element.find("actual-notes").text)
+            normal = int(time_modification_element.find("normal-notes").text)
             expected_duration *= Fraction(normal, actual)
         
         # The denominaotor now SHOULD be 1, if the file is valid MusicXML.
@@ -401,8 +453,8 @@ class Linearizer:
             )
         
         # verify pitch order
-        previous_order = PITCH_TOKENS.index(self._previous_note_pitch)
-        current_order = PITCH_TOKENS.index(pitch_token)
+        previous_order = PITCH_TOKEN_ORDER[self._previous_note_pitch]
+        current_order = PITCH_TOKEN_ORDER[pitch_token]
         if previous_order > current_order:
             self._error(
                 "Chord notes must have ascending pitches.",
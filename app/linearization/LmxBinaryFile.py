@@ -0,0 +1,159 @@
+import mmap
+import struct
+import zlib
+import numpy as np
+from typing import Iterable, Iterator, List
+from .vocabulary import VOCABULARY
+from .LmxFile import LmxFile, LMX_FILE_VERSION
+
+
+LMX_BINARY_MAGIC = b"LMXB"
+LMX_BINARY_FORMAT_VERSION = 1
+
+# magic, binary format version, flavor, padding, LMX version,
+# vocabulary checksum, number of systems
+_HEADER = struct.Struct("<4sHBx8sII")
+
+_OFFSET_DTYPE = np.dtype("<u8")
+_TOKEN_DTYPE = np.dtype("<u2")
+
+
+def vocabulary_checksum() -> int:
+    """Fingerprint of the vocabulary, token IDs are only valid within
+    the vocabulary they were encoded with"""
+    return zlib.crc32("\n".join(VOCABULARY.tokens).encode("utf-8"))
+
+
+class LmxBinaryFile:
+    """Read-only, memory-mapped binary container of LMX systems.
+
+    The file consists of a fixed-size header, a table of system offsets
+    (uint64, counted in tokens, one extra entry at the end) and the token IDs
+    of all the systems concatenated (uint16, IDs of the compiled vocabulary).
+    All values are little-endian. Systems are returned as zero-copy views
+    into the mapped file, so a single system can be sliced out of a large
+    corpus without reading or parsing the rest.
+
+    Usage:
+        with LmxBinaryFile("corpus.lmxb") as corpus:
+            token_ids = corpus[42] # np.ndarray of uint16
+            tokens = corpus.system_tokens(42) # List[str]
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+        with open(path, "rb") as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(self._mmap) < _HEADER.size:
+            raise Exception("The file is not a binary LMX file")
+
+        magic, format_version, flavor, lmx_version, checksum, system_count \
+            = _HEADER.unpack_from(self._mmap, 0)
+        if magic != LMX_BINARY_MAGIC:
+            raise Exception("The file is not a binary LMX file")
+        if format_version != LMX_BINARY_FORMAT_VERSION:
+            raise Exception("Loaded file has unsupported binary format version")
+        if lmx_version.rstrip(b"\0").decode("ascii") != LMX_FILE_VERSION:
+            raise Exception("Loaded file has unsupported version")
+        if checksum != vocabulary_checksum():
+            raise Exception("Loaded file was encoded with a different vocabulary")
+
+        self.extended_flavor = flavor == 1
+        "Does the file use extended flavor or only the core flavor"
+
+        self.offsets: np.ndarray = np.frombuffer(
+            self._mmap,
+            dtype=_OFFSET_DTYPE,
+            count=system_count + 1,
+            offset=_HEADER.size
+        )
+        "Start of each system in the token array, plus the total token count"
+
+        self.token_ids: np.ndarray = np.frombuffer(
+            self._mmap,
+            dtype=_TOKEN_DTYPE,
+            count=int(self.offsets[-1]),
+            offset=_HEADER.size + self.offsets.nbytes
+        )
+        "Token IDs of all the systems, concatenated"
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index: int) -> np.ndarray:
+        """Returns token IDs of a system as a view into the mapped file"""
+        if index < 0:
+            index += len(self)
+        if index < 0 or index >= len(self):
+            raise IndexError("System index out of range")
+        return self.token_ids[self.offsets[index]:self.offsets[index + 1]]
+
+    def __iter__(self) -> Iterator[np.ndarray]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def system_tokens(self, index: int) -> List[str]:
+        """Returns token strings of a system"""
+        return VOCABULARY.decode(self[index])
+
+    def to_lmx_file(self) -> LmxFile:
+        """Decodes all the systems into the in-memory text representation"""
+        lmx = LmxFile()
+        lmx.extended_flavor = self.extended_flavor
+        lmx.systems = [self.system_tokens(i) for i in range(len(self))]
+        return lmx
+
+    def close(self):
+        """Unmaps the file, all returned views must be released before"""
+        self.offsets = None
+        self.token_ids = None
+        self._mmap.close()
+
+    def __enter__(self) -> "LmxBinaryFile":
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    @staticmethod
+    def save(path: str, lmx: LmxFile):
+        """Saves an in-memory LMX file as a binary container"""
+        LmxBinaryFile.save_systems(
+            path,
+            (VOCABULARY.encode(system) for system in lmx.systems),
+            lmx.extended_flavor
+        )
+
+    @staticmethod
+    def save_systems(
+        path: str,
+        systems: Iterable[np.ndarray],
+        extended_flavor=False
+    ):
+        """Saves systems given as arrays of token IDs as a binary container"""
+        assert len(VOCABULARY) <= np.iinfo(_TOKEN_DTYPE).max + 1, \
+            "The vocabulary does not fit into 16-bit token IDs"
+
+        token_arrays: List[np.ndarray] = []
+        for system in systems:
+            system = np.asarray(system)
+            if len(system) > 0 and (system.min() < 0 or system.max() >= len(VOCABULARY)):
+                raise Exception("Token ID not present in the vocabulary")
+            token_arrays.append(system.astype(_TOKEN_DTYPE))
+        offsets = np.zeros(len(token_arrays) + 1, dtype=_OFFSET_DTYPE)
+        offsets[1:] = np.cumsum([len(system) for system in token_arrays])
+
+        with open(path, "wb") as file:
+            file.write(_HEADER.pack(
+                LMX_BINARY_MAGIC,
+                LMX_BINARY_FORMAT_VERSION,
+                1 if extended_flavor else 0,
+                LMX_FILE_VERSION.encode("ascii"),
+                vocabulary_checksum(),
+                len(token_arrays)
+            ))
+            file.write(offsets.tobytes())
+            for system in token_arrays:
+                file.write(system.tobytes())
@@ -42,6 +42,15 @@ class LmxFile:
         
         return lmx
     
+    def save(self, path: str):
+        """Saves Linearized MusicXML into a file, one system per line"""
+        with open(path, "w") as file:
+            print("version: " + LMX_FILE_VERSION, file=file)
+            print("flavor: " + ("extended" if self.extended_flavor else "core"), file=file)
+            for system in self.systems:
+                print("---", file=file)
+                print(" ".join(system), file=file)
+    
     def _load_header_line(self, line: str):
         field, value = line.strip().split(": ")
         if field == "version":
@@ -53,6 +62,6 @@ class LmxFile:
     def _load_system_line(self, line: str):
         tokens = line.strip().split()
         for token in tokens:
-            if token not in ALL_TOKENS:
+            if token not in VOCABULARY:
                 raise Exception(f"Unknown token '{token}' in the LMX file")
             self.systems[-1].append(token)
@@ -1,6 +1,7 @@
 import argparse
 import sys
 import os
+from .batch import DEFAULT_CHUNK_SIZE, DEFAULT_SHARD_SIZE
 
 
 ##########
@@ -23,6 +24,12 @@ linearize_parser.add_argument(
     "filename",
     type=str,
 )
+linearize_parser.add_argument(
+    "--stream",
+    action="store_true",
+    help="Stream the piano part of an MXL file measure by measure " + \
+        "instead of parsing the whole score (bounds memory by one measure)"
+)
 
 delinearize_parser = subparsers.add_parser(
     "delinearize",
@@ -35,54 +42,128 @@ delinearize_parser.add_argument(
 )
 
 
+def _add_batch_arguments(batch_parser: argparse.ArgumentParser):
+    batch_parser.add_argument(
+        "sources",
+        type=str,
+        nargs="+",
+        help="Directories, glob patterns, files, or '-' for stdin"
+    )
+    batch_parser.add_argument(
+        "--output",
+        type=str,
+        default="-",
+        help="Output JSONL file, stdout by default"
+    )
+    batch_parser.add_argument(
+        "--output_dir",
+        type=str,
+        default=None,
+        help="Write sharded JSONL files into this directory instead"
+    )
+    batch_parser.add_argument(
+        "--shard_size",
+        type=int,
+        default=DEFAULT_SHARD_SIZE,
+        help="Number of samples per output shard"
+    )
+    batch_parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Number of worker processes, all CPUs by default"
+    )
+    batch_parser.add_argument(
+        "--chunk_size",
+        type=int,
+        default=DEFAULT_CHUNK_SIZE,
+        help="Number of samples sent to a worker at once"
+    )
+
+linearize_batch_parser = subparsers.add_parser(
+    "linearize-batch",
+    aliases=[],
+    help="Generates LMX for many MusicXML files (or JSONL records " + \
+        "with the 'musicxml' field) in parallel, writes JSONL"
+)
+_add_batch_arguments(linearize_batch_parser)
+
+delinearize_batch_parser = subparsers.add_parser(
+    "delinearize-batch",
+    aliases=[],
+    help="Generates MusicXML for many LMX samples (one sample per line " + \
+        "or JSONL records with the 'lmx' field) in parallel, writes JSONL"
+)
+_add_batch_arguments(delinearize_batch_parser)
+
+pack_parser = subparsers.add_parser(
+    "pack",
+    aliases=[],
+    help="Converts an LMX text file to the memory-mappable binary container"
+)
+pack_parser.add_argument("input", type=str)
+pack_parser.add_argument("output", type=str)
+
+unpack_parser = subparsers.add_parser(
+    "unpack",
+    aliases=[],
+    help="Converts a binary LMX container back to an LMX text file"
+)
+unpack_parser.add_argument("input", type=str)
+unpack_parser.add_argument("output", type=str)
+
+
 ###################
 # Implementations #
 ###################
 
 from .Linearizer import Linearizer
-from .Delinearizer import Delinearizer
-from ..symbolic.MxlFile import MxlFile
-import xml.etree.ElementTree as ET
-from ..symbolic.part_to_score import part_to_score
+from .LmxFile import LmxFile
+from .LmxBinaryFile import LmxBinaryFile
+from ..symbolic.MxlFile import MxlFile, MxlPartStream
+from .batch import linearize_score, delinearize_lmx_to_file, load_musicxml, \
+    linearize_batch, delinearize_batch, BatchWriter
 
 
-def linearize(filename: str):
+def linearize(filename: str, stream=False):
+    if stream:
+        linearize_stream(filename)
+        return
+
     if filename == "-":
-        input_xml = sys.stdin.readline()
-        mxl = MxlFile(ET.ElementTree(
-            ET.fromstring(input_xml))
-        )
-    elif filename.endswith(".mxl"):
-        mxl = MxlFile.load_mxl(filename)
+        mxl = load_musicxml(None, sys.stdin.read())
     else:
-        with open(filename, "r") as f:
-            input_xml = f.readline()
-            mxl = MxlFile(ET.ElementTree(
-                ET.fromstring(input_xml))
-            )
+        mxl = load_musicxml(filename, None)
     
     try:
-        part = mxl.get_piano_part()
-    except:
-        part = mxl.tree.find("part")
-    
-    if part is None or part.tag != "part":
-        print("No <part> element found.", file=sys.stderr)
-        exit()
-    
-    linearizer = Linearizer(
-        errout=sys.stderr
-    )
-    linearizer.process_part(part)
-    output_lmx = " ".join(linearizer.output_tokens)
+        output_lmx = linearize_score(mxl, errout=sys.stderr)
+    except Exception as e:
+        print(str(e), file=sys.stderr)
+        exit(1)
     
     if filename == "-":
         print(output_lmx)
     else:
-        with open(os.path.splitext(filename) + ".musicxml", "r") as f:
+        with open(os.path.splitext(filename)[0] + ".lmx", "w") as f:
             print(output_lmx, file=f)
 
 
+def linearize_stream(filename: str):
+    if not filename.endswith(".mxl"):
+        print("Streaming is supported only for MXL files.", file=sys.stderr)
+        exit(1)
+
+    part_stream = MxlPartStream(filename)
+    linearizer = Linearizer(
+        errout=sys.stderr
+    )
+    linearizer.process_measures(part_stream, part_id=part_stream.part_id)
+    output_lmx = " ".join(linearizer.output_tokens)
+
+    with open(os.path.splitext(filename)[0] + ".lmx", "w") as f:
+        print(output_lmx, file=f)
+
+
 def delinearize(filename: str):
     if filename == "-":
         input_lmx = sys.stdin.readline()
@@ -90,23 +171,41 @@ def delinearize(filename: str):
         with open(filename, "r") as f:
             input_lmx = f.readline()
 
-    delinearizer = Delinearizer(
-        errout=sys.stderr
-    )
-    delinearizer.process_text(input_lmx)
-    score_etree = part_to_score(delinearizer.part_element)
-    output_xml = str(ET.tostring(
-        score_etree.getroot(),
-        encoding="utf-8",
-        xml_declaration=True
-    ), "utf-8")
-
     if filename == "-":
-        print(output_xml)
+        delinearize_lmx_to_file(input_lmx, sys.stdout, errout=sys.stderr)
+        print()
     else:
-        with open(os.path.splitext(filename) + ".musicxml", "r") as f:
-            print(output_xml, file=f)
+        with open(os.path.splitext(filename)[0] + ".musicxml", "w") as f:
+            delinearize_lmx_to_file(input_lmx, f, errout=sys.stderr)
+            print(file=f)
+
+
+def run_batch_command(args: argparse.Namespace):
+    writer = BatchWriter(
+        output=args.output,
+        output_dir=args.output_dir,
+        shard_size=args.shard_size
+    )
+    batch_function = (
+        linearize_batch if args.command_name == "linearize-batch"
+        else delinearize_batch
+    )
+    batch_function(
+        args.sources,
+        writer,
+        workers=args.workers,
+        chunk_size=args.chunk_size
+    )
+
+
+def pack(input_path: str, output_path: str):
+    LmxBinaryFile.save(output_path, LmxFile.load(input_path))
+
 
+def unpack(input_path: str, output_path: str):
+    with LmxBinaryFile(input_path) as binary_lmx:
+        lmx = binary_lmx.to_lmx_file()
+    lmx.save(output_path)
 
 
 ########
@@ -117,9 +216,15 @@ args = parser.parse_args()
 
 # annotation commans
 if args.command_name == "linearize":
-    linearize(args.filename)
+    linearize(args.filename, args.stream)
 elif args.command_name == "delinearize":
     delinearize(args.filename)
+elif args.command_name in ["linearize-batch", "delinearize-batch"]:
+    run_batch_command(args)
+elif args.command_name == "pack":
+    pack(args.input, args.output)
+elif args.command_name == "unpack":
+    unpack(args.input, args.output)
 else:
     parser.print_help()
     exit(2)
@@ -0,0 +1,271 @@
+import glob
+import io
+import json
+import multiprocessing
+import os
+import sys
+import xml.etree.ElementTree as ET
+from typing import Iterator, Iterable, List, Optional, TextIO, Tuple
+from .Linearizer import Linearizer
+from .Delinearizer import Delinearizer
+from ..symbolic.MxlFile import MxlFile
+from ..symbolic.write_score import part_to_score_string, write_part_as_score
+
+
+MUSICXML_EXTENSIONS = [".musicxml", ".xml", ".mxl"]
+LMX_EXTENSIONS = [".lmx"]
+JSONL_EXTENSIONS = [".jsonl"] # records, accepted by both conversions
+
+DEFAULT_CHUNK_SIZE = 64 # samples sent to a worker process at once
+DEFAULT_SHARD_SIZE = 10_000 # samples per output shard file
+
+
+# A sample to be converted: (sample ID, file path, text content).
+# Either the path or the content is set, workers load paths themselves,
+# so that large files are not sent through the process pool pipes.
+BatchSample = Tuple[str, Optional[str], Optional[str]]
+
+
+##############
+# Conversion #
+##############
+
+
+def linearize_score(mxl: MxlFile, errout: Optional[TextIO] = None) -> str:
+    """Linearizes the piano part of the score (or its first part)
+    and returns the LMX string"""
+    try:
+        part = mxl.get_piano_part()
+    except:
+        part = mxl.tree.find("part")
+
+    if part is None or part.tag != "part":
+        raise Exception("No <part> element found.")
+
+    linearizer = Linearizer(errout=errout)
+    linearizer.process_part(part)
+    return " ".join(linearizer.output_tokens)
+
+
+def delinearize_lmx(lmx: str, errout: Optional[TextIO] = None) -> str:
+    """Delinearizes the LMX string and returns the MusicXML string"""
+    delinearizer = Delinearizer(errout=errout)
+    delinearizer.process_text(lmx)
+    return part_to_score_string(delinearizer.part_element)
+
+
+def delinearize_lmx_to_file(
+    lmx: str,
+    file: TextIO,
+    errout: Optional[TextIO] = None
+):
+    """Delinearizes the LMX string and writes the MusicXML document
+    into the text stream, measure by measure"""
+    delinearizer = Delinearizer(errout=errout)
+    delinearizer.process_text(lmx)
+    write_part_as_score(file, delinearizer.part_element)
+
+
+def load_musicxml(path: Optional[str], content: Optional[str]) -> MxlFile:
+    """Loads a MusicXML score from a file (XML or MXL) or from a string"""
+    if content is not None:
+        return MxlFile(ET.ElementTree(ET.fromstring(content)))
+    if path.endswith(".mxl"):
+        return MxlFile.load_mxl(path)
+    return MxlFile(ET.parse(path))
+
+
+def _linearize_sample(sample: BatchSample) -> dict:
+    sample_id, path, content = sample
+    errout = io.StringIO()
+    try:
+        lmx = linearize_score(load_musicxml(path, content), errout)
+    except Exception as e:
+        print("LINEARIZATION FAILED:", repr(e), file=errout)
+        lmx = None
+    return {"id": sample_id, "lmx": lmx, "errors": errout.getvalue().splitlines()}
+
+
+def _delinearize_sample(sample: BatchSample) -> dict:
+    sample_id, path, content = sample
+    errout = io.StringIO()
+    try:
+        musicxml = delinearize_lmx(content, errout)
+    except Exception as e:
+        print("DELINEARIZATION FAILED:", repr(e), file=errout)
+        musicxml = None
+    return {"id": sample_id, "musicxml": musicxml, "errors": errout.getvalue().splitlines()}
+
+
+##########
+# Inputs #
+##########
+
+
+def iter_batch_samples(
+    sources: Iterable[str],
+    extensions: List[str],
+    field: str,
+    lines_are_samples: bool
+) -> Iterator[BatchSample]:
+    """Expands input sources into samples, in a stable order.
+
+    A source can be a directory (searched recursively for files with the
+    given extensions and for JSONL files), a glob pattern, a file path,
+    or "-" for stdin.
+    JSONL files (and stdin, unless lines are samples) yield one sample
+    per record, taking the content from the given field. Other files yield
+    one sample per line when lines_are_samples is set (e.g. prediction
+    files with one system per line), or one sample per file otherwise.
+    """
+    for source in sources:
+        if source == "-":
+            if lines_are_samples:
+                yield from _iter_line_samples(sys.stdin, "-")
+            else:
+                yield from _iter_jsonl_samples(sys.stdin, "-", field)
+            continue
+
+        if os.path.isdir(source):
+            paths = [
+                path for path in glob.glob(
+                    os.path.join(source, "**", "*"), recursive=True
+                )
+                if os.path.splitext(path)[1] in extensions + JSONL_EXTENSIONS
+            ]
+        elif glob.has_magic(source):
+            paths = glob.glob(source, recursive=True)
+        else:
+            paths = [source]
+        paths.sort()
+
+        for path in paths:
+            if path.endswith(".jsonl"):
+                with open(path, "r") as file:
+                    yield from _iter_jsonl_samples(file, path, field)
+            elif lines_are_samples:
+                with open(path, "r") as file:
+                    yield from _iter_line_samples(file, path)
+            else:
+                yield (path, path, None)
+
+
+def _iter_line_samples(file: TextIO, name: str) -> Iterator[BatchSample]:
+    for i, line in enumerate(file):
+        yield (f"{name}:{i + 1}", None, line.rstrip("\r\n"))
+
+
+def _iter_jsonl_samples(file: TextIO, name: str, field: str) -> Iterator[BatchSample]:
+    for i, line in enumerate(file):
+        if line.strip() == "":
+            continue
+        record = json.loads(line)
+        sample_id = record.get("id", record.get("path", f"{name}:{i + 1}"))
+        yield (str(sample_id), None, record[field])
+
+
+###########
+# Outputs #
+###########
+
+
+class BatchWriter:
+    """Writes conversion results as JSONL, either into a single file
+    (or stdout when the output is "-"), or sharded into numbered files
+    within an output directory"""
+    def __init__(
+        self,
+        output: Optional[str] = "-",
+        output_dir: Optional[str] = None,
+        shard_size: int = DEFAULT_SHARD_SIZE
+    ):
+        self.output = output
+        self.output_dir = output_dir
+        self.shard_size = shard_size
+
+        self.written_count = 0
+        self._file: Optional[TextIO] = None
+
+        if output_dir is not None:
+            os.makedirs(output_dir, exist_ok=True)
+        elif output != "-":
+            self._file = open(output, "w")
+        else:
+            self._file = sys.stdout
+
+    def write(self, record: dict):
+        if self.output_dir is not None and self.written_count % self.shard_size == 0:
+            self._close_shard()
+            shard_path = os.path.join(
+                self.output_dir,
+                "shard-{:05d}.jsonl".format(self.written_count // self.shard_size)
+            )
+            self._file = open(shard_path, "w")
+
+        print(json.dumps(record, ensure_ascii=False), file=self._file)
+        self.written_count += 1
+
+    def close(self):
+        if self.output_dir is not None:
+            self._close_shard()
+        elif self._file is not sys.stdout:
+            self._file.close()
+        else:
+            self._file.flush()
+
+    def _close_shard(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+#########
+# Batch #
+#########
+
+
+def run_batch(
+    worker_function,
+    samples: Iterable[BatchSample],
+    writer: BatchWriter,
+    workers: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    verbose=True
+):
+    """Converts samples over a process pool, writing results in input order"""
+    failed_count = 0
+    with multiprocessing.Pool(workers) as pool:
+        for record in pool.imap(worker_function, samples, chunksize=chunk_size):
+            writer.write(record)
+            if record.get("lmx", record.get("musicxml")) is None:
+                failed_count += 1
+            if verbose and writer.written_count % 1000 == 0:
+                print("Processed", writer.written_count, "samples", end="\r", file=sys.stderr)
+    writer.close()
+    if verbose:
+        print(
+            "Done,", writer.written_count, "samples,",
+            failed_count, "failed", file=sys.stderr
+        )
+
+
+def linearize_batch(sources: List[str], writer: BatchWriter, **kwargs):
+    """Linearizes MusicXML files or JSONL records with the 'musicxml' field"""
+    samples = iter_batch_samples(
+        sources,
+        extensions=MUSICXML_EXTENSIONS,
+        field="musicxml",
+        lines_are_samples=False
+    )
+    run_batch(_linearize_sample, samples, writer, **kwargs)
+
+
+def delinearize_batch(sources: List[str], writer: BatchWriter, **kwargs):
+    """Delinearizes line-per-sample LMX files or JSONL records with the 'lmx' field"""
+    samples = iter_batch_samples(
+        sources,
+        extensions=LMX_EXTENSIONS,
+        field="lmx",
+        lines_are_samples=True
+    )
+    run_batch(_delinearize_sample, samples, writer, **kwargs)
@@ -0,0 +1,64 @@
+from fractions import Fraction
+from typing import Dict, Optional, Tuple
+from .vocabulary import NOTE_TYPE_TO_QUARTER_MULTIPLE, TIME_MODIFICATION_TOKENS
+from ..symbolic.DurationGrid import DurationGrid, Ticks
+
+
+MAX_TABULATED_DOTS = 3
+"Durations with more dots are computed, not looked up"
+
+
+def quarter_multiple(
+    note_type: str,
+    time_modification: Optional[str],
+    dots: int = 0
+) -> Fraction:
+    """Duration of a note in quarter notes"""
+    # simple conversion
+    quarter_multiple = NOTE_TYPE_TO_QUARTER_MULTIPLE[note_type]
+
+    # handle duration dots
+    dot_duration = quarter_multiple / 2
+    for _ in range(dots):
+        quarter_multiple += dot_duration
+        dot_duration /= 2
+
+    # handle time modification
+    if time_modification is not None:
+        denominator, numerator = time_modification.split("in")
+        quarter_multiple = quarter_multiple * Fraction(int(numerator), int(denominator))
+
+    return quarter_multiple
+
+
+_QUARTER_MULTIPLES: Dict[Tuple[str, int, Optional[str]], Fraction] = {
+    (note_type, dots, time_modification): quarter_multiple(
+        note_type, time_modification, dots
+    )
+    for note_type in NOTE_TYPE_TO_QUARTER_MULTIPLE.keys()
+    for dots in range(MAX_TABULATED_DOTS + 1)
+    for time_modification in [None, *TIME_MODIFICATION_TOKENS]
+}
+
+DURATION_GRID = DurationGrid.covering(_QUARTER_MULTIPLES.values())
+"The grid with all the note type, dot and time modification combinations"
+
+DURATION_TICKS: Dict[Tuple[str, int, Optional[str]], int] = {
+    key: DURATION_GRID.ticks_of(value)
+    for key, value in _QUARTER_MULTIPLES.items()
+}
+"Ticks of (note type, dots, time modification) combinations"
+
+
+def duration_ticks(
+    note_type: str,
+    time_modification: Optional[str],
+    dots: int = 0
+) -> Ticks:
+    """Duration of a note in DURATION_GRID ticks"""
+    ticks = DURATION_TICKS.get((note_type, dots, time_modification))
+    if ticks is None:
+        ticks = DURATION_GRID.ticks_of(
+            quarter_multiple(note_type, time_modification, dots)
+        )
+    return ticks
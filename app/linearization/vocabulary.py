@@ -1,5 +1,6 @@
 from fractions import Fraction
-from typing import Dict
+from typing import Dict, List, Iterable, Sequence
+import numpy as np
 
 
 KEY_TOKENS = [
@@ -189,6 +190,99 @@ ALL_TOKENS = [
     *NOTE_SUFFIX_TOKENS
 ]
 
+# Token classes, stored as bit flags per token ID in the compiled vocabulary
+TOKEN_CLASS_PREFIX = 1 << 0
+TOKEN_CLASS_ROOT = 1 << 1
+TOKEN_CLASS_SUFFIX = 1 << 2
+TOKEN_CLASS_ATTRIBUTE = 1 << 3
+TOKEN_CLASS_EXTENDED = 1 << 4
+
+ATTRIBUTE_TOKENS = [
+    *KEY_TOKENS,
+    *TIME_SIGNATURE_TOKENS,
+    *CLEF_TOKENS
+]
+
+
+class CompiledVocabulary:
+    """The vocabulary compiled to stable integer IDs (the position in the
+    token list) with constant-time membership and token-class lookups.
+    Use this instead of scanning the token lists in hot loops."""
+
+    def __init__(self, tokens: List[str]):
+        self.tokens: List[str] = list(tokens)
+        "Token strings, indexed by their ID"
+
+        self.token_to_id: Dict[str, int] = {
+            token: i for i, token in enumerate(self.tokens)
+        }
+        "Maps a token string to its ID"
+
+        assert len(self.token_to_id) == len(self.tokens), \
+            "The vocabulary contains duplicate tokens"
+
+        self.token_classes = np.zeros(len(self.tokens), dtype=np.uint8)
+        "Bit mask of TOKEN_CLASS_* flags, indexed by token ID"
+
+        self._classes_by_token: Dict[str, int] = {}
+
+        for flag, class_tokens in [
+            (TOKEN_CLASS_PREFIX, NOTE_PREFIX_TOKENS),
+            (TOKEN_CLASS_ROOT, NOTE_ROOT_TOKENS),
+            (TOKEN_CLASS_SUFFIX, NOTE_SUFFIX_TOKENS),
+            (TOKEN_CLASS_ATTRIBUTE, ATTRIBUTE_TOKENS),
+            (TOKEN_CLASS_EXTENDED, EXTENDED_FLAVOR_TOKENS),
+        ]:
+            for token in class_tokens:
+                token_id = self.token_to_id.get(token)
+                if token_id is not None:
+                    self.token_classes[token_id] |= flag
+        
+        for token, token_id in self.token_to_id.items():
+            self._classes_by_token[token] = int(self.token_classes[token_id])
+    
+    def __len__(self) -> int:
+        return len(self.tokens)
+
+    def __contains__(self, token: str) -> bool:
+        return token in self.token_to_id
+    
+    def classes_of(self, token: str) -> int:
+        """Returns the class bit mask of a token string (0 if unknown)"""
+        return self._classes_by_token.get(token, 0)
+    
+    def is_of_class(self, token: str, token_class: int) -> bool:
+        """Tests whether the token belongs to any of the given classes"""
+        return (self._classes_by_token.get(token, 0) & token_class) != 0
+    
+    def encode(self, tokens: Iterable[str]) -> np.ndarray:
+        """Converts a token sequence to an array of token IDs,
+        raises KeyError on unknown tokens"""
+        return np.fromiter(
+            (self.token_to_id[token] for token in tokens),
+            dtype=np.int32
+        )
+    
+    def decode(self, token_ids: np.ndarray) -> List[str]:
+        """Converts an array of token IDs back to token strings"""
+        return [self.tokens[i] for i in token_ids]
+    
+    def translation_table(self, id_to_token: Sequence[str]) -> np.ndarray:
+        """Builds an array that maps foreign token IDs (e.g. the tag indices
+        of a trained model) to IDs of this vocabulary, with -1 for tokens
+        not present in the vocabulary. Building the table costs a pass over
+        the whole mapping and it is not cached, so build it once per model
+        and hold on to it (see Delinearizer.process_token_ids)."""
+        return np.array(
+            [self.token_to_id.get(token, -1) for token in id_to_token],
+            dtype=np.int32
+        )
+
+
+VOCABULARY = CompiledVocabulary(ALL_TOKENS)
+"The compiled vocabulary of ALL_TOKENS, token IDs are positions in ALL_TOKENS"
+
+
 def print_vocabulary(file=None):
     print(
         "\n".join(ALL_TOKENS),
@@ -0,0 +1,60 @@
+from fractions import Fraction
+from typing import Dict, Iterable, Union
+import math
+
+
+Ticks = Union[int, Fraction]
+"Duration in ticks, a Fraction only for values off the grid"
+
+
+class DurationGrid:
+    """Exact arithmetic on durations as integer ticks on a fixed grid of
+    ticks per quarter note, instead of Fraction arithmetic.
+
+    Duration texts (quarter note multiples, as in fractional <duration>
+    elements, or integers when the grid is the MusicXML divisions) are
+    converted to ticks and back through memos, so each distinct text is
+    parsed and formatted only once. The formatted text equals str(Fraction)
+    of the duration in quarter notes. Values off the grid are kept as
+    Fractions of ticks, so that the arithmetic stays exact and both kinds
+    of values can be added and compared with each other."""
+
+    def __init__(self, ticks_per_quarter: int):
+        assert ticks_per_quarter > 0
+        self.ticks_per_quarter = ticks_per_quarter
+        self._ticks_memo: Dict[str, Ticks] = {}
+        self._text_memo: Dict[int, str] = {}
+
+    @staticmethod
+    def covering(quarter_multiples: Iterable[Fraction]) -> "DurationGrid":
+        """Creates the coarsest grid with all the given values on it"""
+        ticks_per_quarter = 1
+        for value in quarter_multiples:
+            d = value.denominator
+            ticks_per_quarter = ticks_per_quarter // math.gcd(ticks_per_quarter, d) * d
+        return DurationGrid(ticks_per_quarter)
+
+    def ticks_of(self, quarter_multiple: Fraction) -> Ticks:
+        """Converts a duration in quarter notes to ticks"""
+        ticks = quarter_multiple * self.ticks_per_quarter
+        if ticks.denominator == 1:
+            return ticks.numerator
+        return ticks
+
+    def ticks(self, text: str) -> Ticks:
+        """Parses a duration text to ticks"""
+        ticks = self._ticks_memo.get(text)
+        if ticks is None:
+            ticks = self.ticks_of(Fraction(text))
+            self._ticks_memo[text] = ticks
+        return ticks
+
+    def text(self, ticks: Ticks) -> str:
+        """Formats ticks as a duration text"""
+        if type(ticks) is not int:
+            return str(Fraction(ticks) / self.ticks_per_quarter)
+        text = self._text_memo.get(ticks)
+        if text is None:
+            text = str(Fraction(ticks, self.ticks_per_quarter))
+            self._text_memo[ticks] = text
+        return text
@@ -1,5 +1,19 @@
 import zipfile
 import xml.etree.ElementTree as ET
+from typing import Iterator, List, Optional, IO
+from .PartCache import PartCache
+
+
+PIANO_INSTRUMENT_NAMES = [
+    "Piano", "Grand Piano", "Acoustic Grand Piano",
+    "Harpsichord", "Pianoforte", "Piano (2)"
+]
+
+PIANO_PART_NAMES = [
+    "Pianoforte"
+]
+
+STREAM_CHUNK_SIZE = 64 * 1024 # bytes fed to the streaming parser at once
 
 
 class MxlFile:
@@ -16,34 +30,38 @@ class MxlFile:
     def load_mxl(path: str) -> "MxlFile":
         """Loads MusicXML from the compressed MXL file"""
         with zipfile.ZipFile(path, "r") as archive:
-            for record in archive.infolist():
-                if record.filename.startswith("META-INF"):
-                    continue
-                if record.filename.endswith(".xml"):
-                    inner_file_name = record.filename
-                    break
-            with archive.open(inner_file_name) as file:
+            with archive.open(find_mxl_score_member(archive)) as file:
                 tree = ET.parse(file)
                 return MxlFile(tree)
-    
+
+    @staticmethod
+    def load_mxl_piano_part(
+        path: str,
+        part_cache: Optional[PartCache] = None
+    ) -> ET.Element:
+        """Loads only the piano <part> element from the compressed MXL file,
+        the piano part is resolved from the <part-list> alone and the other
+        parts are never built. With a part cache, the part is loaded from
+        the cache if the file has not changed since it was stored."""
+        key: Optional[str] = None
+        if part_cache is not None:
+            key = part_cache.key(path)
+            part = part_cache.load(key)
+            if part is not None:
+                return part
+
+        part_id = find_piano_part_id(read_mxl_part_list(path))
+        part = read_mxl_part(path, part_id)
+
+        if part_cache is not None:
+            part_cache.store(key, part)
+        return part
+
     def resolve_piano_part_id(self) -> str:
         """Resolves the ID of the piano part, e.g. 'P2'"""
         part_list = self.tree.getroot().find("part-list")
-        for part in part_list.findall("score-part"):
-            if part.find("score-instrument/instrument-name").text in [
-                "Piano", "Grand Piano", "Acoustic Grand Piano",
-                "Harpsichord", "Pianoforte", "Piano (2)"
-            ]:
-                return part.attrib["id"]
-            if part.find("part-name").text in [
-                "Pianoforte"
-            ]:
-                return part.attrib["id"]
-        raise Exception(
-            "No piano part found:\n" \
-                + str(ET.tostring(part_list), "utf-8")
-        )
-    
+        return find_piano_part_id(part_list)
+
     def get_piano_part(self) -> ET.Element:
         """Returns the <part> element of the piano, containing measures."""
         part_id = self.resolve_piano_part_id()
@@ -56,3 +74,194 @@ class MxlFile:
         part = parts[0]
 
         return part
+
+
+class MxlPartStream:
+    """Streams measures of one part of a compressed MXL file, without ever
+    holding the whole score in memory. Other parts are skipped by the parser
+    without building any elements and each yielded measure is cleared once
+    the consumer asks for the next one, so do not keep references to them.
+
+    Usage:
+        stream = MxlPartStream("score.mxl") # resolves the piano part
+        for measure in stream:
+            ...
+    """
+
+    def __init__(self, path: str, part_id: Optional[str] = None):
+        self.path = path
+
+        self.part_id: str = part_id or find_piano_part_id(
+            read_mxl_part_list(path)
+        )
+        "ID of the streamed part, the piano part by default"
+
+    def __iter__(self) -> Iterator[ET.Element]:
+        with zipfile.ZipFile(self.path, "r") as archive:
+            with archive.open(find_mxl_score_member(archive)) as file:
+                target = _PartMeasuresTarget(self.part_id)
+                parser = ET.XMLParser(target=target)
+                for chunk in _read_chunks(file):
+                    parser.feed(chunk)
+                    yield from _drain_measures(target)
+                parser.close()
+                yield from _drain_measures(target)
+                assert target.part_found, \
+                    f"The part '{self.part_id}' is not present in the score"
+
+
+def find_mxl_score_member(archive: zipfile.ZipFile) -> str:
+    """Finds the name of the MusicXML score file within the MXL archive"""
+    for record in archive.infolist():
+        if record.filename.startswith("META-INF"):
+            continue
+        if record.filename.endswith(".xml"):
+            return record.filename
+    raise Exception("The MXL archive does not contain a MusicXML file")
+
+
+def read_mxl_part_list(path: str) -> ET.Element:
+    """Reads only the <part-list> element of a compressed MXL file,
+    parsing stops as soon as the element is complete"""
+    with zipfile.ZipFile(path, "r") as archive:
+        with archive.open(find_mxl_score_member(archive)) as file:
+            return read_part_list(file)
+
+
+def read_part_list(file: IO[bytes]) -> ET.Element:
+    """Reads only the <part-list> element from a MusicXML file stream"""
+    depth = 0
+    for event, element in ET.iterparse(file, events=("start", "end")):
+        if event == "start":
+            depth += 1
+            continue
+        depth -= 1
+        if depth == 1 and element.tag == "part-list":
+            return element
+    raise Exception("The MusicXML file does not contain <part-list>")
+
+
+def read_mxl_part(path: str, part_id: str) -> ET.Element:
+    """Reads only the <part> element with the given ID from a compressed
+    MXL file, elements of the other parts are not built"""
+    with zipfile.ZipFile(path, "r") as archive:
+        with archive.open(find_mxl_score_member(archive)) as file:
+            target = _PartTarget(part_id)
+            parser = ET.XMLParser(target=target)
+            for chunk in _read_chunks(file):
+                parser.feed(chunk)
+            parser.close()
+            assert target.part is not None, \
+                f"The part '{part_id}' is not present in the score"
+            return target.part
+
+
+def find_piano_part_id(part_list: ET.Element) -> str:
+    """Resolves the ID of the piano part from the <part-list> element"""
+    for part in part_list.findall("score-part"):
+        if part.find("score-instrument/instrument-name").text in PIANO_INSTRUMENT_NAMES:
+            return part.attrib["id"]
+        if part.find("part-name").text in PIANO_PART_NAMES:
+            return part.attrib["id"]
+    raise Exception(
+        "No piano part found:\n" \
+            + str(ET.tostring(part_list), "utf-8")
+    )
+
+
+class _PartMeasuresTarget:
+    """XMLParser target that builds only the measures of one part,
+    all the other elements are skipped without being built"""
+
+    def __init__(self, part_id: str):
+        self.part_id = part_id
+        self.part_found = False
+        self.finished_measures: List[ET.Element] = []
+
+        self._depth = 0
+        self._in_part = False
+        self._builder: Optional[ET.TreeBuilder] = None
+
+    def start(self, tag: str, attrib: dict):
+        self._depth += 1
+        if self._depth == 1:
+            assert tag == "score-partwise", "Only partwise scores are supported"
+        elif self._depth == 2 and tag == "part":
+            self._in_part = attrib.get("id") == self.part_id
+            self.part_found = self.part_found or self._in_part
+        elif self._depth == 3 and self._in_part:
+            self._builder = ET.TreeBuilder()
+
+        if self._builder is not None:
+            self._builder.start(tag, attrib)
+
+    def end(self, tag: str):
+        if self._builder is not None:
+            self._builder.end(tag)
+            if self._depth == 3:
+                self.finished_measures.append(self._builder.close())
+                self._builder = None
+        if self._depth == 2:
+            self._in_part = False
+        self._depth -= 1
+
+    def data(self, data: str):
+        if self._builder is not None:
+            self._builder.data(data)
+
+    def close(self):
+        pass
+
+
+class _PartTarget:
+    """XMLParser target that builds only one part,
+    all the other elements are skipped without being built"""
+
+    def __init__(self, part_id: str):
+        self.part_id = part_id
+        self.part: Optional[ET.Element] = None
+
+        self._depth = 0
+        self._builder: Optional[ET.TreeBuilder] = None
+
+    def start(self, tag: str, attrib: dict):
+        self._depth += 1
+        if self._depth == 1:
+            assert tag == "score-partwise", "Only partwise scores are supported"
+        elif self._depth == 2 and tag == "part" and self.part is None:
+            if attrib.get("id") == self.part_id:
+                self._builder = ET.TreeBuilder()
+
+        if self._builder is not None:
+            self._builder.start(tag, attrib)
+
+    def end(self, tag: str):
+        if self._builder is not None:
+            self._builder.end(tag)
+            if self._depth == 2:
+                self.part = self._builder.close()
+                self._builder = None
+        self._depth -= 1
+
+    def data(self, data: str):
+        if self._builder is not None:
+            self._builder.data(data)
+
+    def close(self):
+        pass
+
+
+def _read_chunks(file: IO[bytes]) -> Iterator[bytes]:
+    while True:
+        chunk = file.read(STREAM_CHUNK_SIZE)
+        if not chunk:
+            return
+        yield chunk
+
+
+def _drain_measures(target: _PartMeasuresTarget) -> Iterator[ET.Element]:
+    measures = target.finished_measures
+    target.finished_measures = []
+    for measure in measures:
+        yield measure
+        measure.clear()
@@ -0,0 +1,146 @@
+import xml.etree.ElementTree as ET
+from typing import Callable, Dict, Optional
+from .Pruner import Pruner, prune_children
+from .DurationGrid import DurationGrid
+
+
+class NormalizationPlan:
+    """Pruning (by the rules of a Pruner) and conversion to fractional
+    durations compiled into a single traversal of a part. The result is
+    identical to running actual_durations_to_fractional and then
+    Pruner.process_part, each measure and note is only visited once.
+    The plan keeps no state between parts, so it can be reused."""
+
+    def __init__(self, pruner: Optional[Pruner], fractional_durations: bool):
+        self.pruner = pruner
+        self.fractional_durations = fractional_durations
+
+        # the rules themselves are those of the pruner, only the
+        # traversal is compiled here
+        self._measure_prune_tags = set()
+        self._note_prune_tags = set()
+        if pruner is not None:
+            self._measure_prune_tags = pruner.measure_prune_tags
+            self._note_prune_tags = pruner.note_prune_tags
+
+        # what to do with each kind of measure children
+        self._measure_handlers: Dict[str, Callable[[ET.Element], None]] = {
+            "note": self._process_note,
+            "forward": self._process_forward_backup,
+            "backup": self._process_forward_backup,
+            "attributes": self._process_attributes,
+        }
+
+        # divisions-scoped state of the part being processed
+        self._grid: Optional[DurationGrid] = None
+        self._grids: Dict[int, DurationGrid] = {}
+        self._integer_grid = DurationGrid(1)
+
+    def process_part(self, part: ET.Element):
+        assert part.tag == "part"
+        self._grid = None
+        for measure in part:
+            self.process_measure(measure)
+
+    def process_measure(self, measure: ET.Element):
+        assert measure.tag == "measure"
+
+        if self.pruner is not None:
+            self.pruner.process_measure_attrib(measure)
+
+        kept = []
+        for element in measure:
+            if element.tag in self._measure_prune_tags:
+                continue
+            kept.append(element)
+            handler = self._measure_handlers.get(element.tag)
+            if handler is not None:
+                handler(element)
+
+        if len(kept) < len(measure):
+            measure[:] = kept
+
+    def _convert_duration(self, duration_element: Optional[ET.Element]):
+        if duration_element is None:
+            return
+        assert self._grid is not None
+        duration_element.text = self._grid.text(
+            self._integer_grid.ticks(duration_element.text)
+        )
+
+    def _process_attributes(self, attributes: ET.Element):
+        if self.fractional_durations:
+            divisions_element = attributes.find("divisions")
+            if divisions_element is not None:
+                divisions = int(divisions_element.text)
+                self._grid = self._grids.get(divisions)
+                if self._grid is None:
+                    self._grid = DurationGrid(divisions)
+                    self._grids[divisions] = self._grid
+                attributes.remove(divisions_element)
+
+        if self.pruner is not None:
+            self.pruner.process_attributes(attributes)
+
+    def _process_forward_backup(self, element: ET.Element):
+        if self.fractional_durations:
+            self._convert_duration(element.find("duration"))
+
+        if self.pruner is not None:
+            if element.tag == "forward":
+                self.pruner.process_forward(element)
+            else:
+                self.pruner.process_backup(element)
+
+    def _process_note(self, note: ET.Element):
+        # one pass over the children, the first of each kind is kept
+        # (just like find does)
+        duration_element = None
+        rest_element = None
+        type_element = None
+        accidental_element = None
+        time_modification_element = None
+        notations_element = None
+        pruned = False
+        for child in note:
+            tag = child.tag
+            if tag == "duration":
+                if duration_element is None:
+                    duration_element = child
+            elif tag == "rest":
+                if rest_element is None:
+                    rest_element = child
+            elif tag == "type":
+                if type_element is None:
+                    type_element = child
+            elif tag == "accidental":
+                if accidental_element is None:
+                    accidental_element = child
+            elif tag == "time-modification":
+                if time_modification_element is None:
+                    time_modification_element = child
+            elif tag == "notations":
+                if notations_element is None:
+                    notations_element = child
+            if tag in self._note_prune_tags:
+                pruned = True
+
+        if self.fractional_durations:
+            self._convert_duration(duration_element)
+
+        if self.pruner is None:
+            return
+
+        self.pruner.process_note_attrib(note)
+
+        if pruned:
+            prune_children(note, self._note_prune_tags)
+
+        self.pruner.process_note_children(
+            note,
+            rest_element=rest_element,
+            type_element=type_element,
+            accidental_element=accidental_element,
+            time_modification_element=time_modification_element,
+            notations_element=notations_element
+        )
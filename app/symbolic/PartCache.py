@@ -0,0 +1,61 @@
+import glob
+import hashlib
+import json
+import os
+import tempfile
+import zlib
+import xml.etree.ElementTree as ET
+from typing import Optional
+
+
+PART_CACHE_VERSION = 1
+"Increment when the cache entry format or the part extraction changes"
+
+
+class PartCache:
+    """On-disk cache of parts extracted from MXL files, so that repeated
+    scans of the same corpus do not unzip and parse the whole scores again.
+
+    Entries are keyed by the absolute path, modification time and size of
+    the MXL file (and the cache version), so a changed file is parsed anew.
+    Each entry is the zlib-compressed XML of the part, which loads several
+    times faster than the score it comes from.
+    """
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def key(self, mxl_path: str) -> str:
+        """Computes the cache key of the file (stat-ed, not read)"""
+        stat = os.stat(mxl_path)
+        return hashlib.sha256(json.dumps([
+            PART_CACHE_VERSION,
+            os.path.abspath(mxl_path),
+            stat.st_mtime_ns,
+            stat.st_size
+        ]).encode("utf-8")).hexdigest()
+
+    def load(self, key: str) -> Optional[ET.Element]:
+        """Returns the cached part, or None if not cached"""
+        try:
+            with open(self._entry_path(key), "rb") as file:
+                return ET.fromstring(zlib.decompress(file.read()))
+        except FileNotFoundError:
+            return None
+
+    def store(self, key: str, part: ET.Element):
+        """Stores the part, the write is atomic so that multiple
+        processes may share the cache"""
+        fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        with os.fdopen(fd, "wb") as file:
+            file.write(zlib.compress(ET.tostring(part)))
+        os.replace(temp_path, self._entry_path(key))
+
+    def clear(self):
+        """Removes all the cache entries"""
+        for path in glob.glob(os.path.join(self.cache_dir, "*.part")):
+            os.remove(path)
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key + ".part")
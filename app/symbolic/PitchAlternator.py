@@ -1,20 +1,31 @@
 import xml.etree.ElementTree as ET
 from typing import Optional, List, Dict, Tuple
-from fractions import Fraction
+import bisect
 import copy
+from .DurationGrid import DurationGrid, Ticks
+
+
+MeasureItem = Tuple[ET.Element, Optional[Tuple[str, str, str]], Ticks, Optional[str]]
+"A note or attributes element with its visual pitch, onset and accidental"
 
 
 class PitchAlternator:
-    """Updates the <alter> pitch tag to match the key signature and accidentals."""
+    """Updates the <alter> pitch tag to match the key signature and accidentals.
+    Onsets are computed in ticks of the given duration grid (exact for any
+    durations, fastest for durations on the grid)."""
+
+    def __init__(self, grid: Optional[DurationGrid] = None):
+        self._grid = grid if grid is not None else DurationGrid(1)
 
-    def __init__(self):
         # part-scoped state
         self._key_signature: int = 0
         self._measure_number = 0
 
         # measure-scoped state
-        self._onset: Fraction = Fraction(0)
-        self._measure_accidentals: Dict[str, List[Tuple[Fraction, str]]] = {}
+        self._onset: Ticks = 0
+        self._measure_accidentals: Dict[
+            Tuple[str, str, str], Tuple[List[Ticks], List[str]]
+        ] = {} # pitch -> (sorted onsets, accidentals)
         self._tie_starts: Dict[str, ET.Element] = {}
         self._previous_tie_starts: Dict[str, ET.Element] = {}
 
@@ -23,29 +34,43 @@ class PitchAlternator:
 
         self._measure_number += 1
 
-        self._onset = Fraction(0)
-        self._measure_accidentals = {}
-        self.collect_measure_accidentals(measure)
+        items = self.scan_measure(measure)
+        self.collect_measure_accidentals(items)
         # print(self._measure_number, self._measure_accidentals)
-        self._onset = Fraction(0)
 
         self._previous_tie_starts = self._tie_starts
         self._tie_starts = {}
 
+        for element, pitch, note_onset, _ in items:
+            if element.tag == "note":
+                if pitch is not None:
+                    self.process_note(element, pitch, note_onset)
+                    self.process_ties(element, pitch)
+            else:
+                self.process_attributes(element)
+    
+    def scan_measure(self, measure: ET.Element) -> List[MeasureItem]:
+        """Lists the notes (with their visual pitch, onset and accidental)
+        and attributes of the measure in one pass, computing the onsets"""
+        self._onset = 0
+        items: List[MeasureItem] = []
         for element in measure:
             if element.tag == "note":
-                self.process_note(element)
-                self.process_ties(element)
+                pitch = get_visual_pitch(element)
+                accidental_element = element.find("accidental")
+                items.append((
+                    element,
+                    pitch,
+                    self.get_note_onset(element),
+                    accidental_element.text if accidental_element is not None else None
+                ))
             elif element.tag == "attributes":
-                self.process_attributes(element)
+                items.append((element, None, self._onset, None))
             
             self.update_onset(element)
+        return items
     
-    def process_ties(self, note: ET.Element):
-        pitch = get_visual_pitch(note)
-        if pitch is None:
-            return
-
+    def process_ties(self, note: ET.Element, pitch: Tuple[str, str, str]):
         has_start = False  # can be both!
         has_stop = False
         for tie in note.iterfind("tie"):
@@ -75,36 +100,23 @@ class PitchAlternator:
         stop_pitch = stop_note.find("pitch")
         stop_pitch[:] = copy.deepcopy(list(start_pitch[:]))
 
-    def collect_measure_accidentals(self, measure: ET.Element):
-        for element in measure:
-            if element.tag != "note":
-                self.update_onset(element)
-                continue
-
-            pitch = get_visual_pitch(element)
-            if pitch is None:
-                self.update_onset(element)
+    def collect_measure_accidentals(self, items: List[MeasureItem]):
+        # accidentals by pitch, sorted by onset (and the accidental)
+        accidentals: Dict[Tuple[str, str, str], List[Tuple[Ticks, str]]] = {}
+        for _, pitch, note_onset, accidental in items:
+            if pitch is None or accidental is None:
                 continue
-            
-            accidental_element = element.find("accidental")
-            if accidental_element is None:
-                self.update_onset(element)
-                continue
-
-            note_onset = self.get_note_onset(element)
-            
-            # record the accidental
-            if pitch not in self._measure_accidentals:
-                self._measure_accidentals[pitch] = []
-            self._measure_accidentals[pitch].append(
-                (note_onset, accidental_element.text)
-            )
-
-            self.update_onset(element)
+            if pitch not in accidentals:
+                accidentals[pitch] = []
+            accidentals[pitch].append((note_onset, accidental))
         
-        # sort accidentals by onset
-        for pitch in self._measure_accidentals.keys():
-            self._measure_accidentals[pitch].sort()
+        self._measure_accidentals = {}
+        for pitch, pitch_accidentals in accidentals.items():
+            pitch_accidentals.sort()
+            self._measure_accidentals[pitch] = (
+                [onset for onset, _ in pitch_accidentals],
+                [accidental for _, accidental in pitch_accidentals]
+            )
 
     def update_onset(self, element: ET.Element):
         if element.tag not in {"note", "forward", "backup"}:
@@ -118,17 +130,17 @@ class PitchAlternator:
             if element.find("chord") is not None:
                 return # chord notes have duration but do not move onset
 
-        duration = Fraction(duration_element.text)
+        duration = self._grid.ticks(duration_element.text)
         if element.tag == "backup":
             duration = -duration
         
         self._onset += duration
     
     def get_note_onset(self, note: ET.Element):
-        note_duration = Fraction(0)
+        note_duration = 0
         duration_element = note.find("duration")
         if duration_element is not None:
-            note_duration = Fraction(duration_element.text)
+            note_duration = self._grid.ticks(duration_element.text)
 
         note_onset = self._onset
         if note.find("chord") is not None:
@@ -141,11 +153,7 @@ class PitchAlternator:
         if fifths_element is not None:
             self._key_signature = int(fifths_element.text)
 
-    def process_note(self, note: ET.Element):
-        pitch = get_visual_pitch(note)
-        if pitch is None:
-            return
-
+    def process_note(self, note: ET.Element, pitch: Tuple[str, str, str], note_onset: Ticks):
         pitch_element = note.find("pitch")
         alter_element = pitch_element.find("alter")
         if alter_element is None:
@@ -153,14 +161,13 @@ class PitchAlternator:
             pitch_element.insert(1, alter_element)
         
         # compute the alter
-        note_onset = self.get_note_onset(note)
         alter = self.get_note_alter(pitch, note_onset)
         alter_element.text = str(alter)
         
         if alter == 0:
             pitch_element.remove(alter_element)
     
-    def get_note_alter(self, pitch: Tuple[str, str, str], note_onset: Fraction) -> int:
+    def get_note_alter(self, pitch: Tuple[str, str, str], note_onset: Ticks) -> int:
         # accidental carried from this! and previous notes in the measure
         carried_accidental = self.get_carried_accidental(pitch, note_onset)
 
@@ -177,15 +184,15 @@ class PitchAlternator:
         
         return accidental_to_alteration(actual_accidental)
     
-    def get_carried_accidental(self, pitch: Tuple[str, str, str], note_onset: Fraction) -> Optional[str]:
-        accidentals = [
-            accidental for onset, accidental
-            in self._measure_accidentals.get(pitch, [])
-            if onset <= note_onset
-        ]
-        if len(accidentals) == 0:
+    def get_carried_accidental(self, pitch: Tuple[str, str, str], note_onset: Ticks) -> Optional[str]:
+        # the last accidental at or before the note onset
+        if pitch not in self._measure_accidentals:
+            return None
+        onsets, accidentals = self._measure_accidentals[pitch]
+        index = bisect.bisect_right(onsets, note_onset)
+        if index == 0:
             return None
-        return accidentals[-1]
+        return accidentals[index - 1]
     
     def get_key_signature_accidental(self, step: str) -> Optional[str]:
         _SHARPS = ["F", "C", "G", "D", "A", "E", "B"] # fis, cis, gis, ...
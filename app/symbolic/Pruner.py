@@ -1,5 +1,6 @@
 from fractions import Fraction
 import xml.etree.ElementTree as ET
+from typing import Optional
 
 
 class Pruner:
@@ -8,6 +9,9 @@ class Pruner:
     delinearized XML; It ignores elements that TEDn ignores and attributes
     that are relevant to layout, not content."""
 
+    RULES_VERSION = 1
+    "Increment when the pruning rules change, invalidates cached pruned data"
+
     def __init__(
         self,
         prune_durations=False,
@@ -44,10 +48,7 @@ class Pruner:
     def process_measure(self, measure: ET.Element):
         assert measure.tag == "measure"
 
-        if self.prune_measure_attributes:
-            measure.attrib.pop("number", None)
-            measure.attrib.pop("implicit", None)
-            measure.attrib.pop("width", None)
+        self.process_measure_attrib(measure)
         
         prune_children(measure, self.measure_prune_tags)
 
@@ -61,6 +62,12 @@ class Pruner:
             elif element.tag == "attributes":
                 self.process_attributes(element)
     
+    def process_measure_attrib(self, measure: ET.Element):
+        if self.prune_measure_attributes:
+            measure.attrib.pop("number", None)
+            measure.attrib.pop("implicit", None)
+            measure.attrib.pop("width", None)
+
     def process_forward(self, forward: ET.Element):
         if self.prune_durations:
             prune_children(forward, {"duration"})
@@ -88,35 +95,56 @@ class Pruner:
     def process_note(self, note: ET.Element):
         assert note.tag == "note"
         
+        self.process_note_attrib(note)
+
+        prune_children(note, self.note_prune_tags)
+
+        self.process_note_children(
+            note,
+            rest_element=note.find("rest"),
+            type_element=note.find("type"),
+            accidental_element=note.find("accidental"),
+            time_modification_element=note.find("time-modification"),
+            notations_element=note.find("notations")
+        )
+
+    def process_note_attrib(self, note: ET.Element):
         note.attrib.pop("default-x", None)
         note.attrib.pop("default-y", None)
         note.attrib.pop("dynamics", None)
 
-        prune_children(note, self.note_prune_tags)
-
-        rest_element = note.find("rest")
+    def process_note_children(
+        self,
+        note: ET.Element,
+        rest_element: Optional[ET.Element],
+        type_element: Optional[ET.Element],
+        accidental_element: Optional[ET.Element],
+        time_modification_element: Optional[ET.Element],
+        notations_element: Optional[ET.Element]
+    ):
+        """Prunes the (already found, first of each kind) children of the
+        note, shared with NormalizationPlan which finds them in one scan"""
         if rest_element is not None:
             if len(rest_element) > 0:
                 rest_element[:] = [] # remove children
 
-        type_element = note.find("type")
         if type_element is not None:
             type_element.attrib.clear()
 
-        accidental_element = note.find("accidental")
         if accidental_element is not None:
             accidental_element.attrib.clear()
 
-        time_modification_element = note.find("time-modification")
         if time_modification_element is not None:
-            allow_children(time_modification_element, {"actual-notes", "normal-notes"})
+            self.process_time_modification(time_modification_element)
 
-        notations_element = note.find("notations")
         if notations_element is not None:
             self.process_notations(notations_element)
             if len(notations_element) == 0:
                 note.remove(notations_element)
     
+    def process_time_modification(self, time_modification: ET.Element):
+        allow_children(time_modification, {"actual-notes", "normal-notes"})
+
     def process_notations(self, notations: ET.Element):
         allow_children(notations, {
             "tied", "slur", "tuplet", "ornaments", "articulations",
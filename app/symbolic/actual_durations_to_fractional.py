@@ -1,6 +1,6 @@
 import xml.etree.ElementTree as ET
-from fractions import Fraction
 from typing import Optional
+from .DurationGrid import DurationGrid
 
 
 def actual_durations_to_fractional(part: ET.Element):
@@ -10,6 +10,10 @@ def actual_durations_to_fractional(part: ET.Element):
         return
     
     current_divisions: Optional[int] = None
+
+    # actual durations are ticks of the divisions grid
+    integer_grid = DurationGrid(1)
+    grids = {} # divisions -> DurationGrid
     
     def _visit_duration(duration_element: ET.Element):
         nonlocal current_divisions
@@ -18,9 +22,13 @@ def actual_durations_to_fractional(part: ET.Element):
         
         assert current_divisions is not None
 
-        d = Fraction(duration_element.text)
-        d = d / current_divisions
-        duration_element.text = str(d)
+        grid = grids.get(current_divisions)
+        if grid is None:
+            grid = DurationGrid(current_divisions)
+            grids[current_divisions] = grid
+        duration_element.text = grid.text(
+            integer_grid.ticks(duration_element.text)
+        )
     
     def _visit_notelike(notelike_element: ET.Element):
         duration_element = notelike_element.find("duration")
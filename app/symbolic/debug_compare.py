@@ -1,4 +1,5 @@
 import xml.etree.ElementTree as ET
+from typing import List
 
 
 def compare_parts(expected: ET.Element, given: ET.Element):
@@ -35,4 +36,48 @@ def compare_elements(measure_number: str, expected: ET.Element, given: ET.Elemen
         print()
         print("MEASURE: ", measure_number)
         print("EXPECTED:", e)
-        print("GIVEN:   ", g)
\ No newline at end of file
+        print("GIVEN:   ", g)
+
+def list_part_differences(expected: ET.Element, given: ET.Element) -> List[dict]:
+    """Like compare_parts, but returns the differences as records
+    (one per differing element, or per measure if the contents do not
+    align) instead of printing them"""
+    measures_e = expected.findall("measure")
+    measures_g = given.findall("measure")
+    if len(measures_e) != len(measures_g):
+        return [{
+            "measure": None,
+            "message": "Non-matching measure counts!",
+            "expected": len(measures_e),
+            "given": len(measures_g),
+        }]
+    
+    differences = []
+    for e_measure, g_measure in zip(measures_e, measures_g):
+        measure_number = e_measure.get("number")
+
+        if len(e_measure) != len(g_measure):
+            pairs = [(e_measure, g_measure)]
+            message = "Non-matching measure contents!"
+        else:
+            pairs = zip(e_measure, g_measure)
+            message = "Non-matching elements!"
+        
+        for e, g in pairs:
+            e_canonical = _canonicalize(e)
+            g_canonical = _canonicalize(g)
+            if e_canonical != g_canonical:
+                differences.append({
+                    "measure": measure_number,
+                    "message": message,
+                    "expected": e_canonical,
+                    "given": g_canonical,
+                })
+    return differences
+
+
+def _canonicalize(element: ET.Element) -> str:
+    return ET.canonicalize(
+        ET.tostring(element),
+        strip_text=True
+    )
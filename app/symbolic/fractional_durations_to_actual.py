@@ -1,6 +1,7 @@
 import xml.etree.ElementTree as ET
 from fractions import Fraction
 import math
+from .DurationGrid import DurationGrid
 from .get_head_attributes import get_head_attributes
 from .sort_attributes import sort_attributes
 
@@ -16,16 +17,18 @@ def fractional_durations_to_actual(part: ET.Element):
     assert len(divisions) == 0, "Fractional part should not contain <divisions>"
 
     # get all duration values
+    duration_elements = list(part.iter("duration"))
     duration_values = set(
-        Fraction(e.text) for e in part.iter("duration")
+        Fraction(text) for text in set(e.text for e in duration_elements)
     )
 
     # compute divisions
     denominators = [v.denominator for v in duration_values]
     
     # LCM magic algorithm
-    lcm = denominators[0]
-    for d in denominators[1:]:
+    # (a part without any durations, e.g. with empty measures, gets 1)
+    lcm = 1
+    for d in denominators:
         lcm = lcm // math.gcd(lcm, d) * d
     divisions = lcm
 
@@ -37,7 +40,9 @@ def fractional_durations_to_actual(part: ET.Element):
     sort_attributes(attributes_element)
 
     # update all duration elements
-    for e in part.iter("duration"):
-        d = Fraction(e.text) * divisions
-        assert d.denominator == 1
-        e.text = str(d.numerator)
+    # (all the values are on the divisions grid)
+    grid = DurationGrid(divisions)
+    for e in duration_elements:
+        ticks = grid.ticks(e.text)
+        assert type(ticks) is int
+        e.text = str(ticks)
@@ -28,7 +28,8 @@ def split_part_to_systems(
     part: ET.Element,
     emit_attributes_header=True,
     attributes_to_emit=["divisions", "key", "staves", "clef"],
-    remove_page_and_system_breaks=True
+    remove_page_and_system_breaks=True,
+    share_unmodified_measures=False
 ) -> List[Page]:
     """
     Splits a MusicXML <part> element up into multiple <part> elements by
@@ -50,6 +51,13 @@ def split_part_to_systems(
     
     remove_page_and_system_breaks: bool
         When true, the page and system breaks on the measures are removed.
+    
+    share_unmodified_measures: bool
+        When true, only the measures that are modified (by removing breaks
+        or emitting the attributes header) are copied, the other measures
+        (and the emitted header elements) are shared by the input part and
+        the resulting systems, instead of copying the whole part. Then neither
+        may be modified while the other is in use.
     """
     assert part.tag == "part"
     part_id = part.get("id", None)
@@ -70,7 +78,13 @@ def split_part_to_systems(
     
     for original_measure in part:
         # make a copy so that we dont't modify the original
-        measure = copy.deepcopy(original_measure)
+        # (only when the measure is going to be modified, if sharing)
+        if share_unmodified_measures and not _will_be_modified(
+            original_measure, remove_page_and_system_breaks
+        ):
+            measure = original_measure
+        else:
+            measure = copy.deepcopy(original_measure)
 
         # detect page and system breaks
         new_system_measure = False
@@ -102,7 +116,12 @@ def split_part_to_systems(
             _update_tracked_attributes(tracked_attributes, head_attributes)
         if emit_attributes_header and new_system_measure and _something_is_tracked(tracked_attributes):
             head_attributes = get_head_attributes(measure, create_if_missing=True)
-            _emit_header(tracked_attributes, head_attributes, attributes_to_emit)
+            _emit_header(
+                tracked_attributes,
+                head_attributes,
+                attributes_to_emit,
+                copy_elements=not share_unmodified_measures
+            )
         for attributes_element in measure.iterfind("attributes"):
             _update_tracked_attributes(tracked_attributes, attributes_element)
 
@@ -112,6 +131,19 @@ def split_part_to_systems(
     return pages
 
 
+def _will_be_modified(measure: ET.Element, remove_page_and_system_breaks: bool) -> bool:
+    # mirrors the print element handling above, a measure starting
+    # a new system may get the attributes header
+    print_element = measure.find("print")
+    if print_element is None:
+        return False
+    if print_element.get("new-system") == "yes" or print_element.get("new-page") == "yes":
+        return True
+    if remove_page_and_system_breaks:
+        return len(print_element) == 0 and len(print_element.attrib) == 0
+    return False
+
+
 def _update_tracked_attributes(tracked_attributes: dict, attributes: ET.Element):
     # divisions
     divisions_element = attributes.find("divisions")
@@ -148,13 +180,21 @@ def _update_tracked_attributes(tracked_attributes: dict, attributes: ET.Element)
         tracked_attributes["clef"][staff] = clef_element
 
 
-def _emit_header(tracked_attributes: dict, attributes: ET.Element, attributes_to_emit: list):
+def _emit_header(
+    tracked_attributes: dict,
+    attributes: ET.Element,
+    attributes_to_emit: list,
+    copy_elements=True
+):
+    def _copy(element: ET.Element) -> ET.Element:
+        return copy.deepcopy(element) if copy_elements else element
+
     # divisions
     if "divisions" in attributes_to_emit:
         divisions_element = attributes.find("divisions")
         if divisions_element is None and tracked_attributes["divisions"] is not None:
             attributes.append(
-                copy.deepcopy(tracked_attributes["divisions"])
+                _copy(tracked_attributes["divisions"])
             )
     
     # key
@@ -162,7 +202,7 @@ def _emit_header(tracked_attributes: dict, attributes: ET.Element, attributes_to
         key_element = attributes.find("key")
         if key_element is None and tracked_attributes["key"] is not None:
             attributes.append(
-                copy.deepcopy(tracked_attributes["key"])
+                _copy(tracked_attributes["key"])
             )
     
     # time
@@ -170,7 +210,7 @@ def _emit_header(tracked_attributes: dict, attributes: ET.Element, attributes_to
         time_element = attributes.find("time")
         if time_element is None and tracked_attributes["time"] is not None:
             attributes.append(
-                copy.deepcopy(tracked_attributes["time"])
+                _copy(tracked_attributes["time"])
             )
     
     # staves
@@ -178,7 +218,7 @@ def _emit_header(tracked_attributes: dict, attributes: ET.Element, attributes_to
         staves_element = attributes.find("staves")
         if staves_element is None and tracked_attributes["staves"] is not None:
             attributes.append(
-                copy.deepcopy(tracked_attributes["staves"])
+                _copy(tracked_attributes["staves"])
             )
     
     # clef
@@ -192,7 +232,7 @@ def _emit_header(tracked_attributes: dict, attributes: ET.Element, attributes_to
             except StopIteration:
                 # the clef element is not present, add it
                 attributes.append(
-                    copy.deepcopy(tracked_attributes["clef"][number])
+                    _copy(tracked_attributes["clef"][number])
                 )
     
     sort_attributes(attributes)
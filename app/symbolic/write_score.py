@@ -0,0 +1,77 @@
+import io
+import xml.etree.ElementTree as ET
+from typing import Callable, TextIO
+
+# the escaping rules of the ElementTree serializer itself,
+# so that the output stays byte-identical with ET.tostring
+from xml.etree.ElementTree import _escape_attrib, _escape_cdata
+
+
+XML_DECLARATION = "<?xml version='1.0' encoding='utf-8'?>\n"
+
+
+def write_part_as_score(
+    file: TextIO,
+    part: ET.Element,
+    part_id="P2",
+    part_name="Piano",
+    musicxml_version="3.1"
+):
+    """Writes a <part> element embedded in a MusicXML <score-partwise> file
+    into a text stream, measure by measure. The output is identical to
+    ET.tostring(part_to_score(part).getroot(), encoding="utf-8",
+    xml_declaration=True), but neither the score element tree nor the whole
+    document string is ever built. Unlike part_to_score, the part
+    element is not modified."""
+    write = file.write
+
+    write(XML_DECLARATION)
+    write('<score-partwise version="' + _escape_attrib(musicxml_version) + '">')
+    write(
+        '<part-list><score-part id="' + _escape_attrib(part_id) + '">'
+        + "<part-name>" + _escape_cdata(part_name) + "</part-name>"
+        + "</score-part></part-list>"
+    )
+
+    attrib = dict(part.attrib)
+    attrib["id"] = part_id
+    _write_element(write, part.tag, attrib, part.text, part)
+    if part.tail:
+        write(_escape_cdata(part.tail))
+
+    write("</score-partwise>")
+
+
+def part_to_score_string(
+    part: ET.Element,
+    part_id="P2",
+    part_name="Piano",
+    musicxml_version="3.1"
+) -> str:
+    """Returns the MusicXML document string of a part, see write_part_as_score"""
+    buffer = io.StringIO()
+    write_part_as_score(buffer, part, part_id, part_name, musicxml_version)
+    return buffer.getvalue()
+
+
+def _write_element(
+    write: Callable[[str], None],
+    tag: str,
+    attrib: dict,
+    text: str,
+    children: ET.Element
+):
+    write("<" + tag)
+    for key, value in attrib.items():
+        write(" " + key + '="' + _escape_attrib(value) + '"')
+    if text or len(children):
+        write(">")
+        if text:
+            write(_escape_cdata(text))
+        for child in children:
+            _write_element(write, child.tag, child.attrib, child.text, child)
+            if child.tail:
+                write(_escape_cdata(child.tail))
+        write("</" + tag + ">")
+    else:
+        write(" />")
@@ -0,0 +1,50 @@
+import unittest
+import json
+import os
+import tempfile
+from zeus.tedn_metric import sample_hash, load_results, open_results, \
+    chunk_by_length
+
+
+class TEDnMetricTest(unittest.TestCase):
+    def test_sample_hash_covers_the_evaluation(self):
+        base = sample_hash("full", "<gold/>", "pred")
+        self.assertEqual(base, sample_hash("full", "<gold/>", "pred"))
+        for other in [
+            sample_hash("lmx", "<gold/>", "pred"),
+            sample_hash("full", "<other/>", "pred"),
+            sample_hash("full", "<gold/>", "other"),
+            sample_hash("full", "<gold/>", "pred", max_nodes=1000),
+            sample_hash("full", "<gold/>", "pred", time_limit=10.0),
+        ]:
+            self.assertNotEqual(base, other)
+
+    def test_results_survive_a_truncated_last_line(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "results.jsonl")
+            self.assertEqual(load_results(path), {})
+
+            with open(path, "w", encoding="utf-8") as file:
+                file.write(json.dumps({"hash": "a", "edit_cost": 1}) + "\n")
+                file.write('{"hash": "b", "edit_') # interrupted write
+            self.assertEqual(list(load_results(path).keys()), ["a"])
+
+            with open_results(path) as results_file:
+                print(json.dumps({"hash": "b", "edit_cost": 2}), file=results_file)
+            results = load_results(path)
+            self.assertEqual(sorted(results.keys()), ["a", "b"])
+            self.assertEqual(results["b"]["edit_cost"], 2)
+
+            with open_results(path) as results_file: # complete, not changed
+                pass
+            with open(path, "r", encoding="utf-8") as file:
+                self.assertEqual(len(file.read().splitlines()), 3)
+
+    def test_chunks_are_limited_by_length(self):
+        samples = [{"pred": "x" * length} for length in [10, 4, 3, 3, 12, 1]]
+        chunks = chunk_by_length(samples, 10)
+        self.assertEqual(
+            [[len(sample["pred"]) for sample in chunk] for chunk in chunks],
+            [[10], [4, 3, 3], [12], [1]]
+        )
+        self.assertEqual(chunk_by_length([], 10), [])
@@ -0,0 +1,241 @@
+import unittest
+import copy
+import glob
+import io
+import os
+import random
+import tempfile
+from unittest import mock
+import xml.etree.ElementTree as ET
+import zss
+from app.evaluation.TEDn import TEDn, Xml4ZSS_Levenshtein, NoteContentCoder, \
+    encode_notes, gold_tree_cost, build_tedn_nodes, edit_cost_bounds
+from app.evaluation.TEDn_lmx_xml import TEDn_lmx_xml, TEDn_lmx_xml_flavors, \
+    _GOLD_NORMALIZATION_PLANS
+from app.evaluation.GoldCache import GoldCache
+from app.linearization.LmxFile import LmxFile
+from app.symbolic.Pruner import Pruner
+
+
+class TEDnTest(unittest.TestCase):
+    def setUp(self):
+        samples_dir = os.path.join(
+            os.path.dirname(__file__), "../linearization/samples"
+        )
+        self.xml_paths = sorted(glob.glob(os.path.join(samples_dir, "*/*.xml")))
+        self.lmx_paths = sorted(glob.glob(os.path.join(samples_dir, "*/*.lmx")))
+
+    def test_gold_cost_matches_zss(self):
+        metric_class = Xml4ZSS_Levenshtein
+        for path in self.xml_paths:
+            for root_tag in ["part", "measure"]:
+                gold = encode_notes(
+                    ET.parse(path).getroot().find("part"),
+                    NoteContentCoder()
+                )
+                single_node = ET.Element(root_tag)
+                expected = zss.distance(
+                    single_node, gold,
+                    get_children=metric_class.get_children,
+                    update_cost=metric_class.update,
+                    insert_cost=metric_class.insert,
+                    remove_cost=metric_class.remove
+                )
+                self.assertEqual(
+                    gold_tree_cost(single_node, gold, metric_class),
+                    int(expected)
+                )
+
+    def test_cached_gold_cost_gives_the_same_results(self):
+        lmx = " ".join(LmxFile.load(self.lmx_paths[0]).systems[0])
+        with open(self.xml_paths[-1]) as file:
+            gold_musicxml = file.read()
+        first = TEDn_lmx_xml(lmx, gold_musicxml, flavor="full", errout=io.StringIO())
+        second = TEDn_lmx_xml(lmx, gold_musicxml, flavor="full", errout=io.StringIO())
+        self.assertEqual(first.gold_cost, second.gold_cost)
+        self.assertEqual(first.edit_cost, second.edit_cost)
+
+    def test_nodes_match_encoded_notes_and_inputs_are_not_modified(self):
+        for path in self.xml_paths:
+            gold = ET.parse(path).getroot().find("part")
+            original = ET.tostring(gold)
+
+            nodes = build_tedn_nodes(gold, NoteContentCoder())
+            encoded = encode_notes(copy.deepcopy(gold), NoteContentCoder())
+            self.assertEqual(
+                ET.tostring(nodes.to_element()),
+                ET.tostring(_filtered_copy(encoded))
+            )
+
+            predicted = copy.deepcopy(gold)
+            predicted.remove(predicted[0])
+            TEDn(predicted, gold)
+            self.assertEqual(ET.tostring(gold), original)
+
+    def test_all_flavors_at_once_give_the_same_results(self):
+        lmx = " ".join(LmxFile.load(self.lmx_paths[0]).systems[0])
+        with open(self.xml_paths[-1]) as file:
+            gold_musicxml = file.read()
+        results = TEDn_lmx_xml_flavors(lmx, gold_musicxml, errout=io.StringIO())
+        for flavor in ["full", "lmx"]:
+            expected = TEDn_lmx_xml(lmx, gold_musicxml, flavor, errout=io.StringIO())
+            self.assertEqual(results[flavor].gold_cost, expected.gold_cost)
+            self.assertEqual(results[flavor].edit_cost, expected.edit_cost)
+
+    def test_lmx_gold_is_pruned_by_the_normalization_plan(self):
+        lmx = " ".join(LmxFile.load(self.lmx_paths[0]).systems[0])
+        with open(self.xml_paths[-1]) as file:
+            gold_musicxml = file.read()
+        expected = TEDn_lmx_xml_flavors(lmx, gold_musicxml, errout=io.StringIO())
+
+        lmx_plan = _GOLD_NORMALIZATION_PLANS["lmx"]
+        with mock.patch.object(
+                lmx_plan, "process_part", wraps=lmx_plan.process_part
+            ) as plan_calls, mock.patch.object(
+                Pruner, "process_part", autospec=True,
+                side_effect=Pruner.process_part
+            ) as pruner_calls:
+            results = TEDn_lmx_xml_flavors(
+                lmx, gold_musicxml, flavors=("lmx",), errout=io.StringIO()
+            )
+        self.assertEqual(plan_calls.call_count, 1) # the gold
+        self.assertEqual(pruner_calls.call_count, 1) # only the prediction
+        self.assertEqual(results["lmx"].gold_cost, expected["lmx"].gold_cost)
+        self.assertEqual(results["lmx"].edit_cost, expected["lmx"].edit_cost)
+
+    def test_measurewise_mode_is_an_upper_bound_of_exact_mode(self):
+        rng = random.Random(42)
+        for path in self.xml_paths:
+            gold = ET.parse(path).getroot().find("part")
+            for _ in range(3):
+                predicted = _perturbed_copy(gold, rng, measure_removal=0.2)
+                exact = TEDn(predicted, gold, mode="exact")
+                measurewise = TEDn(predicted, gold, mode="measurewise")
+                self.assertEqual(exact.gold_cost, measurewise.gold_cost)
+                self.assertLessEqual(exact.edit_cost, measurewise.edit_cost)
+
+    def test_measurewise_mode_matches_exact_mode_on_measure_local_edits(self):
+        rng = random.Random(42)
+        for path in self.xml_paths:
+            gold = ET.parse(path).getroot().find("part")
+            predicted = copy.deepcopy(gold)
+            for step in predicted.iter("step"):
+                if rng.random() < 0.3:
+                    step.text = "C"
+            self.assertEqual(
+                TEDn(predicted, gold, mode="exact").edit_cost,
+                TEDn(predicted, gold, mode="measurewise").edit_cost
+            )
+
+    def test_budgeted_evaluation_is_bounded(self):
+        rng = random.Random(42)
+        for path in self.xml_paths:
+            gold = ET.parse(path).getroot().find("part")
+            predicted = _perturbed_copy(gold, rng)
+            predicted.remove(predicted[0])
+
+            exact = TEDn(predicted, gold)
+            lower_bound, upper_bound, _ = edit_cost_bounds(
+                build_tedn_nodes(predicted, NoteContentCoder()),
+                build_tedn_nodes(gold, NoteContentCoder()),
+                Xml4ZSS_Levenshtein
+            )
+            self.assertLessEqual(lower_bound, exact.edit_cost)
+            self.assertLessEqual(exact.edit_cost, upper_bound)
+
+            within_budget = TEDn(predicted, gold, max_nodes=100000, time_limit_seconds=60)
+            self.assertFalse(within_budget.bounded)
+            self.assertEqual(within_budget.edit_cost, exact.edit_cost)
+
+            for budget in [dict(max_nodes=10), dict(time_limit_seconds=0)]:
+                result = TEDn(predicted, gold, **budget)
+                self.assertTrue(result.bounded)
+                self.assertEqual(result.gold_cost, exact.gold_cost)
+                self.assertLessEqual(result.edit_cost, upper_bound)
+                self.assertLessEqual(exact.edit_cost, result.edit_cost)
+                self.assertEqual(result.lower_bound, lower_bound)
+
+    def test_node_budget_alone_computes_no_distance(self):
+        gold = ET.parse(self.xml_paths[-1]).getroot().find("part")
+        predicted = copy.deepcopy(gold)
+        predicted.remove(predicted[0])
+        exact = TEDn(predicted, gold)
+
+        with mock.patch(
+                "app.evaluation.TEDn.tree_edit_distance"
+            ) as exact_calls, mock.patch(
+                "app.evaluation.TEDn.aligned_children_edit_distance"
+            ) as aligned_calls:
+            for mode in ["exact", "measurewise"]:
+                result = TEDn(predicted, gold, mode=mode, max_nodes=10)
+                self.assertTrue(result.bounded)
+                self.assertEqual(result.edit_cost, result.upper_bound)
+                self.assertLessEqual(exact.edit_cost, result.edit_cost)
+        exact_calls.assert_not_called()
+        aligned_calls.assert_not_called()
+
+    def test_identical_subtrees_are_shortcut(self):
+        gold = ET.parse(self.xml_paths[0]).getroot().find("part")
+        predicted = copy.deepcopy(gold)
+        for element in predicted.iter():
+            element.text = (element.text or "").strip() # whitespace is ignored
+
+        for mode in ["exact", "measurewise"]:
+            result = TEDn(predicted, gold, mode=mode)
+            self.assertEqual(result.edit_cost, 0)
+            self.assertEqual(result.shortcut_hit_rate, 1.0)
+
+        predicted.find("measure/note/pitch/step").text = "X"
+        result = TEDn(predicted, gold, mode="measurewise")
+        self.assertEqual(result.edit_cost, TEDn(predicted, gold).edit_cost)
+        self.assertGreater(result.shortcut_hits, 0)
+        self.assertLess(result.shortcut_hits, result.shortcut_checks)
+
+    def test_gold_cache_gives_the_same_results(self):
+        lmx = " ".join(LmxFile.load(self.lmx_paths[0]).systems[0])
+        with open(self.xml_paths[-1]) as file:
+            gold_musicxml = file.read()
+
+        with tempfile.TemporaryDirectory() as cache_dir:
+            gold_cache = GoldCache(cache_dir)
+            for flavor in ["full", "lmx"]:
+                expected = TEDn_lmx_xml(
+                    lmx, gold_musicxml, flavor=flavor, errout=io.StringIO()
+                )
+                for _ in range(2): # stores the gold, then loads it
+                    result = TEDn_lmx_xml(
+                        lmx, gold_musicxml, flavor=flavor,
+                        errout=io.StringIO(), gold_cache=gold_cache
+                    )
+                    self.assertEqual(result.gold_cost, expected.gold_cost)
+                    self.assertEqual(result.edit_cost, expected.edit_cost)
+            
+            key = gold_cache.key(gold_musicxml, "full", True)
+            self.assertIsNotNone(gold_cache.load(key))
+            gold_cache.clear()
+            self.assertIsNone(gold_cache.load(key))
+
+
+def _filtered_copy(element: ET.Element) -> ET.Element:
+    copied = ET.Element(element.tag)
+    copied.text = element.text
+    for child in Xml4ZSS_Levenshtein.get_children(element):
+        copied.append(_filtered_copy(child))
+    return copied
+
+
+def _perturbed_copy(
+    part: ET.Element,
+    rng: random.Random,
+    measure_removal: float = 0.0
+) -> ET.Element:
+    """Copies the part, removes a random child from half of the measures
+    and whole measures with the given probability"""
+    perturbed = copy.deepcopy(part)
+    for measure in list(perturbed):
+        children = list(measure)
+        if len(children) > 0 and rng.random() < 0.5:
+            measure.remove(rng.choice(children))
+        if measure_removal > 0 and rng.random() < measure_removal:
+            perturbed.remove(measure)
+    return perturbed
@@ -0,0 +1,78 @@
+import unittest
+import glob
+import os
+import random
+import xml.etree.ElementTree as ET
+import zss
+from app.evaluation.TEDn import Xml4ZSS, Xml4ZSS_Levenshtein, \
+    NoteContentCoder, encode_notes
+from app.evaluation.zhang_shasha import tree_edit_distance, UpdateCostTable
+from .TEDnTest import _perturbed_copy
+
+
+class ZhangShashaTest(unittest.TestCase):
+    def assert_same_as_zss(self, tree_a: ET.Element, tree_b: ET.Element, metric_class):
+        expected = zss.distance(
+            tree_a, tree_b,
+            get_children=metric_class.get_children,
+            update_cost=metric_class.update,
+            insert_cost=metric_class.insert,
+            remove_cost=metric_class.remove
+        )
+        self.assertEqual(
+            tree_edit_distance(tree_a, tree_b, metric_class),
+            int(expected)
+        )
+
+    def random_tree(self, rng: random.Random, size: int) -> ET.Element:
+        root = ET.Element(rng.choice(["part", "measure"]))
+        nodes = [root]
+        for _ in range(size - 1):
+            element = ET.SubElement(
+                rng.choice(nodes),
+                rng.choice(["measure", "note", "chord", "voice", "tie", "print", "rest"])
+            )
+            if element.tag == "note":
+                element.text = "".join(rng.choice("ab1") for _ in range(rng.randint(0, 4)))
+            else:
+                element.text = rng.choice([None, "", " a", "a", "b"])
+            nodes.append(element)
+        return root
+
+    def test_random_trees_match_zss(self):
+        rng = random.Random(42)
+        for _ in range(200):
+            tree_a = self.random_tree(rng, rng.randint(1, 20))
+            tree_b = self.random_tree(rng, rng.randint(1, 20))
+            self.assert_same_as_zss(tree_a, tree_b, Xml4ZSS)
+            self.assert_same_as_zss(tree_a, tree_b, Xml4ZSS_Levenshtein)
+
+    def test_musicxml_samples_match_zss(self):
+        samples_dir = os.path.join(
+            os.path.dirname(__file__), "../linearization/samples"
+        )
+        parts = []
+        for path in sorted(glob.glob(os.path.join(samples_dir, "*/*.xml"))):
+            coder = NoteContentCoder()
+            part = ET.parse(path).getroot().find("part")
+            parts.append(encode_notes(part, coder))
+
+        rng = random.Random(42)
+        for part in parts:
+            predicted = _perturbed_copy(part, rng)
+            self.assert_same_as_zss(predicted, part, Xml4ZSS_Levenshtein)
+            self.assert_same_as_zss(part, predicted, Xml4ZSS_Levenshtein)
+            self.assert_same_as_zss(ET.Element("part"), part, Xml4ZSS_Levenshtein)
+
+    def test_shared_cost_table_gives_the_same_distances(self):
+        rng = random.Random(42)
+        cost_table = UpdateCostTable(Xml4ZSS_Levenshtein)
+        for _ in range(50):
+            tree_a = self.random_tree(rng, rng.randint(1, 20))
+            tree_b = self.random_tree(rng, rng.randint(1, 20))
+            self.assertEqual(
+                tree_edit_distance(tree_a, tree_b, Xml4ZSS_Levenshtein, cost_table),
+                tree_edit_distance(tree_a, tree_b, Xml4ZSS_Levenshtein)
+            )
+        self.assertGreater(cost_table.hits, 0)
+        self.assertEqual(cost_table.misses, len(cost_table.costs))
@@ -38,6 +38,22 @@ scan_testset_parser.add_argument(
     type=str,
     help="TEDn flavor to use, one of: 'full', 'lmx'"
 )
+scan_testset_parser.add_argument(
+    "--tedn_mode",
+    default="exact",
+    type=str,
+    help="TEDn mode to use, one of: 'exact', 'measurewise'"
+)
+scan_testset_parser.add_argument(
+    "--compare_modes",
+    action="store_true",
+    help="Also compute the other TEDn mode and report how much they differ"
+)
+scan_testset_parser.add_argument(
+    "--profile",
+    action="store_true",
+    help="Report how many update costs of the TEDn metric were memoized"
+)
 
 
 ########
@@ -54,7 +70,9 @@ if args.command_name == "convert-corpus":
 elif args.command_name == "scan-corpus":
     scan_corpus()
 elif args.command_name == "scan-testset":
-    scan_testset(args.tedn_flavor)
+    scan_testset(
+        args.tedn_flavor, args.tedn_mode, args.compare_modes, args.profile
+    )
 else:
     parser.print_help()
     exit(2)
@@ -1,4 +1,5 @@
 import os
+import io
 from app.datasets.config import SCANNED_DATASET_PATH
 from app.evaluation.TEDn_lmx_xml import TEDn_lmx_xml
 import sys
@@ -7,34 +8,106 @@ import sys
 total_gold = 0
 total_cost = 0
 
+# for the mode comparison
+total_other_cost = 0
+differing_samples = 0
+total_time = 0.0
+total_other_time = 0.0
 
-def scan_testset(tedn_flavor: str):
+# for profiling
+total_update_cost_hits = 0
+total_update_cost_misses = 0
+
+
+def scan_testset(tedn_flavor: str, tedn_mode="exact", compare_modes=False, profile=False):
     samples_path = os.path.join(SCANNED_DATASET_PATH, "samples.test.txt")
     with open(samples_path) as file:
         for line in file:
             sample_path = os.path.join(SCANNED_DATASET_PATH, line.strip())
-            process_sample(sample_path, tedn_flavor)
+            process_sample(sample_path, tedn_flavor, tedn_mode, compare_modes, profile)
 
 
-def process_sample(sample_path: str, tedn_flavor: str):
+def process_sample(
+    sample_path: str,
+    tedn_flavor: str,
+    tedn_mode: str,
+    compare_modes: bool,
+    profile: bool
+):
     global total_gold, total_cost
 
     print(sample_path, "...")
-    
+
     with open(sample_path + ".lmx") as file:
         lmx_string = file.read()
     with open(sample_path + ".musicxml") as file:
         musicxml_string = file.read()
-    
+
     # run the TEDn function
     result = TEDn_lmx_xml(
         predicted_lmx=lmx_string,
         gold_musicxml=musicxml_string,
         flavor=tedn_flavor,
         debug=True,
-        errout=sys.stdout
+        errout=sys.stdout,
+        mode=tedn_mode
     )
     total_gold += result.gold_cost
     total_cost += result.edit_cost
     print("[SAMPLE] TEDn error:", round(result.normalized_edit_cost * 100, 2), "%")
     print("[TOTAL] TEDn error: ", round((total_cost / total_gold) * 100, 2), "% ...", total_cost, "/", total_gold)
+
+    if profile:
+        report_profile(result)
+
+    if compare_modes:
+        compare_with_other_mode(
+            lmx_string, musicxml_string, tedn_flavor, tedn_mode, result
+        )
+
+
+def report_profile(result):
+    global total_update_cost_hits, total_update_cost_misses
+
+    total_update_cost_hits += result.update_cost_hits
+    total_update_cost_misses += result.update_cost_misses
+    total = total_update_cost_hits + total_update_cost_misses
+    print(
+        "[PROFILE] update costs:",
+        result.update_cost_hits, "hits,",
+        result.update_cost_misses, "misses",
+        "... total hit rate:",
+        round(total_update_cost_hits / max(total, 1) * 100, 2), "%",
+        "... time:", round(result.evaluation_time_seconds, 2), "s"
+    )
+
+
+def compare_with_other_mode(lmx_string, musicxml_string, tedn_flavor, tedn_mode, result):
+    global total_other_cost, differing_samples, total_time, total_other_time
+
+    other_mode = "exact" if tedn_mode == "measurewise" else "measurewise"
+    other_result = TEDn_lmx_xml(
+        predicted_lmx=lmx_string,
+        gold_musicxml=musicxml_string,
+        flavor=tedn_flavor,
+        errout=io.StringIO(),
+        mode=other_mode
+    )
+    total_other_cost += other_result.edit_cost
+    total_time += result.evaluation_time_seconds
+    total_other_time += other_result.evaluation_time_seconds
+    if other_result.edit_cost != result.edit_cost:
+        differing_samples += 1
+
+    print(
+        f"[SAMPLE] {other_mode} TEDn error:",
+        round(other_result.normalized_edit_cost * 100, 2), "%",
+        "... cost difference:", other_result.edit_cost - result.edit_cost
+    )
+    print(
+        f"[TOTAL] {other_mode} TEDn error:",
+        round((total_other_cost / total_gold) * 100, 2), "% ...",
+        total_other_cost, "/", total_gold,
+        "... differing samples:", differing_samples,
+        f"... time {tedn_mode}: {total_time:.1f}s, {other_mode}: {total_other_time:.1f}s"
+    )
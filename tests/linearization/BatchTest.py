@@ -0,0 +1,87 @@
+import unittest
+import glob
+import json
+import os
+import tempfile
+import xml.etree.ElementTree as ET
+from app.symbolic.MxlFile import MxlFile
+from app.linearization.batch import BatchWriter, linearize_batch, \
+    delinearize_batch, linearize_score, delinearize_lmx
+
+
+class BatchTest(unittest.TestCase):
+    def setUp(self):
+        samples_dir = os.path.join(os.path.dirname(__file__), "samples")
+        self.xml_paths = sorted(glob.glob(os.path.join(samples_dir, "*/*.xml")))
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _read_jsonl(self, path: str) -> list:
+        with open(path, "r") as file:
+            return [json.loads(line) for line in file]
+
+    def test_samples_round_trip_in_order_over_shards(self):
+        # JSONL records in a directory, with a broken one in the middle
+        input_dir = os.path.join(self.tmp_dir.name, "input")
+        os.makedirs(input_dir)
+        records = []
+        for path in self.xml_paths:
+            with open(path, "r") as file:
+                records.append({"id": path, "musicxml": file.read()})
+        records.insert(3, {"id": "broken", "musicxml": "<score-partwise><part"})
+        with open(os.path.join(input_dir, "scores.jsonl"), "w") as file:
+            for record in records:
+                print(json.dumps(record), file=file)
+
+        # linearize into shards, over multiple workers
+        lmx_dir = os.path.join(self.tmp_dir.name, "lmx")
+        linearize_batch(
+            [input_dir], BatchWriter(output_dir=lmx_dir, shard_size=3),
+            workers=3, chunk_size=1, verbose=False
+        )
+        shard_paths = sorted(glob.glob(os.path.join(lmx_dir, "*.jsonl")))
+        self.assertEqual(
+            [os.path.basename(path) for path in shard_paths],
+            ["shard-00000.jsonl", "shard-00001.jsonl", "shard-00002.jsonl"]
+        )
+        shards = [self._read_jsonl(path) for path in shard_paths]
+        self.assertEqual([len(shard) for shard in shards], [3, 3, 1])
+        linearized = [record for shard in shards for record in shard]
+        self.assertEqual(
+            [record["id"] for record in linearized],
+            [record["id"] for record in records]
+        )
+
+        # the broken input is a failure record, the rest is converted
+        for record in linearized:
+            if record["id"] == "broken":
+                self.assertIsNone(record["lmx"])
+                self.assertTrue(record["errors"][0].startswith("LINEARIZATION FAILED"))
+                continue
+            expected = linearize_score(MxlFile(ET.parse(record["id"])))
+            self.assertEqual(record["lmx"], expected)
+
+        # delinearize the shard directory back into a single file
+        output_path = os.path.join(self.tmp_dir.name, "musicxml.jsonl")
+        for path in shard_paths: # the broken sample has nothing to delinearize
+            with open(path, "r") as file:
+                kept = [r for r in map(json.loads, file) if r["lmx"] is not None]
+            with open(path, "w") as file:
+                for record in kept:
+                    print(json.dumps(record), file=file)
+        delinearize_batch(
+            [lmx_dir], BatchWriter(output=output_path),
+            workers=3, chunk_size=1, verbose=False
+        )
+        delinearized = self._read_jsonl(output_path)
+        self.assertEqual(
+            [record["id"] for record in delinearized],
+            [record["id"] for record in linearized if record["lmx"] is not None]
+        )
+        lmx_by_id = {record["id"]: record["lmx"] for record in linearized}
+        for record in delinearized:
+            self.assertEqual(
+                record["musicxml"], delinearize_lmx(lmx_by_id[record["id"]])
+            )
@@ -0,0 +1,80 @@
+import unittest
+import glob
+import io
+import os
+import random
+import numpy as np
+import xml.etree.ElementTree as ET
+from app.linearization.Delinearizer import Delinearizer
+from app.linearization.IncrementalDelinearizer import IncrementalDelinearizer
+from app.linearization.LmxFile import LmxFile
+from app.linearization.vocabulary import ALL_TOKENS, VOCABULARY
+
+
+class DelinearizerTest(unittest.TestCase):
+    def setUp(self):
+        samples_dir = os.path.join(os.path.dirname(__file__), "samples")
+        self.systems = []
+        for path in sorted(glob.glob(os.path.join(samples_dir, "*/*.lmx"))):
+            self.systems += LmxFile.load(path).systems
+        
+        # a model-like tag list, with a different order than the vocabulary
+        self.tags = ["<unk>"] + sorted(ALL_TOKENS)
+        random.Random(42).shuffle(self.tags)
+        self.tags_map = {tag: i for i, tag in enumerate(self.tags)}
+
+    def assert_same_delinearization(self, tokens, token_ids):
+        text_errout = io.StringIO()
+        expected = Delinearizer(errout=text_errout).process_text(" ".join(tokens))
+        ids_errout = io.StringIO()
+        given = Delinearizer(errout=ids_errout).process_token_ids(token_ids, self.tags)
+        self.assertEqual(ET.tostring(expected), ET.tostring(given))
+        self.assertEqual(text_errout.getvalue(), ids_errout.getvalue())
+
+        # the same with the translation table held by the caller
+        table_errout = io.StringIO()
+        given = Delinearizer(errout=table_errout).process_token_ids(
+            token_ids, self.tags, VOCABULARY.translation_table(self.tags)
+        )
+        self.assertEqual(ET.tostring(expected), ET.tostring(given))
+        self.assertEqual(text_errout.getvalue(), table_errout.getvalue())
+
+    def test_token_ids_match_text_delinearization(self):
+        for tokens in self.systems:
+            token_ids = np.array([self.tags_map[t] for t in tokens], dtype=np.int32)
+            self.assert_same_delinearization(tokens, token_ids)
+    
+    def test_unknown_token_ids_are_reported_at_the_same_positions(self):
+        tokens = list(self.systems[0])
+        tokens.insert(3, "<unk>")
+        tokens.insert(7, "dot") # a dangling suffix
+        token_ids = np.array([self.tags_map[t] for t in tokens], dtype=np.int32)
+        self.assert_same_delinearization(tokens, token_ids)
+
+        errout = io.StringIO()
+        Delinearizer(errout=errout).process_token_ids(
+            np.array([self.tags_map["measure"], len(self.tags) + 5]), self.tags
+        )
+        self.assertIn(
+            f"[ERROR][Token '<id:{len(self.tags) + 5}>' at position 2]",
+            errout.getvalue()
+        )
+
+    def test_incremental_delinearization_matches_text_delinearization(self):
+        for tokens in self.systems + [
+            [], ["measure"], ["measure", "measure"], ["C4", "quarter"],
+            ["C4", "measure", "C4", "quarter", "measure"],
+        ]:
+            expected = Delinearizer().process_text(" ".join(tokens))
+
+            delinearizer = IncrementalDelinearizer()
+            finished_measures = []
+            for token in tokens:
+                measure = delinearizer.push(token)
+                if measure is not None:
+                    finished_measures.append(measure)
+            given = delinearizer.close()
+
+            self.assertEqual(ET.tostring(expected), ET.tostring(given))
+            self.assertEqual(finished_measures, list(given)[:len(finished_measures)])
+            self.assertGreaterEqual(len(finished_measures), len(given) - 1)
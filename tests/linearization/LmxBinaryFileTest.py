@@ -0,0 +1,63 @@
+import unittest
+import glob
+import os
+import tempfile
+import numpy as np
+from app.linearization.LmxFile import LmxFile
+from app.linearization.LmxBinaryFile import LmxBinaryFile
+from app.linearization.vocabulary import VOCABULARY
+
+
+class LmxBinaryFileTest(unittest.TestCase):
+    def setUp(self):
+        samples_dir = os.path.join(os.path.dirname(__file__), "samples")
+        self.lmx = LmxFile()
+        for path in sorted(glob.glob(os.path.join(samples_dir, "*/*.lmx"))):
+            self.lmx.systems += LmxFile.load(path).systems
+        self.lmx.systems.append([]) # empty systems are kept as well
+
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.binary_path = os.path.join(self.temp_dir.name, "corpus.lmxb")
+        self.text_path = os.path.join(self.temp_dir.name, "corpus.lmx")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_it_round_trips_through_binary_and_text(self):
+        self.lmx.extended_flavor = True
+        LmxBinaryFile.save(self.binary_path, self.lmx)
+
+        with LmxBinaryFile(self.binary_path) as binary_lmx:
+            self.assertEqual(len(binary_lmx), len(self.lmx.systems))
+            self.assertTrue(binary_lmx.extended_flavor)
+            binary_lmx.to_lmx_file().save(self.text_path)
+
+        loaded = LmxFile.load(self.text_path)
+        self.assertEqual(loaded.systems, self.lmx.systems)
+        self.assertTrue(loaded.extended_flavor)
+
+    def test_it_reads_single_systems_without_copying(self):
+        LmxBinaryFile.save(self.binary_path, self.lmx)
+
+        binary_lmx = LmxBinaryFile(self.binary_path)
+        for i in [2, 0, -2, 1]:
+            token_ids = binary_lmx[i]
+            self.assertTrue(np.shares_memory(token_ids, binary_lmx.token_ids))
+            self.assertEqual(
+                binary_lmx.system_tokens(i),
+                self.lmx.systems[i]
+            )
+            self.assertEqual(
+                token_ids.tolist(),
+                VOCABULARY.encode(self.lmx.systems[i]).tolist()
+            )
+        self.assertEqual(binary_lmx.system_tokens(-1), [])
+        with self.assertRaises(IndexError):
+            binary_lmx[len(self.lmx.systems)]
+        del token_ids
+        binary_lmx.close()
+
+    def test_it_rejects_other_files(self):
+        self.lmx.save(self.text_path)
+        with self.assertRaises(Exception):
+            LmxBinaryFile(self.text_path)
@@ -0,0 +1,54 @@
+import unittest
+import copy
+import os
+import tempfile
+import zipfile
+import xml.etree.ElementTree as ET
+from app.linearization.Linearizer import Linearizer
+from app.symbolic.MxlFile import MxlFile, MxlPartStream
+
+
+class StreamingTest(unittest.TestCase):
+    def setUp(self):
+        samples_dir = os.path.join(os.path.dirname(__file__), "samples")
+        tree = ET.parse(os.path.join(samples_dir, "basics/grandstaff.xml"))
+        score = tree.getroot()
+
+        # prepend a non-piano part that the stream has to skip
+        part_list = score.find("part-list")
+        voice_score_part = copy.deepcopy(part_list.find("score-part"))
+        voice_score_part.attrib["id"] = "P0"
+        voice_score_part.find("part-name").text = "Voice"
+        voice_score_part.find("score-instrument/instrument-name").text = "Voice"
+        part_list.insert(0, voice_score_part)
+        voice_part = copy.deepcopy(score.find("part"))
+        voice_part.attrib["id"] = "P0"
+        score.insert(list(score).index(score.find("part")), voice_part)
+
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.mxl_path = os.path.join(self.tmp_dir.name, "score.mxl")
+        with zipfile.ZipFile(self.mxl_path, "w") as archive:
+            archive.writestr("META-INF/container.xml", "<container/>")
+            archive.writestr("score.xml", ET.tostring(score))
+    
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_it_resolves_the_piano_part(self):
+        stream = MxlPartStream(self.mxl_path)
+        self.assertEqual(stream.part_id, "P1")
+    
+    def test_streaming_linearization_matches_full_parse(self):
+        part = MxlFile.load_mxl(self.mxl_path).get_piano_part()
+        expected = Linearizer()
+        expected.process_part(part)
+
+        stream = MxlPartStream(self.mxl_path)
+        given = Linearizer()
+        given.process_measures(stream, part_id=stream.part_id)
+
+        self.assertEqual(expected.output_tokens, given.output_tokens)
+    
+    def test_it_yields_only_the_streamed_part_measures(self):
+        measure_count = len(MxlFile.load_mxl(self.mxl_path).get_piano_part())
+        self.assertEqual(measure_count, len(list(MxlPartStream(self.mxl_path))))
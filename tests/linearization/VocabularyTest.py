@@ -0,0 +1,39 @@
+import unittest
+import numpy as np
+from app.linearization.vocabulary import *
+
+
+class VocabularyTest(unittest.TestCase):
+    def test_token_ids_are_positions_in_all_tokens(self):
+        for i, token in enumerate(ALL_TOKENS):
+            self.assertEqual(VOCABULARY.token_to_id[token], i)
+        self.assertEqual(len(VOCABULARY), len(ALL_TOKENS))
+    
+    def test_membership(self):
+        self.assertIn("measure", VOCABULARY)
+        self.assertIn("C4", VOCABULARY)
+        self.assertNotIn("H4", VOCABULARY)
+    
+    def test_token_classes(self):
+        self.assertTrue(VOCABULARY.is_of_class("C4", TOKEN_CLASS_PREFIX))
+        self.assertTrue(VOCABULARY.is_of_class("quarter", TOKEN_CLASS_ROOT))
+        self.assertTrue(VOCABULARY.is_of_class("rest:measure", TOKEN_CLASS_ROOT))
+        self.assertTrue(VOCABULARY.is_of_class("dot", TOKEN_CLASS_SUFFIX))
+        self.assertTrue(VOCABULARY.is_of_class("clef:G2", TOKEN_CLASS_ATTRIBUTE))
+        self.assertTrue(VOCABULARY.is_of_class("beats:3", TOKEN_CLASS_ATTRIBUTE))
+        self.assertEqual(
+            VOCABULARY.classes_of("fermata"),
+            TOKEN_CLASS_SUFFIX | TOKEN_CLASS_EXTENDED
+        )
+        self.assertEqual(VOCABULARY.classes_of("measure"), 0)
+        self.assertEqual(VOCABULARY.classes_of("unknown"), 0)
+    
+    def test_encode_decode(self):
+        tokens = "measure C4 quarter E4 eighth dot".split()
+        token_ids = VOCABULARY.encode(tokens)
+        self.assertEqual(token_ids.dtype, np.int32)
+        self.assertEqual(VOCABULARY.decode(token_ids), tokens)
+        self.assertTrue(np.all(
+            (VOCABULARY.token_classes[token_ids] & TOKEN_CLASS_ROOT != 0)
+                == np.array([False, False, True, False, True, False])
+        ))
@@ -3,6 +3,8 @@ import os
 import glob
 import json
 from .scan_corpus import scan_corpus
+from .verify_corpus import verify_corpus
+from .benchmark_vocabulary import benchmark_vocabulary
 
 
 ##########
@@ -34,6 +36,38 @@ subparsers.add_parser(
     help="Executes the linearizer on the entire OpenScore Lieder corpus"
 )
 
+verify_corpus_parser = subparsers.add_parser(
+    "verify-corpus",
+    aliases=[],
+    help="Checks the linearization round trip on the entire OpenScore " + \
+        "Lieder corpus in parallel, writes a JSONL report"
+)
+verify_corpus_parser.add_argument(
+    "--report",
+    type=str,
+    default="roundtrip-report.jsonl",
+    help="Path of the JSONL report to write"
+)
+verify_corpus_parser.add_argument(
+    "--since",
+    type=str,
+    default=None,
+    help="Previous report, only files that passed with the same content " + \
+        "and the same code are not verified again"
+)
+verify_corpus_parser.add_argument(
+    "--workers",
+    type=int,
+    default=None,
+    help="Number of worker processes, all CPUs by default"
+)
+
+subparsers.add_parser(
+    "benchmark-vocabulary",
+    aliases=[],
+    help="Measures the per-token cost of vocabulary lookups"
+)
+
 subparsers.add_parser(
     "print-vocabulary",
     aliases=[],
@@ -73,6 +107,13 @@ elif args.command_name == "convert-corpus":
 elif args.command_name == "scan-corpus":
     scan_corpus()
 
+elif args.command_name == "verify-corpus":
+    if not verify_corpus(args.report, args.since, args.workers):
+        exit(1)
+
+elif args.command_name == "benchmark-vocabulary":
+    benchmark_vocabulary()
+
 elif args.command_name == "print-vocabulary":
     from app.linearization.vocabulary import ALL_TOKENS
     print("\n".join(ALL_TOKENS))
@@ -0,0 +1,42 @@
+import timeit
+import random
+from app.linearization.vocabulary import *
+
+
+def benchmark_vocabulary(token_count=100_000):
+    """Measures the per-token cost of vocabulary membership and class lookups,
+    comparing the plain token lists with the compiled vocabulary"""
+    rng = random.Random(42)
+    tokens = [rng.choice(ALL_TOKENS) for _ in range(token_count)]
+
+    def _list_membership():
+        for token in tokens:
+            token in ALL_TOKENS
+    
+    def _list_classes():
+        for token in tokens:
+            token in NOTE_PREFIX_TOKENS or token in NOTE_SUFFIX_TOKENS
+    
+    def _compiled_membership():
+        for token in tokens:
+            token in VOCABULARY
+    
+    def _compiled_classes():
+        for token in tokens:
+            VOCABULARY.is_of_class(token, TOKEN_CLASS_PREFIX | TOKEN_CLASS_SUFFIX)
+    
+    token_ids = VOCABULARY.encode(tokens)
+    
+    def _numpy_classes():
+        VOCABULARY.token_classes[token_ids] & (TOKEN_CLASS_PREFIX | TOKEN_CLASS_SUFFIX)
+
+    print("Tokens:", token_count, "Vocabulary size:", len(VOCABULARY))
+    for name, fn in [
+        ("list membership", _list_membership),
+        ("compiled membership", _compiled_membership),
+        ("list prefix/suffix class", _list_classes),
+        ("compiled prefix/suffix class", _compiled_classes),
+        ("numpy prefix/suffix class", _numpy_classes),
+    ]:
+        seconds = min(timeit.repeat(fn, number=1, repeat=5))
+        print(f"{name:30} {seconds / token_count * 1e9:10.1f} ns/token")
@@ -1,21 +1,26 @@
 import glob
 import sys
+import xml.etree.ElementTree as ET
+from typing import List, TextIO
 from app.linearization.Linearizer import Linearizer
 from app.linearization.Delinearizer import Delinearizer
 from app.symbolic.MxlFile import MxlFile
 from app.symbolic.Pruner import Pruner
-from app.symbolic.actual_durations_to_fractional import actual_durations_to_fractional
+from app.symbolic.NormalizationPlan import NormalizationPlan
 from app.symbolic.debug_compare import compare_parts
 
 
-def scan_corpus():
+def list_corpus_files() -> List[str]:
     mxl_files = glob.glob(
         "datasets/OpenScore-Lieder/scores/**/*.mxl",
         recursive=True
     )
     mxl_files.sort()
+    return mxl_files
+
 
-    for path in mxl_files:
+def scan_corpus():
+    for path in list_corpus_files():
         print(path, "...")
         scan_mxl_file(path)
 
@@ -27,24 +32,30 @@ def scan_mxl_file(path: str):
 
     mxl = MxlFile.load_mxl(path)
     for part in mxl.tree.findall("part"):
-        linearizer = Linearizer() # errout=sys.stdout
-        linearizer.process_part(part)
-
-        text = " ".join(linearizer.output_tokens)
-        delinearizer = Delinearizer(
-            errout=sys.stdout,
-            keep_fractional_durations=True
-        )
-        delinearizer.process_text(text)
-
-        # prune to the LXM element subset
-        pruner.process_part(part)
-        pruner.process_part(delinearizer.part_element)
-        
-        # turn gold to fractional durations
-        actual_durations_to_fractional(part)
-        
+        delinearized_part = round_trip_part(part, pruner, errout=sys.stdout)
         compare_parts(
             expected=part,
-            given=delinearizer.part_element
+            given=delinearized_part
         )
+
+
+def round_trip_part(part: ET.Element, pruner: Pruner, errout: TextIO) -> ET.Element:
+    """Linearizes and delinearizes the part, prunes both to the LMX element
+    subset and turns the gold part (modified in-place) to fractional
+    durations, so that the two parts can be compared"""
+    linearizer = Linearizer() # errout=sys.stdout
+    linearizer.process_part(part)
+
+    text = " ".join(linearizer.output_tokens)
+    delinearizer = Delinearizer(
+        errout=errout,
+        keep_fractional_durations=True
+    )
+    delinearizer.process_text(text)
+
+    # prune to the LXM element subset
+    # and turn gold to fractional durations (in one traversal)
+    NormalizationPlan(pruner, fractional_durations=True).process_part(part)
+    pruner.process_part(delinearizer.part_element)
+
+    return delinearizer.part_element
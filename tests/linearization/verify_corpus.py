@@ -0,0 +1,145 @@
+import glob
+import hashlib
+import io
+import json
+import multiprocessing
+import os
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+from app.symbolic.MxlFile import MxlFile
+from app.symbolic.Pruner import Pruner
+from app.symbolic.debug_compare import list_part_differences
+from .scan_corpus import list_corpus_files, round_trip_part
+
+
+def verify_corpus(
+    report_path: str,
+    since_report_path: Optional[str] = None,
+    workers: Optional[int] = None,
+    paths: Optional[List[str]] = None
+) -> bool:
+    """Runs the linearization round trip over the corpus in parallel and
+    writes a JSONL report with one record per file (timing, pass/fail and
+    the mismatching measures). With a previous report given, only files
+    whose content hash changed (or that failed, or were verified by other
+    code, see code_version) are verified again, the rest of the records
+    is carried over. Returns True if all the files passed."""
+    if paths is None:
+        paths = list_corpus_files()
+
+    previous_records: Dict[str, dict] = {}
+    if since_report_path is not None and os.path.exists(since_report_path):
+        previous_records = load_report(since_report_path)
+
+    version = code_version()
+    jobs: List[Tuple[str, str, str]] = []
+    reused_records: Dict[str, dict] = {}
+    for path in paths:
+        content_hash = hash_file(path)
+        previous = previous_records.get(path)
+        if previous is not None and previous["hash"] == content_hash \
+                and previous.get("version") == version and previous["passed"]:
+            reused_records[path] = previous
+        else:
+            jobs.append((path, content_hash, version))
+
+    print(
+        "Verifying", len(jobs), "files,",
+        len(reused_records), "passed unchanged since the last report",
+        file=sys.stderr
+    )
+
+    start = time.time()
+    with multiprocessing.Pool(workers) as pool:
+        verified_records = {
+            record["path"]: record
+            for record in pool.imap_unordered(_verify_job, jobs)
+        }
+    elapsed = time.time() - start
+
+    records = [
+        verified_records.get(path) or reused_records[path]
+        for path in paths
+    ]
+    with open(report_path, "w") as file:
+        for record in records:
+            print(json.dumps(record, ensure_ascii=False), file=file)
+
+    failed = [record for record in records if not record["passed"]]
+    print(
+        f"Done in {elapsed:.1f}s,", len(records), "files,",
+        len(failed), "failed", file=sys.stderr
+    )
+    for record in failed:
+        print("FAILED:", record["path"], file=sys.stderr)
+    return len(failed) == 0
+
+
+def load_report(report_path: str) -> Dict[str, dict]:
+    """Loads report records, indexed by the file path"""
+    records = {}
+    with open(report_path, "r") as file:
+        for line in file:
+            if line.strip() == "":
+                continue
+            record = json.loads(line)
+            records[record["path"]] = record
+    return records
+
+
+def hash_file(path: str) -> str:
+    with open(path, "rb") as file:
+        return hashlib.sha256(file.read()).hexdigest()
+
+
+def code_version() -> str:
+    """Hashes the pruning rules version and the sources of the code under
+    verification (the linearization and symbolic modules), so that records
+    verified by different code are never reused"""
+    app_dir = os.path.join(os.path.dirname(__file__), "../../app")
+    digest = hashlib.sha256(str(Pruner.RULES_VERSION).encode("utf-8"))
+    for module in ["linearization", "symbolic"]:
+        for path in sorted(glob.glob(os.path.join(app_dir, module, "*.py"))):
+            digest.update(os.path.basename(path).encode("utf-8"))
+            digest.update(bytes.fromhex(hash_file(path)))
+    for name in ["scan_corpus.py", "verify_corpus.py"]: # the round trip itself
+        path = os.path.join(os.path.dirname(__file__), name)
+        digest.update(bytes.fromhex(hash_file(path)))
+    return digest.hexdigest()
+
+
+def verify_mxl_file(path: str, content_hash: str, version: str) -> dict:
+    """Runs the round trip on all parts of the file, returns the report record"""
+    pruner = Pruner(
+        prune_durations=False, # durations depend on divisions
+    )
+
+    start = time.time()
+    errout = io.StringIO()
+    mismatches = []
+    exception = None
+    try:
+        mxl = MxlFile.load_mxl(path)
+        for part in mxl.tree.findall("part"):
+            delinearized_part = round_trip_part(part, pruner, errout)
+            for difference in list_part_differences(part, delinearized_part):
+                difference["part"] = part.get("id")
+                mismatches.append(difference)
+    except Exception as e:
+        exception = repr(e)
+
+    return {
+        "path": path,
+        "hash": content_hash,
+        "version": version,
+        "passed": exception is None and len(mismatches) == 0,
+        "seconds": round(time.time() - start, 3),
+        "exception": exception,
+        "mismatches": mismatches,
+        "errors": errout.getvalue().splitlines(),
+    }
+
+
+def _verify_job(job: Tuple[str, str, str]) -> dict:
+    return verify_mxl_file(*job)
@@ -0,0 +1,33 @@
+import unittest
+from fractions import Fraction
+from app.symbolic.DurationGrid import DurationGrid
+from app.linearization.duration_table import DURATION_GRID, DURATION_TICKS, \
+    duration_ticks, quarter_multiple
+
+
+class DurationGridTest(unittest.TestCase):
+    def test_it_formats_like_fractions(self):
+        grid = DurationGrid(12)
+        for text in ["0", "1", "3/2", "1/3", "7/12", "5", "1/5", "2/7", "0.5"]:
+            ticks = grid.ticks(text)
+            self.assertEqual(grid.text(ticks), str(Fraction(text)))
+        self.assertEqual(grid.ticks("3/2"), 18)
+        self.assertEqual(grid.ticks("1/5"), Fraction(12, 5)) # off the grid
+
+    def test_on_and_off_grid_ticks_mix(self):
+        grid = DurationGrid(4)
+        total = grid.ticks("1/4") + grid.ticks("1/3") + grid.ticks("2/3")
+        self.assertEqual(total, 5)
+        self.assertEqual(grid.text(total), "5/4")
+        self.assertLess(grid.ticks("1/3"), grid.ticks("1/2"))
+
+    def test_duration_table_matches_fractions(self):
+        for (note_type, dots, time_modification), ticks in DURATION_TICKS.items():
+            self.assertEqual(
+                Fraction(ticks, DURATION_GRID.ticks_per_quarter),
+                quarter_multiple(note_type, time_modification, dots)
+            )
+        self.assertEqual(
+            DURATION_GRID.text(duration_ticks("quarter", "3in2", 7)),
+            str(quarter_multiple("quarter", "3in2", 7))
+        )
@@ -0,0 +1,42 @@
+import unittest
+import copy
+import glob
+import os
+import xml.etree.ElementTree as ET
+from app.symbolic.Pruner import Pruner
+from app.symbolic.NormalizationPlan import NormalizationPlan
+from app.symbolic.actual_durations_to_fractional import actual_durations_to_fractional
+
+
+class NormalizationPlanTest(unittest.TestCase):
+    def setUp(self):
+        samples_dir = os.path.join(
+            os.path.dirname(__file__), "../linearization/samples"
+        )
+        self.parts = [
+            ET.parse(path).getroot().find("part")
+            for path in sorted(glob.glob(os.path.join(samples_dir, "*/*.xml")))
+        ]
+
+    def test_it_matches_the_separate_passes(self):
+        pruners = [
+            None,
+            Pruner(),
+            Pruner(prune_durations=True, prune_measure_attributes=True),
+            Pruner(prune_prints=False, prune_directions=False,
+                prune_barlines=False, prune_harmony=False,
+                prune_slur_numbering=False),
+        ]
+        for pruner in pruners:
+            for fractional_durations in [False, True]:
+                plan = NormalizationPlan(pruner, fractional_durations)
+                for part in self.parts:
+                    expected = copy.deepcopy(part)
+                    if fractional_durations:
+                        actual_durations_to_fractional(expected)
+                    if pruner is not None:
+                        pruner.process_part(expected)
+
+                    given = copy.deepcopy(part)
+                    plan.process_part(given)
+                    self.assertEqual(ET.tostring(given), ET.tostring(expected))
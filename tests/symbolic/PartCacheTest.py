@@ -0,0 +1,70 @@
+import unittest
+import copy
+import os
+import tempfile
+import zipfile
+import xml.etree.ElementTree as ET
+from app.symbolic.MxlFile import MxlFile
+from app.symbolic.PartCache import PartCache
+
+
+class PartCacheTest(unittest.TestCase):
+    def setUp(self):
+        samples_dir = os.path.join(
+            os.path.dirname(__file__), "../linearization/samples"
+        )
+        tree = ET.parse(os.path.join(samples_dir, "basics/grandstaff.xml"))
+        score = tree.getroot()
+
+        # prepend a non-piano part that is not to be loaded
+        part_list = score.find("part-list")
+        voice_score_part = copy.deepcopy(part_list.find("score-part"))
+        voice_score_part.attrib["id"] = "P0"
+        voice_score_part.find("part-name").text = "Voice"
+        voice_score_part.find("score-instrument/instrument-name").text = "Voice"
+        part_list.insert(0, voice_score_part)
+        voice_part = copy.deepcopy(score.find("part"))
+        voice_part.attrib["id"] = "P0"
+        score.insert(list(score).index(score.find("part")), voice_part)
+
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.mxl_path = os.path.join(self.tmp_dir.name, "score.mxl")
+        self._write_mxl(score)
+        self.score = score
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _write_mxl(self, score: ET.Element):
+        with zipfile.ZipFile(self.mxl_path, "w") as archive:
+            archive.writestr("META-INF/container.xml", "<container/>")
+            archive.writestr("score.xml", ET.tostring(score))
+
+    def test_it_loads_the_same_piano_part(self):
+        expected = MxlFile.load_mxl(self.mxl_path).get_piano_part()
+        expected.tail = None
+        part_cache = PartCache(os.path.join(self.tmp_dir.name, "cache"))
+        for cache in [None, part_cache, part_cache]: # stores, then loads
+            part = MxlFile.load_mxl_piano_part(self.mxl_path, cache)
+            self.assertEqual(part.attrib["id"], "P1")
+            self.assertEqual(ET.tostring(part), ET.tostring(expected))
+        self.assertIsNotNone(part_cache.load(part_cache.key(self.mxl_path)))
+
+    def test_changed_file_is_not_loaded_from_cache(self):
+        part_cache = PartCache(os.path.join(self.tmp_dir.name, "cache"))
+        MxlFile.load_mxl_piano_part(self.mxl_path, part_cache)
+
+        self.score.find("part[@id='P1']").remove(
+            self.score.find("part[@id='P1']/measure")
+        )
+        self._write_mxl(self.score)
+        os.utime(self.mxl_path, ns=(0, 0)) # differs even on coarse clocks
+
+        part = MxlFile.load_mxl_piano_part(self.mxl_path, part_cache)
+        self.assertEqual(
+            len(part),
+            len(MxlFile.load_mxl(self.mxl_path).get_piano_part())
+        )
+
+        part_cache.clear()
+        self.assertIsNone(part_cache.load(part_cache.key(self.mxl_path)))
@@ -0,0 +1,45 @@
+import unittest
+import xml.etree.ElementTree as ET
+from app.symbolic.PitchAlternator import PitchAlternator
+
+
+class PitchAlternatorTest(unittest.TestCase):
+    def alters(self, measure: ET.Element):
+        return [
+            note.findtext("pitch/alter", "0")
+            for note in measure.iter("note") if note.find("pitch") is not None
+        ]
+
+    def test_accidentals_carry_by_onset(self):
+        measure = ET.fromstring("""
+        <measure>
+            <attributes><key><fifths>1</fifths></key></attributes>
+            <note><pitch><step>F</step><octave>4</octave></pitch><duration>1</duration></note>
+            <note><pitch><step>C</step><octave>4</octave></pitch><duration>1</duration><accidental>sharp</accidental></note>
+            <note><chord/><pitch><step>F</step><octave>4</octave></pitch><duration>1</duration><accidental>natural</accidental></note>
+            <backup><duration>2</duration></backup>
+            <note><pitch><step>C</step><octave>4</octave></pitch><duration>1</duration></note>
+            <note><pitch><step>C</step><octave>4</octave></pitch><duration>1</duration></note>
+            <note><pitch><step>F</step><octave>4</octave></pitch><duration>1</duration></note>
+        </measure>
+        """)
+        PitchAlternator().process_measure(measure)
+        self.assertEqual(self.alters(measure), ["1", "1", "0", "0", "1", "0"])
+
+    def test_ties_carry_alterations_across_measures(self):
+        first = ET.fromstring("""
+        <measure>
+            <note><pitch><step>B</step><octave>4</octave></pitch><duration>1/2</duration><accidental>flat</accidental><tie type="start"/></note>
+        </measure>
+        """)
+        second = ET.fromstring("""
+        <measure>
+            <note><pitch><step>B</step><octave>4</octave></pitch><duration>1/2</duration><tie type="stop"/></note>
+            <note><pitch><step>B</step><octave>4</octave></pitch><duration>1/3</duration></note>
+        </measure>
+        """)
+        alternator = PitchAlternator()
+        alternator.process_measure(first)
+        alternator.process_measure(second)
+        self.assertEqual(self.alters(first), ["-1"])
+        self.assertEqual(self.alters(second), ["-1", "0"])
@@ -386,3 +386,48 @@ class SplitSystemsTest(unittest.TestCase):
             </measure>
         </part>
         """, page.systems[0].part)
+
+    def test_sharing_measures_gives_the_same_systems(self):
+        xml = """
+        <part id="P1">
+            <measure number="1">
+                <attributes>
+                    <divisions>6</divisions>
+                    <key><fifths>0</fifths></key>
+                    <staves>2</staves>
+                    <clef number="1"><sign>G</sign><line>2</line></clef>
+                    <clef number="2"><sign>F</sign><line>4</line></clef>
+                </attributes>
+                <note>A</note>
+            </measure>
+            <measure number="2">
+                <print></print>
+                <note>B</note>
+            </measure>
+            <measure number="3">
+                <print new-system="yes"></print>
+                <note>C</note>
+            </measure>
+            <measure number="4">
+                <note>D</note>
+            </measure>
+            <measure number="5">
+                <print new-page="yes"><system-layout /></print>
+                <note>E</note>
+            </measure>
+        </part>
+        """
+        expected_pages = split_part_to_systems(ET.fromstring(xml))
+        part = ET.fromstring(xml)
+        pages = split_part_to_systems(part, share_unmodified_measures=True)
+
+        self.assert_xml_equals(xml, part) # the input is not modified
+        self.assertEqual(len(pages), len(expected_pages))
+        for page, expected_page in zip(pages, expected_pages):
+            self.assertEqual(len(page.systems), len(expected_page.systems))
+            for system, expected_system in zip(page.systems, expected_page.systems):
+                self.assertEqual(
+                    ET.tostring(system.part),
+                    ET.tostring(expected_system.part)
+                )
+        self.assertIs(pages[0].systems[0].part[0], part[0])
@@ -0,0 +1,47 @@
+import copy
+import unittest
+import xml.etree.ElementTree as ET
+from app.symbolic.part_to_score import part_to_score
+from app.symbolic.write_score import part_to_score_string
+
+
+class WriteScoreTest(unittest.TestCase):
+    def assert_same_as_element_tree(self, part: ET.Element, **kwargs):
+        expected = str(ET.tostring(
+            part_to_score(copy.deepcopy(part), **kwargs).getroot(),
+            encoding="utf-8",
+            xml_declaration=True
+        ), "utf-8")
+        self.assertEqual(expected, part_to_score_string(part, **kwargs))
+
+    def test_it_matches_element_tree_serialization(self):
+        part = ET.fromstring("""
+        <part>
+            <measure number="1">
+                <attributes><divisions>2</divisions></attributes>
+                <note><chord/><pitch><step>C</step></pitch></note>
+                <direction><words>Allegro &amp; "vivace" &lt;3</words></direction>
+            </measure>
+            <measure number="2" implicit="yes"/>
+        </part>
+        """)
+        self.assert_same_as_element_tree(part)
+
+    def test_it_escapes_attributes_and_text(self):
+        part = ET.Element("part")
+        part.attrib["note"] = 'a "b"\n<&>\t'
+        ET.SubElement(part, "measure").text = "x < y & z"
+        self.assert_same_as_element_tree(
+            part,
+            part_id='P"1',
+            part_name="Piano & <Forte>",
+            musicxml_version="4.0"
+        )
+
+    def test_it_serializes_an_empty_part(self):
+        self.assert_same_as_element_tree(ET.Element("part"))
+
+    def test_it_does_not_modify_the_part(self):
+        part = ET.fromstring("<part id=\"P1\"><measure/></part>")
+        part_to_score_string(part, part_id="P2")
+        self.assertEqual(part.attrib["id"], "P1")
@@ -0,0 +1,46 @@
+import argparse
+from .benchmark_split_systems import benchmark_split_systems
+
+
+##########
+# Parser #
+##########
+
+parser = argparse.ArgumentParser()
+
+subparsers = parser.add_subparsers(
+    title="available commands",
+    dest="command_name"
+)
+
+benchmark_split_systems_parser = subparsers.add_parser(
+    "benchmark-split-systems",
+    aliases=[],
+    help="Measures time and peak RSS of splitting the largest Lieder scores to systems"
+)
+benchmark_split_systems_parser.add_argument(
+    "paths",
+    nargs="*",
+    type=str,
+    help="MXL files to use instead of the largest Lieder scores"
+)
+benchmark_split_systems_parser.add_argument(
+    "--scores",
+    default=10,
+    type=int,
+    help="How many of the largest Lieder scores to use"
+)
+
+
+########
+# Main #
+########
+
+args = parser.parse_args()
+
+if args.command_name == "benchmark-split-systems":
+    benchmark_split_systems(args.paths, args.scores)
+
+else:
+    parser.print_help()
+    exit(2)
@@ -0,0 +1,46 @@
+import glob
+import multiprocessing
+import os
+import resource
+import time
+from typing import List, Optional
+from app.datasets.config import LIEDER_CORPUS_PATH
+from app.datasets.prepare_corpus_lmx_and_musicxml import convert_part_to_systems
+from app.symbolic.MxlFile import MxlFile
+
+
+def benchmark_split_systems(paths: Optional[List[str]] = None, score_count=10):
+    """Measures the time and peak RSS of converting the largest Lieder scores
+    to system MusicXML and LMX, with measures copied or shared while splitting.
+    Each run happens in a fresh process, so that the peak RSS is its own."""
+    if paths is None or len(paths) == 0:
+        paths = glob.glob(
+            os.path.join(LIEDER_CORPUS_PATH, "scores", "**", "lc*.mxl"),
+            recursive=True
+        )
+        paths = sorted(paths, key=os.path.getsize, reverse=True)[:score_count]
+    assert len(paths) > 0, "No scores to benchmark"
+
+    print("Scores:", len(paths))
+    for share in [False, True]:
+        # a new process for each run (not forked from this one)
+        context = multiprocessing.get_context("spawn")
+        with context.Pool(1) as pool:
+            seconds, peak_rss, outputs = pool.apply(_convert_scores, (paths, share))
+        name = "shared measures" if share else "copied measures"
+        print(
+            f"{name:20} {seconds:8.2f} s {peak_rss / 1024:10.1f} MiB peak RSS",
+            f"({outputs} systems)"
+        )
+
+
+def _convert_scores(paths: List[str], share: bool):
+    start_time = time.time()
+    outputs = 0
+    for path in paths:
+        part = MxlFile.load_mxl(path).get_piano_part()
+        for _ in convert_part_to_systems(part, share_unmodified_measures=share):
+            outputs += 1
+    seconds = time.time() - start_time
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss # KiB
+    return seconds, peak_rss, outputs
@@ -37,3 +37,7 @@ for basepath in samples:
     })
 with open(f"{args.name}-{args.split}.pickle", mode="wb") as dataset_file:
     pickle.dump(dataset, dataset_file)
+
+# the evaluation needs only the text fields, so store them also without images
+with open(f"{args.name}-{args.split}.text.pickle", mode="wb") as dataset_file:
+    pickle.dump([{key: value for key, value in entry.items() if key != "image"} for entry in dataset], dataset_file)
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+import csv
+import multiprocessing
+import os
+import pickle
+import sys
+
+sys.path.append("..")
+from app.evaluation.TEDn_lmx_xml import TEDn_lmx_xml_flavors
+from app.evaluation.GoldCache import GoldCache
+from ser_metric import ser_counts
+
+FLAVORS = ["full", "lmx"]
+
+def load_gold(path: str) -> list[dict]:
+    """Loads the gold dataset, preferring the text-only pickle without images."""
+    if os.path.exists(f"{path}.text.pickle"):
+        path = f"{path}.text.pickle"
+    else:
+        path = f"{path}.pickle"
+    with open(path, "rb") as dataset_file:
+        dataset = pickle.load(dataset_file)
+    return [{"path": entry.get("path", str(i)), "lmx": entry["lmx"], "musicxml": entry["musicxml"]}
+            for i, entry in enumerate(dataset)]
+
+def evaluate_sample(inputs):
+    index, gold, pred = inputs
+    ser_errors, ser_total, sert_errors, sert_total = ser_counts(gold["lmx"], pred)
+    row = {"index": index, "path": gold["path"], "ser_errors": ser_errors, "ser_total": ser_total,
+           "sert_errors": sert_errors, "sert_total": sert_total}
+    results = TEDn_lmx_xml_flavors(
+        pred, gold["musicxml"], flavors=FLAVORS, gold_cache=gold_cache,
+        max_nodes=args.max_nodes, time_limit_seconds=args.time_limit,
+    )
+    for flavor, result in results.items():
+        row[f"tedn_{flavor}_gold_cost"] = result.gold_cost
+        row[f"tedn_{flavor}_edit_cost"] = result.edit_cost
+        row[f"tedn_{flavor}_bounded"] = int(result.bounded)
+        row[f"tedn_{flavor}_seconds"] = round(result.evaluation_time_seconds, 3)
+    return row
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("gold", type=str, help="Gold dataset")
+    parser.add_argument("pred", type=str, help="File with predicted LMX")
+    parser.add_argument("--samples", default=None, type=str, help="TSV file to write the per-sample results to")
+    parser.add_argument("--verbose", default=1, type=int, help="Verbosity level")
+    parser.add_argument("--workers", default=1, type=int, help="Number of workers to use")
+    parser.add_argument("--gold_cache", default=None, type=str, help="Directory to cache the prepared gold data in")
+    parser.add_argument("--max_nodes", default=None, type=int, help="Only bound TEDn of samples with more nodes")
+    parser.add_argument("--time_limit", default=None, type=float, help="Only bound TEDn of samples taking longer (seconds)")
+    args = parser.parse_args()
+
+    gold = load_gold(args.gold)
+    with open(args.pred, "r", encoding="utf-8") as pred_file:
+        pred = [line.rstrip("\r\n") for line in pred_file]
+    assert len(gold) == len(pred), "Gold and predicted data must have the same length"
+
+    gold_cache = GoldCache(args.gold_cache) if args.gold_cache is not None else None
+
+    # the longest predictions go first, so that they do not delay the end
+    inputs = sorted(zip(range(len(gold)), gold, pred), key=lambda x: len(x[2]), reverse=True)
+    rows = []
+    with multiprocessing.Pool(args.workers) as pool:
+        for row in pool.imap_unordered(evaluate_sample, inputs):
+            rows.append(row)
+            if args.verbose and len(rows) % 10 == 0:
+                print("Processed", len(rows), "files", end="\r", file=sys.stderr)
+    if args.verbose:
+        print("Done", file=sys.stderr)
+    rows.sort(key=lambda row: row["index"])
+
+    if args.samples is not None:
+        with open(args.samples, "w", encoding="utf-8", newline="") as samples_file:
+            writer = csv.DictWriter(samples_file, fieldnames=list(rows[0].keys()), delimiter="\t")
+            writer.writeheader()
+            writer.writerows(rows)
+
+    def total(key):
+        return sum(row[key] for row in rows)
+
+    assert total("ser_total") > 0, "Gold data cannot be empty"
+    print("SER: {:.3f}%".format(100 * total("ser_errors") / total("ser_total")))
+    print("SERnotuplets: {:.3f}%".format(100 * total("sert_errors") / total("sert_total")))
+    for flavor in FLAVORS:
+        print("TEDn-{}: {:.3f}%".format(flavor, 100 * total(f"tedn_{flavor}_edit_cost") / total(f"tedn_{flavor}_gold_cost")))
+        if total(f"tedn_{flavor}_bounded"):
+            print("TEDn-{} bounded (not exact) samples: {}/{}".format(flavor, total(f"tedn_{flavor}_bounded"), len(rows)))
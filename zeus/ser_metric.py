@@ -30,22 +30,29 @@ tuplets_exceptions = {
 }
 tuplets_exception_re = re.compile(r"^\d+in\d+$")
 
+def ser_counts(gold_lmx: str, pred_lmx: str) -> tuple[int, int, int, int]:
+    """Returns SER errors and total, and the same for SER without tuplets."""
+    gold_lmx = gold_lmx.rstrip("\r\n").split()
+    pred_lmx = pred_lmx.rstrip("\r\n").split()
+
+    gold_tuplets = [x for x in gold_lmx if x not in tuplets_exceptions and not tuplets_exception_re.match(x)]
+    pred_tuplets = [x for x in pred_lmx if x not in tuplets_exceptions and not tuplets_exception_re.match(x)]
+    return (
+        levenshtein_distance(gold_lmx, pred_lmx), len(gold_lmx),
+        levenshtein_distance(gold_tuplets, pred_tuplets), len(gold_tuplets),
+    )
+
 def ser_metric(gold: list[str], pred: list[str]) -> float:
     assert len(gold) == len(pred), "Gold and predicted data must have the same length"
 
     ser_errors, ser_total = 0, 0
     sert_errors, sert_total = 0, 0
     for gold_lmx, pred_lmx in zip(gold, pred):
-        gold_lmx = gold_lmx.rstrip("\r\n").split()
-        pred_lmx = pred_lmx.rstrip("\r\n").split()
-
-        ser_errors += levenshtein_distance(gold_lmx, pred_lmx)
-        ser_total += len(gold_lmx)
-
-        gold_tuplets = [x for x in gold_lmx if x not in tuplets_exceptions and not tuplets_exception_re.match(x)]
-        pred_tuplets = [x for x in pred_lmx if x not in tuplets_exceptions and not tuplets_exception_re.match(x)]
-        sert_errors += levenshtein_distance(gold_tuplets, pred_tuplets)
-        sert_total += len(gold_tuplets)
+        errors, total, tuplet_errors, tuplet_total = ser_counts(gold_lmx, pred_lmx)
+        ser_errors += errors
+        ser_total += total
+        sert_errors += tuplet_errors
+        sert_total += tuplet_total
 
     assert ser_total > 0, "Gold data cannot be empty"
     return {"SER": 100 * ser_errors / ser_total, "SERnotuplets": 100 * sert_errors / sert_total}
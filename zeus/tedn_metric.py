@@ -1,10 +1,68 @@
 #!/usr/bin/env python3
+import hashlib
+import json
 import multiprocessing
+import os
 import pickle
 import sys
 
 sys.path.append("..")
 from app.evaluation.TEDn_lmx_xml import TEDn_lmx_xml
+from app.evaluation.TEDn import NoteContentCoder
+from app.evaluation.GoldCache import GoldCache
+from app.symbolic.Pruner import Pruner
+
+RESULTS_VERSION = 1
+"Increment when the TEDn computation or the stored records change, invalidates stored results"
+
+def scorer_versions() -> list:
+    """Versions of the code producing the results, stored results of other versions are not reused."""
+    return [RESULTS_VERSION, Pruner.RULES_VERSION, NoteContentCoder.RULES_VERSION]
+
+def sample_hash(
+    flavor: str, gold: str, pred: str,
+    max_nodes: int | None = None, time_limit: float | None = None
+) -> str:
+    """Identifies the evaluated data of a sample, the evaluation budget and the scorer versions,
+    so that stored results are reused only for the same evaluation."""
+    return hashlib.sha256(json.dumps(
+        [scorer_versions(), flavor, max_nodes, time_limit, gold, pred]
+    ).encode("utf-8")).hexdigest()
+
+def load_results(path: str) -> dict[str, dict]:
+    """Loads the stored per-sample results keyed by the sample hash, ignoring an incomplete last line."""
+    results = {}
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as results_file:
+            for line in results_file:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                results[record["hash"]] = record
+    return results
+
+def open_results(path: str):
+    """Opens the results file for appending, terminating an incomplete last line (of an interrupted run)."""
+    results_file = open(path, "a+", encoding="utf-8")
+    results_file.seek(0, os.SEEK_END)
+    if results_file.tell() > 0:
+        results_file.seek(results_file.tell() - 1)
+        if results_file.read(1) != "\n":
+            results_file.write("\n")
+    return results_file
+
+def chunk_by_length(samples: list, max_chunk_length: int) -> list[list]:
+    """Groups consecutive samples into chunks of at most the given total predicted length (at least one sample each)."""
+    chunks, chunk_length = [], 0
+    for sample in samples:
+        if not chunks or chunk_length + len(sample["pred"]) > max_chunk_length:
+            chunks.append([])
+            chunk_length = 0
+        chunks[-1].append(sample)
+        chunk_length += len(sample["pred"])
+    return chunks
+
 
 if __name__ == "__main__":
     import argparse
@@ -15,6 +73,10 @@ if __name__ == "__main__":
     parser.add_argument("--flavor", default="full", choices=["full", "lmx"], help="Flavor of the evaluation")
     parser.add_argument("--verbose", default=1, type=int, help="Verbosity level")
     parser.add_argument("--workers", default=1, type=int, help="Number of workers to use")
+    parser.add_argument("--gold_cache", default=None, type=str, help="Directory to cache the prepared gold data in")
+    parser.add_argument("--max_nodes", default=None, type=int, help="Only bound TEDn of samples with more nodes")
+    parser.add_argument("--time_limit", default=None, type=float, help="Only bound TEDn of samples taking longer (seconds)")
+    parser.add_argument("--results", default=None, type=str, help="JSONL file to append per-sample results to, reused on restart")
     args = parser.parse_args()
 
     with open(f"{args.gold}.pickle", "rb") as dataset_file:
@@ -22,20 +84,68 @@ if __name__ == "__main__":
     with open(args.pred, "r", encoding="utf-8") as pred_file:
         pred = [line.rstrip("\r\n") for line in pred_file]
 
-    def TEDn_metric(inputs):
-        gold, pred = inputs
-        return TEDn_lmx_xml(pred, gold, flavor=args.flavor)
+    gold_cache = GoldCache(args.gold_cache) if args.gold_cache is not None else None
+
+    def TEDn_metric(chunk):
+        records = []
+        for sample in chunk:
+            result = TEDn_lmx_xml(
+                sample["pred"], sample["gold"], flavor=args.flavor, gold_cache=gold_cache,
+                max_nodes=args.max_nodes, time_limit_seconds=args.time_limit
+            )
+            records.append({
+                "path": sample["path"],
+                "hash": sample["hash"],
+                "gold_cost": result.gold_cost,
+                "edit_cost": result.edit_cost,
+                "lower_bound": result.lower_bound if result.bounded else result.edit_cost,
+                "bounded": result.bounded,
+                "seconds": round(result.evaluation_time_seconds, 3),
+            })
+        return records
+
+    samples = [
+        {"path": entry.get("path", str(i)), "gold": entry["musicxml"], "pred": pred_lmx,
+         "hash": sample_hash(args.flavor, entry["musicxml"], pred_lmx, args.max_nodes, args.time_limit)}
+        for i, (entry, pred_lmx) in enumerate(zip(gold, pred))
+    ]
 
-    total_gold_cost, total_edit_cost = 0, 0
+    # results stored by a previous (interrupted) run are reused
+    results = load_results(args.results) if args.results is not None else {}
+    pending = [sample for sample in samples if sample["hash"] not in results]
+    if args.verbose and len(pending) < len(samples):
+        print("Reusing", len(samples) - len(pending), "stored results", file=sys.stderr)
+
+    # the longest predictions go first, long ones are evaluated one by one,
+    # short ones in chunks of similar total length to limit the overhead
+    pending.sort(key=lambda sample: len(sample["pred"]), reverse=True)
+    chunks = chunk_by_length(pending, max(len(sample["pred"]) for sample in pending) if pending else 0)
+
+    results_file = open_results(args.results) if args.results is not None else None
     with multiprocessing.Pool(args.workers) as pool:
-        total = 0
-        for result in pool.imap_unordered(TEDn_metric, sorted(zip([entry["musicxml"] for entry in gold], pred), key=lambda x: len(x[1]), reverse=True)):
-            total_gold_cost += result.gold_cost
-            total_edit_cost += result.edit_cost
-            total += 1
-            if args.verbose and total % 10 == 0:
-                print("Processed", total, "files", end="\r", file=sys.stderr)
+        processed = 0
+        for records in pool.imap_unordered(TEDn_metric, chunks):
+            for record in records:
+                results[record["hash"]] = record
+                if results_file is not None:
+                    print(json.dumps(record), file=results_file, flush=True)
+            processed += len(records)
+            if args.verbose and processed // 10 > (processed - len(records)) // 10:
+                print("Processed", processed, "files", end="\r", file=sys.stderr)
+    if results_file is not None:
+        results_file.close()
     if args.verbose:
         print("Done", file=sys.stderr)
 
+    total_gold_cost, total_edit_cost, total_lower_cost, bounded = 0, 0, 0, 0
+    for sample in samples:
+        record = results[sample["hash"]]
+        total_gold_cost += record["gold_cost"]
+        total_edit_cost += record["edit_cost"]
+        total_lower_cost += record["lower_bound"]
+        bounded += record["bounded"]
+
     print("TEDn-{}: {:.3f}%".format(args.flavor, 100 * total_edit_cost / total_gold_cost))
+    if bounded:
+        print("Bounded (not exact) samples: {}/{}, TEDn-{} lower bound: {:.3f}%".format(
+            bounded, len(samples), args.flavor, 100 * total_lower_cost / total_gold_cost))